@@ -0,0 +1,279 @@
+"""
+LLM backends the agents send their calls to
+Remote OpenAI, OpenAI-compatible local servers (vLLM, llama.cpp, Ollama), an
+in-process rule-based backend and a fake remote one for load tests, selected per agent method
+"""
+
+import asyncio
+import inspect
+import os
+import random
+import re
+import threading
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Union
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+from agents.streaming_critique import StreamingCritique
+
+load_dotenv()
+
+class OpenAICompatibleBackend:
+    """A chat-completions endpoint: OpenAI itself or any server speaking its API."""
+
+    def __init__(self, name: str, model: str, base_url: Optional[str] = None,
+                 api_key: Optional[str] = None, metered: bool = True):
+        """
+        Args:
+            name: Backend name used in LLM_BACKEND / LLM_BACKENDS
+            model: Model to request
+            base_url: API base URL; None uses OpenAI
+            api_key: API key; None uses OPENAI_API_KEY
+            metered: Whether calls count against token budgets and the shared rate limits
+        """
+        self.name = name
+        self.model_name = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.metered = metered
+
+    def chat_model(self, temperature: float) -> ChatOpenAI:
+        """A LangChain chat model for this endpoint (used by the crewai Agents)."""
+        kwargs = {"model": self.model_name, "temperature": temperature}
+        if self.base_url:
+            kwargs["base_url"] = self.base_url
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
+        return ChatOpenAI(**kwargs)
+
+    async def arun(self, method: str, prompt: str, produce: Callable[[], Union[Any, Awaitable[Any]]]) -> Any:
+        """Send a prompt; produce stands in for the request and response parsing."""
+        # This would await the endpoint through the async client (chat_model(...).ainvoke) and parse the reply
+        result = produce()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+# Quoted argument in the critique prompts: after "Argument: " or on its own line
+_ARGUMENT = re.compile(r'(?:Argument: |:\n\s*)"(.*?)"\n\s*(?:Context:|\n)', re.DOTALL)
+_USER_INPUT = re.compile(r'user\'s input: "(.*?)"', re.DOTALL)
+
+# Topics the rule-based backend retrieves from, by keyword
+TOPIC_BANK = {
+    "technology": [
+        "Should artificial intelligence be regulated?",
+        "Should social media platforms be regulated more strictly?",
+        "Is remote work better than office work?",
+        "Should coding be mandatory in schools?",
+        "Are smartphones harmful to teenagers?",
+    ],
+    "education": [
+        "Should college education be free?",
+        "Should homework be banned in primary schools?",
+        "Are standardized tests a fair measure of ability?",
+        "Should schools adopt a four-day week?",
+        "Is online learning as effective as classroom learning?",
+    ],
+    "environment": [
+        "Are electric vehicles the future of transportation?",
+        "Should nuclear power replace fossil fuels?",
+        "Should single-use plastics be banned?",
+        "Is carbon taxation the best way to cut emissions?",
+        "Should meat consumption be taxed?",
+    ],
+    "health": [
+        "Should sugary drinks be taxed?",
+        "Should vaccination be mandatory for school children?",
+        "Is a four-day work week better for mental health?",
+        "Should junk food advertising be banned?",
+        "Are fitness trackers good for public health?",
+    ],
+}
+
+class RuleBasedBackend:
+    """
+    In-process backend that answers from heuristics instead of a model.
+
+    Critique methods score the quoted argument with StreamingCritique's
+    features and topic generation retrieves from TOPIC_BANK. Methods without
+    a rule get the agent's canned response. No network is used, so the
+    whole stack runs offline at negligible latency.
+    """
+
+    name = "rules"
+    model_name = "rules"
+    metered = False
+
+    def __init__(self):
+        self.rules: Dict[str, Callable[[str], Any]] = {
+            "CritiqueAgent.critique_argument": self._critique,
+            "CritiqueAgent.analyze_argument": lambda prompt: {
+                key: value for key, value in self._critique(prompt).items() if key in ("scores", "feedback", "suggestions")
+            },
+            "CritiqueAgent.identify_logical_fallacies": lambda prompt: self._critique(prompt)["fallacies"],
+            "CritiqueAgent.suggest_improvements": lambda prompt: self._critique(prompt)["suggestions"],
+            "TopicSelectorAgent.generate_topics": self._topics,
+        }
+
+    def chat_model(self, temperature: float) -> None:
+        return None
+
+    async def arun(self, method: str, prompt: str, produce: Callable[[], Union[Any, Awaitable[Any]]]) -> Any:
+        rule = self.rules.get(method)
+        if rule is not None:
+            return rule(prompt)
+        result = produce()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    @staticmethod
+    def _critique(prompt: str) -> Dict[str, Any]:
+        match = _ARGUMENT.search(prompt)
+        critique = StreamingCritique()
+        critique.feed(match.group(1) if match else "")
+        critique.finish()
+        result = critique.provisional()
+
+        suggestions = []
+        if critique.evidence < critique.sentences:
+            suggestions.append("Support more of your claims with specific statistics, studies or examples")
+        if critique.reasoning == 0:
+            suggestions.append("Make your reasoning explicit with connectives like 'because' and 'therefore'")
+        if critique.fallacies:
+            suggestions.append("Rephrase the flagged passages to avoid the possible fallacies")
+        if not suggestions:
+            suggestions.append("Anticipate the strongest counter-argument and answer it directly")
+
+        return {
+            "scores": result["scores"],
+            "feedback": result["feedback"].replace("Provisional: ", "Rule-based: "),
+            "fallacies": result["fallacies"],
+            "suggestions": suggestions
+        }
+
+    @staticmethod
+    def _topics(prompt: str) -> List[str]:
+        match = _USER_INPUT.search(prompt)
+        words = set(re.findall(r"[a-z]+", (match.group(1) if match else "").lower()))
+
+        ranked = []
+        for category, topics in TOPIC_BANK.items():
+            keywords = {category} | {word for topic in topics for word in re.findall(r"[a-z]{5,}", topic.lower())}
+            ranked.append((len(words & keywords), category))
+        ranked.sort(key=lambda item: -item[0])
+
+        # Best-matching categories first, then one topic from each of the rest
+        topics = []
+        for score, category in ranked:
+            topics.extend(TOPIC_BANK[category] if score else TOPIC_BANK[category][:1])
+        return list(dict.fromkeys(topics))[:5]
+
+class FakeBackend(RuleBasedBackend):
+    """
+    Rule-based answers delivered after a simulated model latency, for load tests.
+
+    Latencies are log-normal around latency_ms, so some calls take several
+    times longer than the median, as real model calls do. Calls are metered
+    like a remote endpoint, so they go through token budgets and wait for
+    the shared rate limits.
+    """
+
+    name = "fake"
+    model_name = "fake"
+    metered = True
+
+    def __init__(self, latency_ms: Optional[float] = None, jitter: Optional[float] = None, seed: Optional[int] = None):
+        """
+        Args:
+            latency_ms: Median call latency (FAKE_LLM_LATENCY_MS by default)
+            jitter: Spread of the log-normal latency distribution; 0 makes every call take latency_ms
+                (FAKE_LLM_JITTER by default)
+            seed: Seed for the latency samples
+        """
+        super().__init__()
+        self.latency_ms = latency_ms if latency_ms is not None else float(os.getenv("FAKE_LLM_LATENCY_MS", "800"))
+        self.jitter = jitter if jitter is not None else float(os.getenv("FAKE_LLM_JITTER", "0.5"))
+        self._rng = random.Random(seed)
+
+    def delay(self) -> float:
+        """Seconds the next call takes."""
+        return self.latency_ms / 1000 * self._rng.lognormvariate(0.0, self.jitter)
+
+    async def arun(self, method: str, prompt: str, produce: Callable[[], Union[Any, Awaitable[Any]]]) -> Any:
+        await asyncio.sleep(self.delay())
+        return await super().arun(method, prompt, produce)
+
+def _build(name: str):
+    if name == "openai":
+        return OpenAICompatibleBackend("openai", os.getenv("OPENAI_MODEL", "gpt-4"), os.getenv("OPENAI_BASE_URL"))
+    if name == "local":
+        return OpenAICompatibleBackend(
+            "local",
+            os.getenv("LOCAL_LLM_MODEL", "llama3"),
+            os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:11434/v1"),
+            os.getenv("LOCAL_LLM_API_KEY", "not-needed"),
+            metered=False
+        )
+    if name == "rules":
+        return RuleBasedBackend()
+    if name == "fake":
+        return FakeBackend()
+    raise ValueError(f"Unknown LLM backend {name!r}; expected openai, local, rules or fake")
+
+_lock = threading.Lock()
+_backends: Dict[str, Any] = {}
+_routes: Optional[Dict[str, str]] = None
+
+def get_backend(name: str):
+    """The shared backend instance with the given name."""
+    with _lock:
+        if name not in _backends:
+            _backends[name] = _build(name)
+        return _backends[name]
+
+def use_backends(default: Optional[str] = None, routes: Optional[Dict[str, str]] = None):
+    """
+    Override backend selection for the process (None restores the environment's).
+
+    Args:
+        default: Backend for anything without a route
+        routes: Backend per agent class ("CritiqueAgent") or method ("CritiqueAgent.analyze_argument")
+    """
+    global _routes
+    with _lock:
+        if default is None and routes is None:
+            _routes = None
+        else:
+            _routes = dict(routes or {})
+            _routes["*"] = default or os.getenv("LLM_BACKEND", "openai")
+
+def _load_routes() -> Dict[str, str]:
+    """Routes from LLM_BACKEND and LLM_BACKENDS ("CritiqueAgent=rules,TopicSelectorAgent.generate_topics=local")."""
+    routes = {"*": os.getenv("LLM_BACKEND", "openai")}
+    for item in os.getenv("LLM_BACKENDS", "").split(","):
+        if "=" in item:
+            target, name = item.split("=", 1)
+            routes[target.strip()] = name.strip()
+    return routes
+
+def backend_for(target: str):
+    """
+    The backend serving an agent method or agent class.
+
+    Args:
+        target: "Class.method" or "Class"; a method falls back to its class's route,
+            then to the default backend
+    """
+    global _routes
+    with _lock:
+        if _routes is None:
+            _routes = _load_routes()
+        routes = _routes
+    agent_class = target.split(".", 1)[0]
+    name = routes.get(target) or routes.get(agent_class) or routes["*"]
+    return get_backend(name)
+
+def chat_model_for(agent_class: str, temperature: float) -> ChatOpenAI:
+    """The LangChain chat model for an agent's crewai Agent, falling back to OpenAI for in-process backends."""
+    return backend_for(agent_class).chat_model(temperature) or get_backend("openai").chat_model(temperature)
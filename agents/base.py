@@ -0,0 +1,196 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Union
+
+from agents.backends import backend_for
+from utils.cancellation import current_scope
+from utils.cassette import get_cassette
+from utils.response_cache import get_response_cache
+from utils.scheduler import scheduler, METHOD_PRIORITIES, BACKGROUND
+from utils.single_flight import single_flight, request_key
+from utils.token_budget import TokenBudget, COMPLETION_RESERVE, context_limit, count_tokens, trim_history
+
+_thread_loops = threading.local()
+
+def run_sync(coroutine: Awaitable[Any]) -> Any:
+    """
+    Run an agent coroutine to completion from synchronous code.
+
+    Each thread keeps one event loop for this, so sync calls do not pay for
+    creating a loop every time.
+
+    Raises:
+        RuntimeError: If called from a running event loop (await the a-prefixed method instead)
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coroutine.close()
+        raise RuntimeError("Synchronous agent methods cannot be called from a running event loop; "
+                           "await the a-prefixed method instead")
+
+    # A loop inherited from a parent process has lost its executor threads, so a forked child gets its own
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None or loop.is_closed() or _thread_loops.pid != os.getpid():
+        loop = asyncio.new_event_loop()
+        _thread_loops.loop, _thread_loops.pid = loop, os.getpid()
+    return loop.run_until_complete(coroutine)
+
+class BaseAgent:
+    """Shared LLM call path for the debate agents."""
+
+    # Set by the owning session; None means calls are not metered
+    token_budget: Optional[TokenBudget] = None
+    # Session the scheduler queues this agent's calls under
+    session_id: str = "default"
+    # Scheduler priority for every call; None uses the per-method priority
+    priority_class: Optional[int] = None
+    
+    # Attributes the owning session sets on an instance; cleared when the instance is pooled
+    SESSION_ATTRIBUTES = ("token_budget", "session_id", "priority_class")
+    
+    def reset_state(self):
+        """Clear per-debate state so the instance can host a new debate."""
+    
+    def detach(self):
+        """Drop session wiring so the instance falls back to the class defaults."""
+        for name in self.SESSION_ATTRIBUTES:
+            self.__dict__.pop(name, None)
+
+    @property
+    def model_name(self) -> str:
+        """Name of the model this agent's backend sends requests to."""
+        return backend_for(self.__class__.__name__).model_name
+    
+    def model_for(self, method: str) -> str:
+        """Name of the model a method's calls are sent to (backends can differ per method)."""
+        return backend_for(f"{self.__class__.__name__}.{method}").model_name
+
+    def _complete(self, method: str, prompt: str, produce: Callable[[], Any], optional: bool = False) -> Any:
+        """Synchronous form of _acomplete."""
+        return run_sync(self._acomplete(method, prompt, produce, optional))
+
+    async def _acomplete(self, method: str, prompt: str, produce: Callable[[], Union[Any, Awaitable[Any]]],
+                         optional: bool = False) -> Any:
+        """
+        Send a prompt through the shared call path.
+
+        Args:
+            method: Name of the agent method making the call
+            prompt: The prompt being sent
+            produce: Callable that returns the response for the prompt (or an awaitable of it)
+            optional: Whether the call may be skipped when budgets tighten
+
+        Returns:
+            The response, or None if an optional call was skipped
+            
+        Raises:
+            Cancelled: If the active cancel scope is cancelled or its deadline passes first
+        """
+        # Work nobody will read is neither sent nor billed
+        scope = current_scope()
+        if scope is not None:
+            scope.check()
+        
+        qualified = f"{self.__class__.__name__}.{method}"
+        backend = backend_for(qualified)
+        model = backend.model_name
+        # Local and in-process backends cost nothing and share no provider rate limits
+        budget = self.token_budget if backend.metered else None
+
+        if budget is not None:
+            decision = budget.preflight(qualified, prompt, model, optional)
+            if decision["action"] == "skip":
+                budget.record_skip(qualified)
+                return None
+            model = decision["model"]
+
+        key = request_key(model, prompt)
+        
+        # Another worker process may already have paid for this exact request.
+        # Cassettes must see every call, so recording and replay bypass the cache
+        cache = get_response_cache()
+        if cache is not None and (not cache.caches(qualified) or get_cassette() is not None):
+            cache = None
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, key, qualified)
+            if cached is not None:
+                return cached
+        
+        async def send():
+            # Replayed responses never reach the provider, so they skip the rate limits
+            cassette = get_cassette()
+            if cassette is not None and cassette.mode == "replay":
+                return await cassette.aplay(key, qualified)
+            
+            # Wait for rate-limit capacity in this call's priority class
+            if backend.metered:
+                priority = self.priority_class
+                if priority is None:
+                    priority = METHOD_PRIORITIES.get(qualified, BACKGROUND)
+                await scheduler.aacquire(self.session_id, priority, count_tokens(prompt, model) + COMPLETION_RESERVE)
+            
+            start = time.perf_counter()
+            result = await backend.arun(qualified, prompt, produce)
+            if cassette is not None:
+                cassette.record(key, qualified, model, result, (time.perf_counter() - start) * 1000)
+            return result
+        
+        # Identical concurrent requests (same model and prompt) share one result
+        flight = single_flight.ado(key, send, label=qualified)
+        response, shared = await (scope.run(flight) if scope is not None else flight)
+
+        # Callers that joined another caller's request did not send one themselves
+        if not shared:
+            if budget is not None:
+                budget.record(qualified, prompt, response, model)
+            if cache is not None and response is not None:
+                await asyncio.to_thread(cache.put, key, qualified, response)
+        return response
+
+    def _stream(self, method: str, prompt: str, produce: Callable[[], str]) -> Iterator[str]:
+        """
+        Send a prompt through the shared call path and yield the response in chunks.
+        
+        Args:
+            method: Name of the agent method making the call
+            prompt: The prompt being sent
+            produce: Callable that returns the full response text
+            
+        Yields:
+            Consecutive pieces of the response text
+        """
+        response = self._complete(method, prompt, produce) or ""
+        
+        # This would stream tokens from the LLM; the placeholder response is yielded word by word
+        scope = current_scope()
+        for chunk in re.findall(r"\S+\s*", response):
+            if scope is not None:
+                scope.check()
+            yield chunk
+    
+    async def _astream(self, method: str, prompt: str, produce: Callable[[], Union[str, Awaitable[str]]]) -> AsyncIterator[str]:
+        """Async form of _stream."""
+        response = await self._acomplete(method, prompt, produce) or ""
+        
+        # This would stream tokens from the async client; the placeholder response is yielded word by word
+        scope = current_scope()
+        for chunk in re.findall(r"\S+\s*", response):
+            # A cancelled stream stops here, closing the connection instead of reading on
+            if scope is not None:
+                scope.check()
+            yield chunk
+    
+    def _fit_history(self, entries: List[str], fixed_prompt: str) -> List[str]:
+        """Trim history entries so the full prompt fits the context window and budget."""
+        model = self.model_name
+        if self.token_budget is not None:
+            allowance = self.token_budget.context_allowance(model, fixed_prompt)
+        else:
+            allowance = max(0, context_limit(model) - COMPLETION_RESERVE - count_tokens(fixed_prompt, model))
+        return trim_history(entries, allowance, model)
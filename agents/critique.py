@@ -1,17 +1,46 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from agents.backends import chat_model_for
+from agents.base import BaseAgent, run_sync
+from utils.forkable import ForkableList
+
 load_dotenv()
 
-class CritiqueAgent:
+class CritiqueAgent(BaseAgent):
+    # Debates with at least this many turns are evaluated with map-reduce
+    MAP_REDUCE_MIN_TURNS = 12
+    # Per-turn critiques summarized together in one map step
+    CHUNK_SIZE = 6
+    # Fused critique results kept per (argument, speaker, context)
+    CRITIQUE_CACHE_SIZE = 256
+    
+    EVALUATION_TEMPLATE = """
+        Provide a final evaluation of this debate:
+        
+        Topic: {topic}
+        Debate History: {history}
+        Final Scores: {scores}
+        
+        Include:
+        1. Overall debate quality assessment
+        2. Strengths of each participant
+        3. Areas for improvement
+        4. Educational value achieved
+        5. Recommendations for future debates
+        6. Final scores and rankings
+        
+        Be comprehensive but constructive.
+        """
+
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL", "gpt-4"),
-            temperature=float(os.getenv("TEMPERATURE", "0.7"))
-        )
+        self.llm = chat_model_for(self.__class__.__name__, float(os.getenv("TEMPERATURE", "0.7")))
         
         self.agent = Agent(
             role="Debate Critique Specialist",
@@ -24,12 +53,104 @@ class CritiqueAgent:
             llm=self.llm
         )
         
-        self.debate_scores = {
-            "user": {"argument_quality": 0, "evidence_use": 0, "logical_structure": 0, "total": 0},
-            "debator": {"argument_quality": 0, "evidence_use": 0, "logical_structure": 0, "total": 0}
-        }
-        self.feedback_history = []
+        # Background workers for the map step of the final evaluation
+        self._summary_executor = None
+        
+        # In fused mode one structured call per argument serves analyze_argument,
+        # identify_logical_fallacies and suggest_improvements
+        self.fused_critique = os.getenv("CRITIQUE_MODE", "fused") == "fused"
+        self._critique_cache = OrderedDict()
+        self._critique_lock = threading.Lock()
+        
+        self.reset_state()
+    
+    def reset_state(self):
+        """Clear per-debate state so the instance can host a new debate."""
         self.current_topic = ""
+        self.reset_scores()
+    
+    def critique_argument(self, argument: str, speaker: str, context: str = "") -> Dict[str, Any]:
+        """
+        Score an argument, find fallacies and suggest improvements in one call.
+        
+        Results are cached per argument, speaker and context, so repeated
+        views of the same argument cost nothing.
+        
+        Args:
+            argument: The argument to critique
+            speaker: "user" or "debator"
+            context: Additional context about the debate
+            
+        Returns:
+            Dict with "scores", "feedback", "fallacies" and "suggestions"
+        """
+        return run_sync(self.acritique_argument(argument, speaker, context))
+    
+    async def acritique_argument(self, argument: str, speaker: str, context: str = "") -> Dict[str, Any]:
+        """Async counterpart of critique_argument."""
+        key = (argument, speaker, context)
+        with self._critique_lock:
+            cached = self._critique_cache.get(key)
+            if cached is not None:
+                self._critique_cache.move_to_end(key)
+                return cached
+        
+        critique_prompt = f"""
+        Critique this debate argument:
+        
+        Speaker: {speaker}
+        Argument: "{argument}"
+        Context: {context}
+        
+        Respond with a single JSON object with these keys:
+        - "scores": 1-10 scores for "argument_quality" (clarity, persuasiveness, relevance),
+          "evidence_use" (facts, statistics, examples, expert opinions),
+          "logical_structure" (coherence, reasoning, flow) and "total"
+        - "feedback": specific strengths, weaknesses and an overall assessment
+        - "fallacies": logical fallacies found (ad hominem, straw man, false dilemma,
+          appeal to authority, hasty generalization, ...), each with a brief explanation
+        - "suggestions": specific, actionable improvements covering evidence, structure,
+          clarity and counter-argument preparation
+        """
+        
+        # This would use the LLM to critique the argument
+        critique = await self._acomplete("critique_argument", critique_prompt, lambda: {
+            "scores": {
+                "argument_quality": 7,
+                "evidence_use": 6,
+                "logical_structure": 8,
+                "total": 7
+            },
+            "feedback": "Good argument structure with room for improvement in evidence presentation.",
+            "fallacies": [],
+            "suggestions": [
+                "Add specific statistics to support your claim",
+                "Address potential counter-arguments more directly",
+                "Provide concrete examples to illustrate your point"
+            ]
+        })
+        
+        with self._critique_lock:
+            self._critique_cache[key] = critique
+            while len(self._critique_cache) > self.CRITIQUE_CACHE_SIZE:
+                self._critique_cache.popitem(last=False)
+        return critique
+    
+    async def _aany_critique(self, argument: str, speaker: Optional[str] = None) -> Dict[str, Any]:
+        """
+        The most recent cached critique of an argument, whatever its context.
+        
+        The fallacy and suggestion views have no debate context of their own,
+        so they reuse a critique made for the speaker (any speaker if None)
+        rather than caching a context-free one that analyze_argument would
+        then mistake for its own.
+        """
+        with self._critique_lock:
+            for key in reversed(self._critique_cache):
+                if key[0] == argument and speaker in (None, key[1]):
+                    self._critique_cache.move_to_end(key)
+                    return self._critique_cache[key]
+        return await self.acritique_argument(argument, speaker or "user")
     
     def analyze_argument(self, argument: str, speaker: str, context: str = "") -> Dict[str, Any]:
         """
@@ -43,6 +164,19 @@ class CritiqueAgent:
         Returns:
             Dict containing analysis scores and feedback
         """
+        return run_sync(self.aanalyze_argument(argument, speaker, context))
+    
+    async def aanalyze_argument(self, argument: str, speaker: str, context: str = "") -> Dict[str, Any]:
+        """Async counterpart of analyze_argument."""
+        if self.fused_critique:
+            critique = await self.acritique_argument(argument, speaker, context)
+            return self._record_analysis(argument, speaker, context, {
+                "scores": dict(critique["scores"]),
+                "feedback": critique["feedback"],
+                "suggestions": list(critique["suggestions"]),
+                "fallacies": list(critique["fallacies"])
+            })
+        
         analysis_prompt = f"""
         Analyze this debate argument:
         
@@ -63,20 +197,30 @@ class CritiqueAgent:
         """
         
         # This would use the LLM to analyze the argument
-        scores = {
-            "argument_quality": 7,
-            "evidence_use": 6,
-            "logical_structure": 8,
-            "total": 7
-        }
-        
-        feedback = f"Good argument structure with room for improvement in evidence presentation."
-        
-        return {
-            "scores": scores,
-            "feedback": feedback,
+        analysis = await self._acomplete("analyze_argument", analysis_prompt, lambda: {
+            "scores": {
+                "argument_quality": 7,
+                "evidence_use": 6,
+                "logical_structure": 8,
+                "total": 7
+            },
+            "feedback": "Good argument structure with room for improvement in evidence presentation.",
             "suggestions": ["Add more specific examples", "Strengthen evidence with statistics"]
-        }
+        })
+        return self._record_analysis(argument, speaker, context, analysis)
+    
+    def _record_analysis(self, argument: str, speaker: str, context: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep an analysis in feedback_history; per-turn critiques are the map outputs of the final evaluation."""
+        self.feedback_history.append({
+            "speaker": speaker,
+            "context": context,
+            "excerpt": argument[:200],
+            "scores": analysis["scores"],
+            "feedback": analysis["feedback"]
+        })
+        self._schedule_chunk_summaries()
+        
+        return analysis
     
     def update_scores(self, analysis: Dict[str, Any], speaker: str):
         """
@@ -98,8 +242,13 @@ class CritiqueAgent:
         Provide feedback during the middle of the debate.
         
         Returns:
-            Constructive feedback for both participants
+            Constructive feedback for both participants, or an empty string if
+            the call was skipped to stay within the token budget
         """
+        return run_sync(self.aprovide_mid_debate_feedback())
+    
+    async def aprovide_mid_debate_feedback(self) -> str:
+        """Async counterpart of provide_mid_debate_feedback."""
         feedback_prompt = f"""
         Based on the current debate scores:
         User: {self.debate_scores['user']}
@@ -115,23 +264,150 @@ class CritiqueAgent:
         """
         
         # This would use the LLM to generate feedback
-        return "Both participants are showing strong engagement. Consider adding more specific evidence to strengthen arguments."
+        feedback = await self._acomplete(
+            "provide_mid_debate_feedback", feedback_prompt,
+            lambda: "Both participants are showing strong engagement. Consider adding more specific evidence to strengthen arguments.",
+            optional=True
+        )
+        return feedback or ""
     
     def final_evaluation(self, debate_history: List[str]) -> Dict[str, Any]:
         """
         Provide a final evaluation of the entire debate.
         
+        Long debates are evaluated with map-reduce over the per-turn critiques
+        instead of sending the whole history in one prompt.
+        
         Args:
             debate_history: Complete history of the debate
             
         Returns:
             Comprehensive final evaluation
         """
-        evaluation_prompt = f"""
-        Provide a final evaluation of this debate:
+        return run_sync(self.afinal_evaluation(debate_history))
+    
+    async def afinal_evaluation(self, debate_history: List[str]) -> Dict[str, Any]:
+        """Async counterpart of final_evaluation."""
+        if len(debate_history) >= self.MAP_REDUCE_MIN_TURNS and self.feedback_history:
+            return await self._amap_reduce_evaluation()
+        
+        evaluation_template = self.EVALUATION_TEMPLATE
+        
+        # Long debates are trimmed to the most recent turns that fit the context window
+        fixed_prompt = evaluation_template.format(topic=self.current_topic, history="", scores=self.debate_scores)
+        history = self._fit_history(debate_history, fixed_prompt)
+        evaluation_prompt = evaluation_template.format(topic=self.current_topic, history=history,
+                                                       scores=self.debate_scores)
+        
+        # This would use the LLM to generate the final evaluation
+        return await self._acomplete("final_evaluation", evaluation_prompt, lambda: {
+            "overall_quality": "Good",
+            "user_strengths": ["Clear communication", "Engaged participation"],
+            "debator_strengths": ["Strong argument structure", "Good evidence use"],
+            "improvement_areas": ["More specific examples", "Better counter-arguments"],
+            "educational_value": "High - good critical thinking development",
+            "final_scores": self.debate_scores
+        })
+    
+    def _schedule_chunk_summaries(self):
+        """Submit summaries for every full feedback_history chunk not yet summarized."""
+        if self._summary_executor is None:
+            self._summary_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="critique-map")
+        
+        while True:
+            start = len(self.chunk_summaries) * self.CHUNK_SIZE
+            chunk = self.feedback_history[start:start + self.CHUNK_SIZE]
+            if len(chunk) < self.CHUNK_SIZE:
+                break
+            self.chunk_summaries.append(self._summary_executor.submit(self._summarize_chunk, chunk, start))
+    
+    def _summarize_chunk(self, critiques: List[Dict[str, Any]], offset: int) -> Dict[str, Any]:
+        """
+        Summarize a chunk of per-turn critiques (the map step).
+        
+        Args:
+            critiques: Consecutive feedback_history entries
+            offset: Index of the first entry in feedback_history
+            
+        Returns:
+            Dict with the covered turns, average scores per speaker and a summary
+        """
+        lines = "\n".join(
+            f"- {c['speaker']} ({c['context']}): scores {c['scores']}; {c['feedback']}" for c in critiques
+        )
+        summary_prompt = f"""
+        Summarize these critiques from part of a debate on: {self.current_topic}
+        
+        {lines}
+        
+        In 3-4 sentences, note recurring strengths, recurring weaknesses and how each
+        participant's performance changed across these turns.
+        """
+        
+        # This would use the LLM to summarize the chunk
+        summary = self._complete("summarize_chunk", summary_prompt,
+                                 lambda: " ".join(dict.fromkeys(c["feedback"] for c in critiques)))
+        
+        return {
+            "turns": [offset + 1, offset + len(critiques)],
+            "average_scores": self._average_scores([{c["speaker"]: c["scores"]} for c in critiques]),
+            "summary": summary
+        }
+    
+    async def _amerge_summaries(self, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine several chunk summaries into one covering all their turns."""
+        merge_prompt = f"""
+        Combine these partial summaries of a debate on {self.current_topic} into one:
+        
+        {chr(10).join(s["summary"] for s in summaries)}
+        
+        Keep it to 3-4 sentences.
+        """
+        
+        # This would use the LLM to merge the summaries
+        merged = await self._acomplete("merge_summaries", merge_prompt,
+                                       lambda: " ".join(dict.fromkeys(s["summary"] for s in summaries)))
+        
+        return {
+            "turns": [summaries[0]["turns"][0], summaries[-1]["turns"][1]],
+            "average_scores": self._average_scores([s["average_scores"] for s in summaries]),
+            "summary": merged
+        }
+    
+    def _average_scores(self, score_sets: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+        """Average per-criterion scores for each speaker across several {speaker: scores} dicts."""
+        average_scores = {}
+        for speaker in ("user", "debator"):
+            parts = [scores[speaker] for scores in score_sets if speaker in scores]
+            if parts:
+                average_scores[speaker] = {
+                    criterion: round(sum(p[criterion] for p in parts) / len(parts), 2)
+                    for criterion in parts[0]
+                }
+        return average_scores
+    
+    async def _amap_reduce_evaluation(self) -> Dict[str, Any]:
+        """Reduce the per-chunk summaries into the final evaluation."""
+        self._schedule_chunk_summaries()
+        summaries = [await asyncio.wrap_future(future) for future in self.chunk_summaries]
+        # The trailing partial chunk is summarized for this evaluation only: it stays
+        # out of chunk_summaries so the chunk is summarized whole once it fills up
+        start = len(self.chunk_summaries) * self.CHUNK_SIZE
+        tail = self.feedback_history[start:]
+        if tail:
+            summaries.append(await asyncio.wrap_future(
+                self._summary_executor.submit(self._summarize_chunk, tail, start)))
+        
+        # Merge level by level until the summaries fit in one reduce prompt
+        while len(summaries) > self.CHUNK_SIZE:
+            groups = [summaries[i:i + self.CHUNK_SIZE] for i in range(0, len(summaries), self.CHUNK_SIZE)]
+            summaries = list(await asyncio.gather(*(self._amerge_summaries(group) for group in groups)))
+        
+        reduce_prompt = f"""
+        Provide a final evaluation of this debate from summaries of its critiques:
         
         Topic: {self.current_topic}
-        Debate History: {debate_history}
+        Summaries: {summaries}
         Final Scores: {self.debate_scores}
         
         Include:
@@ -146,14 +422,14 @@ class CritiqueAgent:
         """
         
         # This would use the LLM to generate the final evaluation
-        return {
+        return await self._acomplete("final_evaluation", reduce_prompt, lambda: {
             "overall_quality": "Good",
             "user_strengths": ["Clear communication", "Engaged participation"],
             "debator_strengths": ["Strong argument structure", "Good evidence use"],
             "improvement_areas": ["More specific examples", "Better counter-arguments"],
             "educational_value": "High - good critical thinking development",
             "final_scores": self.debate_scores
-        }
+        })
     
     def track_debate_quality(self, argument_pair: Tuple[str, str]) -> Dict[str, Any]:
         """
@@ -163,8 +439,13 @@ class CritiqueAgent:
             argument_pair: Tuple of (user_argument, debator_response)
             
         Returns:
-            Analysis of the exchange quality
+            Analysis of the exchange quality; {"skipped": True, ...} if the call
+            was skipped to stay within the token budget
         """
+        return run_sync(self.atrack_debate_quality(argument_pair))
+    
+    async def atrack_debate_quality(self, argument_pair: Tuple[str, str]) -> Dict[str, Any]:
+        """Async counterpart of track_debate_quality."""
         user_arg, debator_resp = argument_pair
         
         exchange_analysis = f"""
@@ -183,13 +464,16 @@ class CritiqueAgent:
         """
         
         # This would use the LLM to analyze the exchange
-        return {
+        analysis = await self._acomplete("track_debate_quality", exchange_analysis, lambda: {
             "exchange_quality": 8,
             "response_adequacy": 7,
             "argument_development": 8,
             "educational_value": 9,
             "feedback": "Good exchange that developed the argument well."
-        }
+        }, optional=True)
+        if analysis is None:
+            return {"skipped": True, "feedback": "Exchange analysis skipped to stay within the token budget."}
+        return analysis
     
     def identify_logical_fallacies(self, argument: str) -> List[str]:
         """
@@ -201,6 +485,14 @@ class CritiqueAgent:
         Returns:
             List of identified logical fallacies
         """
+        return run_sync(self.aidentify_logical_fallacies(argument))
+    
+    async def aidentify_logical_fallacies(self, argument: str) -> List[str]:
+        """Async counterpart of identify_logical_fallacies."""
+        if self.fused_critique:
+            critique = await self._aany_critique(argument)
+            return list(critique["fallacies"])
+        
         fallacy_prompt = f"""
         Analyze this argument for logical fallacies:
         "{argument}"
@@ -217,7 +509,7 @@ class CritiqueAgent:
         """
         
         # This would use the LLM to identify fallacies
-        return []  # No fallacies found in this example
+        return await self._acomplete("identify_logical_fallacies", fallacy_prompt, lambda: [])  # No fallacies found in this example
     
     def suggest_improvements(self, argument: str, speaker: str) -> List[str]:
         """
@@ -230,6 +522,14 @@ class CritiqueAgent:
         Returns:
             List of specific improvement suggestions
         """
+        return run_sync(self.asuggest_improvements(argument, speaker))
+    
+    async def asuggest_improvements(self, argument: str, speaker: str) -> List[str]:
+        """Async counterpart of suggest_improvements."""
+        if self.fused_critique:
+            critique = await self._aany_critique(argument, speaker)
+            return list(critique["suggestions"])
+        
         improvement_prompt = f"""
         Suggest improvements for this argument by {speaker}:
         "{argument}"
@@ -244,11 +544,11 @@ class CritiqueAgent:
         """
         
         # This would use the LLM to generate suggestions
-        return [
+        return await self._acomplete("suggest_improvements", improvement_prompt, lambda: [
             "Add specific statistics to support your claim",
             "Address potential counter-arguments more directly",
             "Provide concrete examples to illustrate your point"
-        ]
+        ])
     
     def get_current_scores(self) -> Dict[str, Any]:
         """Get the current debate scores."""
@@ -256,8 +556,74 @@ class CritiqueAgent:
     
     def reset_scores(self):
         """Reset all scores for a new debate."""
+        # Summaries of the previous debate that have not started yet are no longer needed,
+        # unless a forked debate shares them
+        for future in getattr(self, "chunk_summaries", ForkableList()).unshared():
+            future.cancel()
         self.debate_scores = {
             "user": {"argument_quality": 0, "evidence_use": 0, "logical_structure": 0, "total": 0},
             "debator": {"argument_quality": 0, "evidence_use": 0, "logical_structure": 0, "total": 0}
         }
-        self.feedback_history = [] 
\ No newline at end of file
+        self.feedback_history = ForkableList()
+        # Futures for summaries of completed feedback_history chunks, filled in the
+        # background during the debate so the final evaluation only has to reduce
+        self.chunk_summaries = ForkableList()
+        with self._critique_lock:
+            self._critique_cache.clear()
+    
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Capture the per-debate state as a JSON-serializable dict.
+        
+        Waits for pending chunk summaries.
+        """
+        return {
+            "current_topic": self.current_topic,
+            "debate_scores": {speaker: dict(scores) for speaker, scores in self.debate_scores.items()},
+            "feedback_history": list(self.feedback_history),
+            "chunk_summaries": [future.result() for future in self.chunk_summaries]
+        }
+    
+    def load_state(self, state: Dict[str, Any]):
+        """Restore per-debate state captured by export_state."""
+        self.reset_scores()
+        self.current_topic = state["current_topic"]
+        self.debate_scores = {speaker: dict(scores) for speaker, scores in state["debate_scores"].items()}
+        self.feedback_history = ForkableList(state["feedback_history"])
+        for summary in state["chunk_summaries"]:
+            future = Future()
+            future.set_result(summary)
+            self.chunk_summaries.append(future)
+    
+    def checkpoint(self) -> Dict[str, Any]:
+        """Snapshot the running scores and mark how far the feedback has grown, for fork_from."""
+        return {
+            "debate_scores": {speaker: dict(scores) for speaker, scores in self.debate_scores.items()},
+            "feedback_history": len(self.feedback_history)
+        }
+    
+    def fork_from(self, other: "CritiqueAgent", checkpoint: Dict[str, Any]):
+        """
+        Continue another critique's debate from an earlier point.
+        
+        Feedback and the chunk summaries covering it are shared with the other
+        instance copy-on-write, so the final evaluation of either debate reuses
+        the summaries of their common prefix.
+        
+        Args:
+            other: The CritiqueAgent to branch from
+            checkpoint: Output of other.checkpoint() at the point to branch from
+        """
+        self.reset_scores()
+        self.current_topic = other.current_topic
+        self.debate_scores = {speaker: dict(scores) for speaker, scores in checkpoint["debate_scores"].items()}
+        length = checkpoint["feedback_history"]
+        self.feedback_history = other.feedback_history.fork(length)
+        # Only summaries of full chunks inside the shared prefix carry over
+        self.chunk_summaries = other.chunk_summaries.fork(min(len(other.chunk_summaries), length // self.CHUNK_SIZE))
+    
+    def close(self):
+        """Stop the background summary workers."""
+        if self._summary_executor is not None:
+            self._summary_executor.shutdown(wait=False)
+            self._summary_executor = None
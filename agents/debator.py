@@ -1,17 +1,66 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, Iterator, List
+import asyncio
 import os
 from dotenv import load_dotenv
 
+from agents.backends import chat_model_for
+from agents.base import BaseAgent, run_sync
+from utils.evidence_store import format_snippets
+from utils.forkable import ForkableList
+from utils.cassette import get_cassette
+from utils.opening_cache import get_opening_cache
+
 load_dotenv()
 
-class DebatorAgent:
+class DebatorAgent(BaseAgent):
+    SESSION_ATTRIBUTES = BaseAgent.SESSION_ATTRIBUTES + ("evidence_store",)
+    
+    # Local EvidenceStore set by the owning session; None means arguments are ungrounded
+    evidence_store = None
+    
+    # Bump when the opening prompt changes so cached openings from the old prompt are not served
+    OPENING_PROMPT_VERSION = 1
+    
+    # Hooks that give each pre-generated opening variant a different angle
+    OPENING_STYLES = [
+        "a striking fact or statistic",
+        "a short real-world example",
+        "a question that frames the stakes",
+        "the strongest objection to your side, answered"
+    ]
+    
+    ARGUMENT_CONTEXT_TEMPLATE = """
+        Debate Topic: {topic}
+        Your Stance: {stance}
+        
+        Previous arguments in this debate:
+        {history}
+        
+        User's latest argument: "{user_argument}"
+        
+        Local sources (cite by id when you use them):
+        {sources}
+        """
+    
+    ARGUMENT_INSTRUCTIONS = """
+        Build a compelling argument that:
+        1. Acknowledges the user's points respectfully
+        2. Provides strong evidence and reasoning for your position
+        3. Addresses potential counter-arguments
+        4. Maintains focus on the core topic
+        5. Uses clear, logical structure
+        
+        Structure your response with:
+        - A brief acknowledgment of their points
+        - Your main argument with supporting evidence
+        - A question or challenge to continue the debate
+        
+        Keep it educational and constructive.
+        """
+    
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL", "gpt-4"),
-            temperature=float(os.getenv("TEMPERATURE", "0.7"))
-        )
+        self.llm = chat_model_for(self.__class__.__name__, float(os.getenv("TEMPERATURE", "0.7")))
         
         self.agent = Agent(
             role="Expert Debator",
@@ -24,9 +73,14 @@ class DebatorAgent:
             llm=self.llm
         )
         
-        self.debate_history = []
+        self.reset_state()
+    
+    def reset_state(self):
+        """Clear per-debate state so the instance can host a new debate."""
+        self.debate_history = ForkableList()
         self.current_topic = ""
         self.current_stance = ""
+        self.citations = ForkableList()
     
     def initialize_debate(self, topic: str, stance: str) -> str:
         """
@@ -39,10 +93,92 @@ class DebatorAgent:
         Returns:
             Opening statement for the debate
         """
+        return run_sync(self.ainitialize_debate(topic, stance))
+    
+    async def ainitialize_debate(self, topic: str, stance: str) -> str:
+        """Async counterpart of initialize_debate."""
         self.current_topic = topic
         self.current_stance = stance
+        self.citations = ForkableList()
+        
+        if self.evidence_store is not None:
+            self.evidence_store.prefetch(topic)
+        
+        # Popular topics open instantly from pre-generated variants
+        cache = self._opening_cache()
+        model = self.model_for("initialize_debate")
+        style = ""
+        if cache is not None:
+            cached = cache.get(topic, stance, model, self.OPENING_PROMPT_VERSION)
+            if cached is not None:
+                return cached
+            # Until the key is full, each miss adds a variant with a hook of its own
+            style = self._opening_style(cache.stored(topic, stance, model, self.OPENING_PROMPT_VERSION))
+        
+        # This would use the LLM to generate the opening statement
+        opening = await self._acomplete("initialize_debate", self._opening_prompt(topic, stance, style),
+                                        lambda: self._placeholder_opening(topic, stance, style))
         
-        opening_prompt = f"""
+        if cache is not None and cache.add(topic, stance, model, self.OPENING_PROMPT_VERSION, opening):
+            await asyncio.to_thread(cache.save)
+        return opening
+    
+    def prewarm_openings(self, topic: str, stance: str) -> int:
+        """
+        Generate opening variants for a topic and stance until its cache key is full.
+        
+        Args:
+            topic: The debate topic
+            stance: "for" or "against" the topic
+            
+        Returns:
+            Number of variants added (the caller saves the cache)
+        """
+        return run_sync(self.aprewarm_openings(topic, stance))
+    
+    async def aprewarm_openings(self, topic: str, stance: str) -> int:
+        """Async counterpart of prewarm_openings."""
+        cache = self._opening_cache()
+        if cache is None:
+            return 0
+        
+        added = 0
+        model = self.model_for("initialize_debate")
+        stored = cache.stored(topic, stance, model, self.OPENING_PROMPT_VERSION)
+        for index in range(stored, stored + cache.missing(topic, stance, model, self.OPENING_PROMPT_VERSION)):
+            style = self._opening_style(index)
+            # This would use the LLM to generate the opening statement
+            opening = await self._acomplete("initialize_debate", self._opening_prompt(topic, stance, style),
+                                            lambda: self._placeholder_opening(topic, stance, style))
+            if cache.add(topic, stance, model, self.OPENING_PROMPT_VERSION, opening):
+                added += 1
+        return added
+    
+    @staticmethod
+    def _opening_cache():
+        """
+        The opening cache, unless a cassette is active.
+        
+        The hook in the opening prompt depends on how many variants the cache
+        holds, so a cached run would not replay the prompts it recorded.
+        """
+        if get_cassette() is not None:
+            return None
+        return get_opening_cache()
+    
+    def _opening_style(self, variant: int) -> str:
+        """The hook for a key's variant-th opening, so a key's variants open differently."""
+        return self.OPENING_STYLES[variant % len(self.OPENING_STYLES)]
+    
+    def _placeholder_opening(self, topic: str, stance: str, style: str) -> str:
+        if style:
+            return f"I'm ready to debate {stance} the topic: '{topic}'. Let me open with {style}."
+        return f"I'm ready to debate {stance} the topic: '{topic}'. Let's begin with a thoughtful discussion."
+    
+    def _opening_prompt(self, topic: str, stance: str, style: str = "") -> str:
+        """Build the opening statement prompt, optionally asking for a particular hook."""
+        hook = f"\n        Open with {style}.\n" if style else ""
+        return f"""
         You are debating the topic: "{topic}"
         Your stance is: {stance.upper()}
         
@@ -51,12 +187,9 @@ class DebatorAgent:
         2. Introduces 2-3 key arguments you'll develop
         3. Sets a respectful and educational tone
         4. Invites the opponent to respond
-        
+        {hook}
         Keep it concise but impactful (2-3 paragraphs max).
         """
-        
-        # This would use the LLM to generate the opening statement
-        return f"I'm ready to debate {stance} the topic: '{topic}'. Let's begin with a thoughtful discussion."
     
     def build_argument(self, user_argument: str = "") -> str:
         """
@@ -68,37 +201,56 @@ class DebatorAgent:
         Returns:
             A well-structured counter-argument or supporting argument
         """
-        context = f"""
-        Debate Topic: {self.current_topic}
-        Your Stance: {self.current_stance.upper()}
-        
-        Previous arguments in this debate:
-        {self._format_debate_history()}
-        
-        User's latest argument: "{user_argument}"
+        return run_sync(self.abuild_argument(user_argument))
+    
+    async def abuild_argument(self, user_argument: str = "") -> str:
+        """Async counterpart of build_argument."""
+        # This would use the LLM to generate the argument
+        return await self._acomplete("build_argument", self._argument_prompt(user_argument),
+                                     self._placeholder_argument)
+    
+    def stream_argument(self, user_argument: str = "") -> Iterator[str]:
         """
+        Build an argument like build_argument, yielding it as it is generated.
         
-        argument_prompt = f"""
-        {context}
-        
-        Build a compelling argument that:
-        1. Acknowledges the user's points respectfully
-        2. Provides strong evidence and reasoning for your position
-        3. Addresses potential counter-arguments
-        4. Maintains focus on the core topic
-        5. Uses clear, logical structure
-        
-        Structure your response with:
-        - A brief acknowledgment of their points
-        - Your main argument with supporting evidence
-        - A question or challenge to continue the debate
-        
-        Keep it educational and constructive.
+        Args:
+            user_argument: The user's argument or statement
+            
+        Yields:
+            Consecutive pieces of the argument text
         """
-        
-        # This would use the LLM to generate the argument
+        # This would stream the argument from the LLM
+        return self._stream("build_argument", self._argument_prompt(user_argument),
+                            self._placeholder_argument)
+    
+    def astream_argument(self, user_argument: str = "") -> AsyncIterator[str]:
+        """Async counterpart of stream_argument."""
+        # This would stream the argument from the async client
+        return self._astream("build_argument", self._argument_prompt(user_argument),
+                             self._placeholder_argument)
+    
+    def _placeholder_argument(self) -> str:
+        """Placeholder argument until LLM generation is wired in."""
         return f"I understand your perspective on {self.current_topic}. Let me build on that with additional considerations..."
     
+    def _argument_prompt(self, user_argument: str) -> str:
+        """Build the build_argument prompt, trimming history to fit the context window."""
+        context_template = self.ARGUMENT_CONTEXT_TEMPLATE
+        instructions = self.ARGUMENT_INSTRUCTIONS
+        
+        sources = format_snippets(self._ground("build_argument", user_argument or self.current_topic, k=2))
+        
+        # Long debates are trimmed to the most recent turns that fit the context window
+        fixed_context = context_template.format(topic=self.current_topic, stance=self.current_stance.upper(),
+                                                history="", user_argument=user_argument, sources=sources)
+        history = self._fit_history(self.debate_history, fixed_context + instructions)
+        context = context_template.format(topic=self.current_topic, stance=self.current_stance.upper(),
+                                          history=self._format_debate_history(history), user_argument=user_argument,
+                                          sources=sources)
+        return f"""
+        {context}
+        {instructions}"""
+    
     def respond_to_counter(self, counter_argument: str) -> str:
         """
         Respond to a counter-argument from the user.
@@ -109,6 +261,10 @@ class DebatorAgent:
         Returns:
             A response that addresses the counter-argument
         """
+        return run_sync(self.arespond_to_counter(counter_argument))
+    
+    async def arespond_to_counter(self, counter_argument: str) -> str:
+        """Async counterpart of respond_to_counter."""
         response_prompt = f"""
         The user has provided this counter-argument: "{counter_argument}"
         
@@ -126,7 +282,8 @@ class DebatorAgent:
         """
         
         # This would use the LLM to generate the response
-        return f"That's an interesting counter-point. Let me address that by considering..."
+        return await self._acomplete("respond_to_counter", response_prompt,
+                                     lambda: "That's an interesting counter-point. Let me address that by considering...")
     
     def provide_evidence(self, claim: str) -> str:
         """
@@ -138,11 +295,20 @@ class DebatorAgent:
         Returns:
             Evidence and reasoning to support the claim
         """
+        return run_sync(self.aprovide_evidence(claim))
+    
+    async def aprovide_evidence(self, claim: str) -> str:
+        """Async counterpart of provide_evidence."""
+        snippets = self._ground("provide_evidence", claim, k=3)
+        
         evidence_prompt = f"""
         You need to provide evidence for this claim: "{claim}"
         
         In the context of debating {self.current_stance} the topic: {self.current_topic}
         
+        Local sources (prefer these over memory, and cite them by id):
+        {format_snippets(snippets)}
+        
         Provide:
         1. Relevant facts and statistics
         2. Expert opinions or studies
@@ -153,7 +319,22 @@ class DebatorAgent:
         """
         
         # This would use the LLM to generate evidence
-        return f"Here's compelling evidence to support that claim: [Evidence would be generated here]"
+        if snippets:
+            grounded = "\n".join(f"- {s['text']} [{s['id']}]" for s in snippets)
+            return await self._acomplete("provide_evidence", evidence_prompt,
+                                         lambda: f"Here's evidence from our sources to support that claim:\n{grounded}")
+        return await self._acomplete("provide_evidence", evidence_prompt,
+                                     lambda: "Here's compelling evidence to support that claim: [Evidence would be generated here]")
+    
+    def _ground(self, method: str, query: str, k: int) -> List[Dict[str, Any]]:
+        """Look up local evidence snippets for a query and record them for citation audits."""
+        if self.evidence_store is None:
+            return []
+        
+        snippets = self.evidence_store.lookup(self.current_topic, query, k)
+        for snippet in snippets:
+            self.citations.append({"method": method, "query": query, "id": snippet["id"], "score": snippet["score"]})
+        return snippets
     
     def summarize_position(self) -> str:
         """
@@ -162,6 +343,10 @@ class DebatorAgent:
         Returns:
             A summary of the key arguments and current state
         """
+        return run_sync(self.asummarize_position())
+    
+    async def asummarize_position(self) -> str:
+        """Async counterpart of summarize_position."""
         summary_prompt = f"""
         Summarize the current state of the debate:
         Topic: {self.current_topic}
@@ -177,19 +362,58 @@ class DebatorAgent:
         """
         
         # This would use the LLM to generate the summary
-        return f"Let me summarize our discussion on {self.current_topic}..."
+        return await self._acomplete("summarize_position", summary_prompt,
+                                     lambda: f"Let me summarize our discussion on {self.current_topic}...")
     
-    def _format_debate_history(self) -> str:
-        """Format the debate history for context."""
-        if not self.debate_history:
+    def _format_debate_history(self, entries: List[str] = None) -> str:
+        """Format the debate history (or a trimmed slice of it) for context."""
+        if entries is None:
+            entries = self.debate_history
+        if not entries:
             return "No previous arguments yet."
         
         formatted = []
-        for i, entry in enumerate(self.debate_history, 1):
+        for i, entry in enumerate(entries, 1):
             formatted.append(f"{i}. {entry}")
         
         return "\n".join(formatted)
     
     def add_to_history(self, argument: str, speaker: str):
         """Add an argument to the debate history."""
-        self.debate_history.append(f"{speaker}: {argument}") 
\ No newline at end of file
+        self.debate_history.append(f"{speaker}: {argument}")
+    
+    def export_state(self) -> Dict[str, Any]:
+        """Capture the per-debate state as a JSON-serializable dict."""
+        return {
+            "current_topic": self.current_topic,
+            "current_stance": self.current_stance,
+            "debate_history": list(self.debate_history),
+            "citations": list(self.citations)
+        }
+    
+    def load_state(self, state: Dict[str, Any]):
+        """Restore per-debate state captured by export_state."""
+        self.current_topic = state["current_topic"]
+        self.current_stance = state["current_stance"]
+        self.debate_history = ForkableList(state["debate_history"])
+        self.citations = ForkableList(state["citations"])
+    
+    def checkpoint(self) -> Dict[str, int]:
+        """Mark how far the per-debate state has grown, for fork_from."""
+        return {"debate_history": len(self.debate_history), "citations": len(self.citations)}
+    
+    def fork_from(self, other: "DebatorAgent", checkpoint: Dict[str, int]):
+        """
+        Continue another Debator's debate from an earlier point.
+        
+        The history and citations up to the checkpoint are shared with the
+        other instance copy-on-write rather than copied.
+        
+        Args:
+            other: The Debator to branch from
+            checkpoint: Output of other.checkpoint() at the point to branch from
+        """
+        self.current_topic = other.current_topic
+        self.current_stance = other.current_stance
+        self.debate_history = other.debate_history.fork(checkpoint["debate_history"])
+        self.citations = other.citations.fork(checkpoint["citations"])
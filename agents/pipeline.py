@@ -0,0 +1,298 @@
+import asyncio
+import os
+import time
+from typing import Dict, Any, Awaitable, Optional, Tuple
+
+from agents.debator import DebatorAgent
+from agents.critique import CritiqueAgent
+from agents.round_controller import RoundController, get_round_controller
+from agents.streaming_critique import StreamingCritique
+from utils import events
+from utils.cancellation import CancelScope, Cancelled
+from utils.events import EventBus
+
+class DebatePipeline:
+    """
+    Runs a debate as stages connected by async queues.
+
+    User arguments fan out to the generation stage (Debator response) and the
+    critique stage (scoring) at the same time. Every stage reports progress on
+    the event bus, so front-ends render whatever is ready without waiting on
+    slower stages.
+
+    With streaming on, the Debator's response is published chunk by chunk and
+    a provisional critique is updated sentence by sentence as it arrives, so
+    provisional scores are ready the moment generation finishes.
+    
+    Agent calls use the agents' async methods, so every stage of every
+    pipeline runs on the one event loop without worker threads.
+    
+    The debate runs under a cancel scope and each round under a child scope.
+    Cancelling either one, or a round running past its deadline, aborts the
+    LLM calls and streams in flight for it. The round then ends with a
+    round_cancelled event instead of an error.
+    
+    A RoundController decides which critique calls each round needs. It skips
+    critiques of repetitive arguments whose scores have settled, and exchange
+    tracking when the Debator's critique was skipped. It only asks for
+    mid-debate feedback when a score shifts.
+    """
+
+    def __init__(self, debator: DebatorAgent, critique: CritiqueAgent, bus: EventBus, stream: bool = True,
+                 scope: Optional[CancelScope] = None, round_timeout: Optional[float] = None,
+                 controller: Optional[RoundController] = None):
+        """
+        Args:
+            debator: Agent generating the Debator's side
+            critique: Agent scoring both sides
+            bus: Bus the stages publish their events on
+            stream: Whether the Debator's response is streamed
+            scope: Cancel scope for the whole debate (a new one by default)
+            round_timeout: Deadline in seconds for each round's work (ROUND_TIMEOUT_SECONDS by default, 0 for none)
+            controller: Decides which critique calls each round needs (ROUND_CONTROLLER by default;
+                None with ROUND_CONTROLLER=fixed runs every call every round)
+        """
+        self.debator = debator
+        self.critique = critique
+        self.bus = bus
+        self.stream = stream
+        self.scope = scope if scope is not None else CancelScope("debate")
+        if round_timeout is None:
+            round_timeout = float(os.getenv("ROUND_TIMEOUT_SECONDS", "0"))
+        self.round_timeout = round_timeout or None
+        self.controller = controller if controller is not None else get_round_controller()
+
+        self.topic = ""
+        self.stance = ""
+        self.history = []
+        self.round_count = 0
+        self.error: Optional[BaseException] = None
+
+        self._generation_queue = asyncio.Queue()
+        self._critique_queue = asyncio.Queue()
+        self._rounds = {}
+        self._tasks = []
+
+    async def _call(self, method: str, call: Awaitable[Any]) -> Any:
+        """Await an agent call and report its latency."""
+        start = time.perf_counter()
+        result = await call
+        self.bus.publish(events.AGENT_CALL, method=method, latency_ms=(time.perf_counter() - start) * 1000)
+        return result
+
+    async def start(self, topic: str, stance: str) -> str:
+        """
+        Generate the opening statement and start the pipeline stages.
+
+        Args:
+            topic: The debate topic
+            stance: The Debator's stance, "for" or "against"
+
+        Returns:
+            The Debator's opening statement
+        """
+        self.topic = topic
+        self.stance = stance
+        self.critique.current_topic = topic
+        self.critique.reset_scores()
+
+        self._tasks = [
+            asyncio.create_task(self._generation_stage()),
+            asyncio.create_task(self._critique_stage()),
+        ]
+
+        with self.scope.activate():
+            opening = await self._call("initialize_debate", self.debator.ainitialize_debate(topic, stance))
+        self.history.append(f"Debator: {opening}")
+        self.bus.publish(events.OPENING, round=0, text=opening)
+        return opening
+
+    async def submit(self, argument: str) -> int:
+        """
+        Submit the user's argument for the next round.
+
+        Returns:
+            The round number the argument belongs to
+        """
+        if self.error is not None:
+            raise self.error
+
+        self.round_count += 1
+        round_number = self.round_count
+        # User critique, Debator critique and exchange tracking must all finish
+        self._rounds[round_number] = {
+            "pending": 3,
+            "done": asyncio.Event(),
+            "scope": self.scope.child(f"round {round_number}", self.round_timeout),
+            "cancelled": False
+        }
+
+        self.history.append(f"User: {argument}")
+        self.bus.publish(events.USER_ARGUMENT, round=round_number, text=argument)
+
+        await self._generation_queue.put((round_number, argument))
+        await self._critique_queue.put(("user", round_number, argument))
+        return round_number
+
+    async def wait_round(self, round_number: int) -> bool:
+        """
+        Wait until every stage has finished the given round.
+
+        Returns:
+            False if the round was cancelled before it completed
+        """
+        state = self._rounds[round_number]
+        await state["done"].wait()
+        if self.error is not None:
+            raise self.error
+        return not state["cancelled"]
+
+    def cancel_round(self, round_number: int, reason: str = "round cancelled"):
+        """Abort the work still running for a round."""
+        self._rounds[round_number]["scope"].cancel(reason)
+
+    def cancel(self, reason: str = "debate cancelled"):
+        """Abort everything in flight for the debate; later calls under its scope fail fast."""
+        self.scope.cancel(reason)
+
+    async def evaluate(self) -> Dict[str, Any]:
+        """Run the final evaluation over the debate history."""
+        with self.scope.activate():
+            evaluation = await self._call("final_evaluation", self.critique.afinal_evaluation(list(self.history)))
+        self.bus.publish(events.FINAL_EVALUATION, evaluation=evaluation)
+        return evaluation
+
+    async def close(self, reason: str = "debate closed"):
+        """Abort outstanding work, stop the stages and tell subscribers the debate is over."""
+        self.scope.cancel(reason)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.bus.publish(events.DEBATE_ENDED, rounds=self.round_count)
+
+    def _finish_step(self, round_number: int):
+        """Mark one stage's work for a round as done."""
+        state = self._rounds[round_number]
+        if state["cancelled"]:
+            return
+        state["pending"] -= 1
+        if state["pending"] == 0:
+            converged = self.controller is not None and self.controller.converged()
+            self.bus.publish(events.ROUND_COMPLETE, round=round_number, converged=converged)
+            state["scope"].close()
+            state["done"].set()
+
+    def _abandon_round(self, round_number: int, error: Cancelled):
+        """End a cancelled round; its remaining stage work is skipped."""
+        state = self._rounds[round_number]
+        if state["cancelled"]:
+            return
+        state["cancelled"] = True
+        state["scope"].close()
+        self.bus.publish(events.ROUND_CANCELLED, round=round_number, reason=str(error))
+        state["done"].set()
+
+    def _fail(self, error: BaseException):
+        """Record a stage failure and release everyone waiting on a round."""
+        self.error = error
+        self.bus.publish(events.ERROR, error=str(error), error_type=type(error).__name__)
+        for state in self._rounds.values():
+            state["done"].set()
+
+    async def _generation_stage(self):
+        """Consume user arguments and produce Debator responses."""
+        while True:
+            round_number, argument = await self._generation_queue.get()
+            state = self._rounds[round_number]
+            try:
+                state["scope"].check()
+                with state["scope"].activate():
+                    if self.stream:
+                        response, provisional = await self._call("build_argument",
+                                                                 self._stream_response(round_number, argument))
+                    else:
+                        response = await self._call("build_argument", self.debator.abuild_argument(argument))
+            except Cancelled as e:
+                self._abandon_round(round_number, e)
+                continue
+            except Exception as e:
+                self._fail(e)
+                return
+
+            self.history.append(f"Debator: {response}")
+            if self.stream:
+                self.bus.publish(events.PROVISIONAL_CRITIQUE, round=round_number, speaker="debator",
+                                 analysis=provisional, final=True)
+            self.bus.publish(events.DEBATOR_RESPONSE, round=round_number, text=response)
+            await self._critique_queue.put(("debator", round_number, response))
+
+    async def _stream_response(self, round_number: int, argument: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Consume the Debator's streamed response, critiquing it as it arrives.
+
+        Returns:
+            Tuple of (full response text, provisional critique)
+        """
+        critique = StreamingCritique("debator")
+        parts = []
+        async for chunk in self.debator.astream_argument(argument):
+            parts.append(chunk)
+            completed = critique.feed(chunk)
+            self.bus.publish(events.DEBATOR_CHUNK, round=round_number, text=chunk)
+            if completed:
+                self.bus.publish(events.PROVISIONAL_CRITIQUE, round=round_number, speaker="debator",
+                                 analysis=critique.provisional(), final=False)
+        critique.finish()
+        return "".join(parts), critique.provisional()
+
+    async def _critique_stage(self):
+        """Score arguments as they arrive and track each completed exchange."""
+        arguments = {}
+        while True:
+            speaker, round_number, text = await self._critique_queue.get()
+            state = self._rounds[round_number]
+            if state["cancelled"]:
+                arguments.pop((round_number, "user"), None)
+                continue
+            context = (f"Round {round_number} of debate on {self.topic}" if speaker == "user"
+                       else f"Round {round_number} response")
+            try:
+                state["scope"].check()
+                if self.controller is None or self.controller.plan_critique(speaker, text):
+                    with state["scope"].activate():
+                        analysis = await self._call("analyze_argument",
+                                                    self.critique.aanalyze_argument(text, speaker, context))
+                else:
+                    analysis = self.controller.skipped_analysis(speaker, text)
+                if self.controller is not None:
+                    self.controller.record(speaker, analysis)
+                self.critique.update_scores(analysis, speaker)
+                self.bus.publish(events.CRITIQUE, round=round_number, speaker=speaker, analysis=analysis)
+                scores = {name: dict(values) for name, values in self.critique.get_current_scores().items()}
+                self.bus.publish(events.SCORES, round=round_number, scores=scores)
+                self._finish_step(round_number)
+
+                arguments[(round_number, speaker)] = text
+                if speaker == "debator":
+                    pair = (arguments.pop((round_number, "user")), arguments.pop((round_number, "debator")))
+                    if self.controller is None or self.controller.plan_exchange():
+                        with state["scope"].activate():
+                            exchange = await self._call("track_debate_quality", self.critique.atrack_debate_quality(pair))
+                    else:
+                        exchange = {"skipped": True, "feedback": "Exchange analysis skipped: the Debator's scores are stable."}
+                    self.bus.publish(events.EXCHANGE, round=round_number, analysis=exchange)
+                    
+                    if self.controller is not None and self.controller.feedback_due():
+                        with state["scope"].activate():
+                            feedback = await self._call("provide_mid_debate_feedback",
+                                                        self.critique.aprovide_mid_debate_feedback())
+                        if feedback:
+                            self.bus.publish(events.MID_DEBATE_FEEDBACK, round=round_number, feedback=feedback)
+                    self._finish_step(round_number)
+            except Cancelled as e:
+                arguments.pop((round_number, "user"), None)
+                self._abandon_round(round_number, e)
+            except Exception as e:
+                self._fail(e)
+                return
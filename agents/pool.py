@@ -0,0 +1,78 @@
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Type, TypeVar
+from dotenv import load_dotenv
+
+from agents.base import BaseAgent
+
+load_dotenv()
+
+AgentType = TypeVar("AgentType", bound=BaseAgent)
+
+class AgentPool:
+    """
+    Pre-warmed agent instances shared across debates.
+
+    Constructing an agent builds its LLM client and crewai Agent, which is
+    the expensive part and holds no per-debate state. Released instances
+    have their per-debate state reset and session wiring dropped, so
+    acquiring one for a new debate only allocates fresh state.
+    """
+
+    def __init__(self, max_idle: Optional[int] = None):
+        """
+        Args:
+            max_idle: Idle instances kept per agent class (AGENT_POOL_SIZE by default)
+        """
+        self.max_idle = max_idle if max_idle is not None else int(os.getenv("AGENT_POOL_SIZE", "4"))
+        self._lock = threading.Lock()
+        self._idle: Dict[type, List[BaseAgent]] = {}
+        self.stats = {"constructed": 0, "reused": 0, "released": 0, "discarded": 0}
+
+    def prewarm(self, agent_classes: Iterable[Type[BaseAgent]], count: int = 1):
+        """Construct idle instances until each class has `count` of them (capped at max_idle)."""
+        for agent_class in agent_classes:
+            with self._lock:
+                missing = min(count, self.max_idle) - len(self._idle.get(agent_class, []))
+            for _ in range(max(0, missing)):
+                agent = agent_class()
+                with self._lock:
+                    self.stats["constructed"] += 1
+                    self._idle.setdefault(agent_class, []).append(agent)
+
+    def acquire(self, agent_class: Type[AgentType]) -> AgentType:
+        """
+        Get an agent with clean per-debate state, reusing an idle one when possible.
+
+        Args:
+            agent_class: The agent class to get an instance of
+
+        Returns:
+            An agent instance owned by the caller until released
+        """
+        with self._lock:
+            idle = self._idle.get(agent_class)
+            if idle:
+                self.stats["reused"] += 1
+                return idle.pop()
+            self.stats["constructed"] += 1
+        return agent_class()
+
+    def release(self, agent: BaseAgent):
+        """Reset an agent and keep it for reuse, or discard it if the pool is full."""
+        agent.reset_state()
+        agent.detach()
+        with self._lock:
+            idle = self._idle.setdefault(type(agent), [])
+            if len(idle) < self.max_idle:
+                idle.append(agent)
+                self.stats["released"] += 1
+                return
+            self.stats["discarded"] += 1
+
+        close = getattr(agent, "close", None)
+        if close is not None:
+            close()
+
+# Shared by every session in the process
+agent_pool = AgentPool()
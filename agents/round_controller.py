@@ -0,0 +1,154 @@
+import os
+import re
+from typing import Dict, Any, List, Optional, Set
+
+from agents.streaming_critique import StreamingCritique
+
+# Words that carry an argument's content, for comparing arguments
+_CONTENT_WORD = re.compile(r"[a-z]{4,}")
+
+class RoundController:
+    """
+    Decides which critique calls a debate round actually needs.
+
+    Tracks each speaker's score totals and how novel each argument is
+    compared with the speaker's earlier ones. A critique is skipped when the
+    speaker's scores have been stable for the last few rounds and the new
+    argument mostly repeats earlier ones; the previous scores stand, with
+    fallacy cues from the local heuristic critique. A skipped critique is
+    never repeated more than max_skips times in a row, so a stable speaker
+    is still re-measured now and then.
+
+    Exchange tracking runs only in rounds whose Debator critique ran, mid-debate
+    feedback only when a score has shifted since the last feedback, and the
+    debate counts as converged once both speakers' scores are stable and the
+    arguments have stopped bringing anything new.
+    """
+
+    STABLE_ROUNDS = 2
+    SCORE_TOLERANCE = 0.5
+    NOVELTY_THRESHOLD = 0.35
+    SHIFT_THRESHOLD = 1.0
+    MAX_SKIPS = 2
+    MIN_ROUNDS = 3
+
+    def __init__(self, stable_rounds: Optional[int] = None, score_tolerance: Optional[float] = None,
+                 novelty_threshold: Optional[float] = None, shift_threshold: Optional[float] = None,
+                 max_skips: Optional[int] = None):
+        """
+        Args:
+            stable_rounds: Rounds a speaker's total must stay within score_tolerance to count as stable
+            score_tolerance: Largest change in a total that still counts as stable
+            novelty_threshold: Arguments less novel than this (0-1) count as repeats
+            shift_threshold: Change in a total since the last mid-debate feedback that calls for new feedback
+            max_skips: Most consecutive critiques skipped for one speaker
+        """
+        self.stable_rounds = stable_rounds if stable_rounds is not None else self.STABLE_ROUNDS
+        self.score_tolerance = score_tolerance if score_tolerance is not None else self.SCORE_TOLERANCE
+        self.novelty_threshold = novelty_threshold if novelty_threshold is not None else self.NOVELTY_THRESHOLD
+        self.shift_threshold = shift_threshold if shift_threshold is not None else self.SHIFT_THRESHOLD
+        self.max_skips = max_skips if max_skips is not None else self.MAX_SKIPS
+
+        speakers = ("user", "debator")
+        self.totals: Dict[str, List[float]] = {speaker: [] for speaker in speakers}
+        self.novelty: Dict[str, List[float]] = {speaker: [] for speaker in speakers}
+        self._arguments: Dict[str, List[Set[str]]] = {speaker: [] for speaker in speakers}
+        self._scores: Dict[str, Dict[str, Any]] = {}
+        self._skips = {speaker: 0 for speaker in speakers}
+        self._feedback_baseline: Optional[Dict[str, float]] = None
+        self.stats = {"critiques": 0, "critiques_skipped": 0, "exchanges_skipped": 0, "feedback": 0}
+
+    def _novelty(self, speaker: str, words: Set[str]) -> float:
+        """1 minus the highest word overlap (Jaccard) with the speaker's earlier arguments."""
+        overlap = 0.0
+        for earlier in self._arguments[speaker]:
+            union = words | earlier
+            if union:
+                overlap = max(overlap, len(words & earlier) / len(union))
+        return round(1.0 - overlap, 3)
+
+    def stable(self, speaker: str) -> bool:
+        """Whether the speaker's total has stayed within the tolerance for the last stable_rounds rounds."""
+        totals = self.totals[speaker]
+        if len(totals) <= self.stable_rounds:
+            return False
+        recent = totals[-self.stable_rounds - 1:]
+        return all(abs(later - earlier) <= self.score_tolerance for earlier, later in zip(recent, recent[1:]))
+
+    def plan_critique(self, speaker: str, text: str) -> bool:
+        """
+        Decide whether an argument needs a model critique, and remember it.
+
+        Returns:
+            True to critique it; False to use skipped_analysis instead
+        """
+        words = set(_CONTENT_WORD.findall(text.lower()))
+        novelty = self._novelty(speaker, words)
+        self._arguments[speaker].append(words)
+        self.novelty[speaker].append(novelty)
+
+        if (speaker in self._scores and self.stable(speaker) and novelty < self.novelty_threshold
+                and self._skips[speaker] < self.max_skips):
+            self._skips[speaker] += 1
+            self.stats["critiques_skipped"] += 1
+            return False
+        self._skips[speaker] = 0
+        self.stats["critiques"] += 1
+        return True
+
+    def skipped_analysis(self, speaker: str, text: str) -> Dict[str, Any]:
+        """Stand-in for a skipped critique: the previous scores plus heuristic fallacy cues."""
+        heuristic = StreamingCritique(speaker)
+        heuristic.feed(text)
+        heuristic.finish()
+        return {
+            "scores": dict(self._scores[speaker]),
+            "feedback": "This argument closely follows earlier ones and the scores have been stable, "
+                        "so the previous scores stand.",
+            "fallacies": heuristic.fallacies,
+            "suggestions": ["Bring in a new point or new evidence to move the debate forward"],
+            "skipped": True
+        }
+
+    def record(self, speaker: str, analysis: Dict[str, Any]):
+        """Add a round's analysis (from the model or skipped_analysis) to the speaker's score history."""
+        self._scores[speaker] = dict(analysis["scores"])
+        self.totals[speaker].append(analysis["scores"]["total"])
+
+    def plan_exchange(self) -> bool:
+        """Whether this round's exchange is worth tracking: only if the Debator's critique ran."""
+        if self._skips["debator"]:
+            self.stats["exchanges_skipped"] += 1
+            return False
+        return True
+
+    def feedback_due(self) -> bool:
+        """
+        Whether a score has shifted enough since the last mid-debate feedback to give more.
+
+        The first call only sets the baseline the later shifts are measured from.
+        """
+        current = {speaker: totals[-1] for speaker, totals in self.totals.items() if totals}
+        if self._feedback_baseline is None:
+            self._feedback_baseline = current
+            return False
+        shifted = any(abs(total - self._feedback_baseline.get(speaker, total)) >= self.shift_threshold
+                      for speaker, total in current.items())
+        if shifted:
+            self._feedback_baseline = current
+            self.stats["feedback"] += 1
+        return shifted
+
+    def converged(self) -> bool:
+        """Whether both speakers' scores are stable and the latest arguments were repeats."""
+        rounds = min(len(self.novelty["user"]), len(self.novelty["debator"]))
+        if rounds < self.MIN_ROUNDS:
+            return False
+        return (self.stable("user") and self.stable("debator")
+                and max(self.novelty["user"][-1], self.novelty["debator"][-1]) < self.novelty_threshold)
+
+def get_round_controller() -> Optional[RoundController]:
+    """A controller for a new debate, or None when ROUND_CONTROLLER=fixed runs every call every round."""
+    if os.getenv("ROUND_CONTROLLER", "adaptive") == "fixed":
+        return None
+    return RoundController()
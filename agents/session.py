@@ -0,0 +1,197 @@
+import itertools
+from typing import Dict, Any, Optional
+
+from agents.debator import DebatorAgent
+from agents.critique import CritiqueAgent
+from agents.pool import agent_pool
+from utils.cancellation import CancelScope
+from utils.debate_log import debate_record, get_debate_log
+from utils.forkable import ForkableList
+from utils.token_budget import TokenBudget
+
+class DebateSession:
+    """
+    One debate hosted headlessly: its agents plus the per-debate state.
+
+    A session round-trips through export_state / from_state, which lets a
+    SessionManager spill it to disk and restore it on its next input.
+    
+    Agent calls run under the session's cancel scope, so cancel() or close()
+    from another thread aborts a call in flight.
+
+    fork() branches the debate off any earlier round without replaying it.
+    """
+
+    def __init__(self, session_id: str, token_budget: Optional[TokenBudget] = None, evidence_store=None):
+        self.session_id = session_id
+        self.debator = agent_pool.acquire(DebatorAgent)
+        self.critique = agent_pool.acquire(CritiqueAgent)
+        self.debator.evidence_store = evidence_store
+        for agent in (self.debator, self.critique):
+            agent.session_id = session_id
+            agent.token_budget = token_budget
+
+        self.topic = ""
+        self.stance = ""
+        self.history = ForkableList()
+        self.round_count = 0
+        # State lengths and scores after the opening (index 0) and after each round
+        self.checkpoints = ForkableList()
+        self.scope = CancelScope(session_id)
+        self._fork_ids = itertools.count(1)
+
+    def start(self, topic: str, stance: str) -> str:
+        """
+        Open the debate.
+
+        Args:
+            topic: The debate topic
+            stance: The Debator's stance, "for" or "against"
+
+        Returns:
+            The Debator's opening statement
+        """
+        self.topic = topic
+        self.stance = stance
+        self.critique.current_topic = topic
+        self.critique.reset_scores()
+
+        with self.scope.activate():
+            opening = self.debator.initialize_debate(topic, stance)
+        self.debator.add_to_history(opening, "Debator")
+        self.history.append(f"Debator: {opening}")
+        self.checkpoints = ForkableList([self._checkpoint()])
+        return opening
+
+    def submit(self, argument: str) -> Dict[str, Any]:
+        """
+        Play one round: critique the user's argument and answer it.
+
+        Args:
+            argument: The user's argument
+
+        Returns:
+            Dict with the round number, the Debator's response, both analyses
+            and the running scores
+        """
+        self.round_count += 1
+        with self.scope.activate():
+            user_analysis = self.critique.analyze_argument(argument, "user",
+                                                           f"Round {self.round_count} of debate on {self.topic}")
+            self.critique.update_scores(user_analysis, "user")
+
+            response = self.debator.build_argument(argument)
+            self.debator.add_to_history(argument, "User")
+            self.debator.add_to_history(response, "Debator")
+            self.history.extend([f"User: {argument}", f"Debator: {response}"])
+
+            debator_analysis = self.critique.analyze_argument(response, "debator", f"Round {self.round_count} response")
+            self.critique.update_scores(debator_analysis, "debator")
+        self.checkpoints.append(self._checkpoint())
+
+        return {
+            "round": self.round_count,
+            "response": response,
+            "user_analysis": user_analysis,
+            "debator_analysis": debator_analysis,
+            "scores": self.critique.get_current_scores()
+        }
+
+    def evaluate(self) -> Dict[str, Any]:
+        """Run the final evaluation over the debate so far and log the debate for export."""
+        with self.scope.activate():
+            evaluation = self.critique.final_evaluation(list(self.history))
+        log = get_debate_log()
+        if log is not None:
+            log.append(debate_record(self.session_id, self.topic, self.stance, self.history, self.critique, evaluation))
+        return evaluation
+
+    def _checkpoint(self) -> Dict[str, Any]:
+        return {
+            "history": len(self.history),
+            "debator": self.debator.checkpoint(),
+            "critique": self.critique.checkpoint()
+        }
+
+    def fork(self, round_number: Optional[int] = None, session_id: Optional[str] = None) -> "DebateSession":
+        """
+        Branch the debate as it stood after a round.
+
+        The branch shares the transcript, the scores and the critique's chunk
+        summaries up to that round with this session copy-on-write: forking
+        copies none of them and makes no LLM calls, and neither session sees
+        rounds the other plays afterwards. The branch has its own agents and
+        cancel scope, so any number of branches can be played concurrently.
+
+        Args:
+            round_number: Round to branch after; 0 branches right after the opening,
+                None after the latest round
+            session_id: Id of the branch (default: "<session id>.<n>")
+
+        Returns:
+            A new session whose next submit() plays round round_number + 1
+
+        Raises:
+            ValueError: If the debate has not been started or the round has not been played
+        """
+        checkpoints = self.checkpoints
+        if not checkpoints:
+            raise ValueError(f"Session {self.session_id!r} has not started")
+        if round_number is None:
+            round_number = len(checkpoints) - 1
+        if not 0 <= round_number < len(checkpoints):
+            raise ValueError(f"Session {self.session_id!r} has no round {round_number} to fork from")
+        checkpoint = checkpoints[round_number]
+
+        branch = DebateSession(session_id or f"{self.session_id}.{next(self._fork_ids)}",
+                               token_budget=self.debator.token_budget, evidence_store=self.debator.evidence_store)
+        branch.topic = self.topic
+        branch.stance = self.stance
+        branch.history = self.history.fork(checkpoint["history"])
+        branch.round_count = round_number
+        branch.checkpoints = checkpoints.fork(round_number + 1)
+        branch.debator.fork_from(self.debator, checkpoint["debator"])
+        branch.critique.fork_from(self.critique, checkpoint["critique"])
+        return branch
+
+    def export_state(self) -> Dict[str, Any]:
+        """Capture everything needed to rebuild this session as a JSON-serializable dict."""
+        return {
+            "session_id": self.session_id,
+            "topic": self.topic,
+            "stance": self.stance,
+            "history": list(self.history),
+            "round_count": self.round_count,
+            "checkpoints": list(self.checkpoints),
+            "debator": self.debator.export_state(),
+            "critique": self.critique.export_state()
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], **kwargs) -> "DebateSession":
+        """
+        Rebuild a session from export_state output.
+
+        Args:
+            state: Output of export_state
+            **kwargs: Passed to the constructor (token_budget, evidence_store)
+        """
+        session = cls(state["session_id"], **kwargs)
+        session.topic = state["topic"]
+        session.stance = state["stance"]
+        session.history = ForkableList(state["history"])
+        session.round_count = state["round_count"]
+        session.checkpoints = ForkableList(state.get("checkpoints", []))
+        session.debator.load_state(state["debator"])
+        session.critique.load_state(state["critique"])
+        return session
+
+    def cancel(self, reason: str = "session cancelled"):
+        """Abort the agent call in flight, if any; later calls fail with Cancelled."""
+        self.scope.cancel(reason)
+
+    def close(self):
+        """Abort outstanding work and return the session's agents to the pool."""
+        self.scope.cancel("session closed")
+        agent_pool.release(self.debator)
+        agent_pool.release(self.critique)
@@ -0,0 +1,116 @@
+import re
+from typing import Dict, Any, List
+
+# Sentence boundary: terminal punctuation followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+_EVIDENCE = re.compile(
+    r"\d|%|\[[\w.-]+\]|\b(study|studies|research|data|evidence|survey|report|according to|for example|for instance)\b",
+    re.IGNORECASE
+)
+_REASONING = re.compile(
+    r"\b(because|therefore|thus|hence|since|consequently|as a result|however|although|whereas|which means)\b",
+    re.IGNORECASE
+)
+
+# Surface cues for common fallacies; the model critique confirms or clears them
+FALLACY_CUES = {
+    "appeal to popularity": re.compile(r"\b(everyone|everybody) (knows|agrees)\b|\bmost people (think|believe)\b", re.IGNORECASE),
+    "hasty generalization": re.compile(r"\b(always|never|every single|without exception)\b", re.IGNORECASE),
+    "false dilemma": re.compile(r"\beither\b.+\bor\b|\bthe only (option|way|choice)\b", re.IGNORECASE),
+    "slippery slope": re.compile(r"\b(inevitably lead|slippery slope|next thing you know)\b", re.IGNORECASE),
+    "ad hominem": re.compile(r"\b(you'?re (just|only|clearly)|people like you)\b", re.IGNORECASE),
+    "appeal to authority": re.compile(r"\bexperts (say|agree)\b|\bbecause (i|they) said so\b", re.IGNORECASE),
+}
+
+class StreamingCritique:
+    """
+    Provisional critique built sentence by sentence while an argument streams in.
+
+    Each completed sentence updates running feature counts (evidence markers,
+    reasoning connectives, fallacy cues), so provisional scores are available
+    as soon as the last chunk arrives. They are cheap heuristics shown until
+    the model critique replaces them.
+    """
+
+    def __init__(self, speaker: str = "debator"):
+        self.speaker = speaker
+        self.sentences = 0
+        self.words = 0
+        self.evidence = 0
+        self.reasoning = 0
+        self.questions = 0
+        self.fallacies = []
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Add streamed text and extract features from any sentences it completes.
+
+        Args:
+            chunk: The next piece of streamed text
+
+        Returns:
+            The sentences completed by this chunk
+        """
+        self._buffer += chunk
+        parts = _SENTENCE_END.split(self._buffer)
+        self._buffer = parts.pop()
+        for sentence in parts:
+            self._add_sentence(sentence)
+        return parts
+
+    def finish(self) -> List[str]:
+        """Treat any buffered text as the final sentence."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        if remainder:
+            self._add_sentence(remainder)
+            return [remainder]
+        return []
+
+    def _add_sentence(self, sentence: str):
+        self.sentences += 1
+        self.words += len(sentence.split())
+        self.evidence += 1 if _EVIDENCE.search(sentence) else 0
+        self.reasoning += 1 if _REASONING.search(sentence) else 0
+        self.questions += 1 if sentence.rstrip().endswith("?") else 0
+
+        for name, pattern in FALLACY_CUES.items():
+            match = pattern.search(sentence)
+            if match:
+                self.fallacies.append(f"{name}: \"{match.group(0)}\"")
+
+    def provisional(self) -> Dict[str, Any]:
+        """
+        Scores and fallacies for the text seen so far.
+
+        Returns:
+            Dict shaped like CritiqueAgent.analyze_argument's result, with
+            "provisional": True
+        """
+        sentences = max(1, self.sentences)
+        average_length = self.words / sentences
+
+        argument_quality = 3 + min(self.sentences, 4) + (1 if self.questions else 0) + (1 if 8 <= average_length <= 30 else 0)
+        evidence_use = 3 + 7 * min(1.0, 2 * self.evidence / sentences)
+        logical_structure = 3 + 7 * min(1.0, 2 * self.reasoning / sentences) - len(self.fallacies)
+
+        scores = {
+            "argument_quality": self._clamp(argument_quality),
+            "evidence_use": self._clamp(evidence_use),
+            "logical_structure": self._clamp(logical_structure),
+        }
+        scores["total"] = round(sum(scores.values()) / 3, 1)
+
+        return {
+            "scores": scores,
+            "feedback": f"Provisional: {self.sentences} sentences, {self.evidence} with evidence, "
+                        f"{self.reasoning} with explicit reasoning.",
+            "fallacies": list(self.fallacies),
+            "provisional": True
+        }
+
+    @staticmethod
+    def _clamp(value: float) -> float:
+        return round(min(10.0, max(1.0, float(value))), 1)
@@ -0,0 +1,93 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+
+from agents.pool import agent_pool
+from agents.topic_selector import TopicSelectorAgent
+from utils.scheduler import BACKGROUND
+
+def normalize_input(user_input: str) -> str:
+    """Normalize a topic-discovery answer for matching against speculated inputs."""
+    return re.sub(r"\s+", " ", user_input).strip().strip(".!?").lower()
+
+class TopicPrefetch:
+    """
+    Speculative topic generation for the answers a user is likely to give.
+
+    Generation starts in the background while the user is still reading the
+    welcome screen. take() hands back the result for a matching answer and
+    cancels the rest: queued work never starts, and results still in flight
+    are discarded.
+    """
+
+    def __init__(self, inputs: Iterable[str], configure: Optional[Callable[[TopicSelectorAgent], Any]] = None,
+                 max_workers: int = 2):
+        """
+        Args:
+            inputs: Answers to generate topics for ahead of time
+            configure: Called on each speculative agent to wire it into the session (budget, session id)
+            max_workers: Concurrent speculative generations
+        """
+        self.configure = configure
+        self._cancelled = threading.Event()
+        self._claimed = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="topic-prefetch")
+        self._futures = {}
+        for user_input in inputs:
+            key = normalize_input(user_input)
+            self._futures[key] = self._executor.submit(self._generate, key, user_input)
+        self.stats = {"hit": False, "cancelled": 0}
+
+    def _generate(self, key: str, user_input: str) -> Optional[List[str]]:
+        if self._cancelled.is_set() and key != self._claimed:
+            return None
+
+        # A pooled agent of its own, so speculation never shares one with the foreground
+        topic_selector = agent_pool.acquire(TopicSelectorAgent)
+        try:
+            if self.configure is not None:
+                self.configure(topic_selector)
+            # Speculative work yields to calls the user is actually waiting on
+            topic_selector.priority_class = BACKGROUND
+            # Cancellation may have come while the agent was being set up
+            if self._cancelled.is_set() and key != self._claimed:
+                return None
+            return topic_selector.generate_topics(user_input)
+        finally:
+            agent_pool.release(topic_selector)
+
+    def take(self, user_input: str) -> Optional[List[str]]:
+        """
+        Claim the speculated topics for the user's answer and cancel everything else.
+
+        Args:
+            user_input: The answer the user gave
+
+        Returns:
+            The generated topics, or None if that answer was not speculated on
+        """
+        self._claimed = normalize_input(user_input)
+        future = self._futures.pop(self._claimed, None)
+        self._cancel_pending()
+        result = future.result() if future is not None else None
+        self.cancel()
+        self.stats["hit"] = result is not None
+        return result
+
+    def cancel(self, wait: bool = False):
+        """
+        Stop speculative work; generations already sending finish and are discarded.
+
+        Args:
+            wait: Block until those generations have finished, so none outlives the session
+        """
+        self._cancel_pending()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _cancel_pending(self):
+        self._cancelled.set()
+        for future in self._futures.values():
+            if future.cancel():
+                self.stats["cancelled"] += 1
+        self._futures.clear()
@@ -1,18 +1,18 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
 from typing import Dict, Any, Optional
+import asyncio
 import os
 from dotenv import load_dotenv
 from typing import List
 
+from agents.backends import chat_model_for
+from agents.base import BaseAgent, run_sync
+
 load_dotenv()
 
-class TopicSelectorAgent:
+class TopicSelectorAgent(BaseAgent):
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL", "gpt-4"),
-            temperature=float(os.getenv("TEMPERATURE", "0.7"))
-        )
+        self.llm = chat_model_for(self.__class__.__name__, float(os.getenv("TEMPERATURE", "0.7")))
         
         self.agent = Agent(
             role="Topic Discovery Specialist",
@@ -35,6 +35,10 @@ class TopicSelectorAgent:
         Returns:
             List of suggested debate topics
         """
+        return run_sync(self.agenerate_topics(user_input))
+    
+    async def agenerate_topics(self, user_input: str) -> List[str]:
+        """Async counterpart of generate_topics."""
         try:
             # Create a task for the agent to generate topics
             task_description = f"""
@@ -57,7 +61,9 @@ class TopicSelectorAgent:
             """
             
             # Use the agent to generate topics
-            response = self.agent.execute_task(task_description)
+            # crewai's Agent has no async task API, so its synchronous call runs off the event loop
+            response = await self._acomplete("generate_topics", task_description,
+                                             lambda: asyncio.to_thread(self.agent.execute_task, task_description))
             
             # Parse the response to extract topics
             # The agent should return a list of topics
@@ -132,6 +138,10 @@ class TopicSelectorAgent:
         Returns:
             List of suggested debate topics
         """
+        return run_sync(self.aanalyze_resume_portfolio(content))
+    
+    async def aanalyze_resume_portfolio(self, content: str) -> list:
+        """Async counterpart of analyze_resume_portfolio."""
         analysis_prompt = f"""
         Analyze this resume/portfolio content and suggest 3-5 debate topics that would be relevant:
         
@@ -147,7 +157,8 @@ class TopicSelectorAgent:
         """
         
         # This would use the LLM to analyze and suggest topics
-        return ["Topic 1", "Topic 2", "Topic 3"]
+        return await self._acomplete("analyze_resume_portfolio", analysis_prompt,
+                                     lambda: ["Topic 1", "Topic 2", "Topic 3"])
     
     def confirm_stance(self, topic: str) -> str:
         """
@@ -0,0 +1,104 @@
+from crewai import Agent
+from typing import Dict, Any, List
+import os
+from dotenv import load_dotenv
+
+from agents.backends import chat_model_for
+from agents.base import BaseAgent, run_sync
+
+load_dotenv()
+
+PERSONAS = {
+    "curious_student": "a curious high-school student who asks questions and relies on everyday examples",
+    "skeptic": "a sharp skeptic who challenges every claim and demands evidence",
+    "policy_wonk": "a policy analyst who argues with statistics, costs and trade-offs",
+    "novice": "a first-time debater who makes short, sometimes vague arguments",
+}
+
+class UserSimulatorAgent(BaseAgent):
+    def __init__(self, stance: str, persona: str = "curious_student"):
+        self.llm = chat_model_for(self.__class__.__name__, float(os.getenv("TEMPERATURE", "0.7")))
+
+        self.persona = persona
+        self.persona_description = PERSONAS.get(persona, persona)
+
+        self.agent = Agent(
+            role="Simulated Debate Student",
+            goal="Play the human side of a debate convincingly so the debate system can be evaluated unattended",
+            backstory=f"""You are {self.persona_description}. You take part in practice debates against an
+            expert debator and stay in character for the whole session, arguing your assigned stance.""",
+            verbose=False,
+            allow_delegation=False,
+            llm=self.llm
+        )
+
+        self.stance = stance
+        self.current_topic = ""
+        self.debate_history = []
+
+    def start(self, topic: str):
+        """Prepare the simulated user for a new debate on the given topic."""
+        self.current_topic = topic
+        self.debate_history = []
+
+    def respond(self, debator_statement: str, round_number: int) -> str:
+        """
+        Produce the simulated user's argument for a round.
+
+        Args:
+            debator_statement: The Debator's latest statement
+            round_number: The current round (1-based)
+
+        Returns:
+            The simulated user's argument
+        """
+        return run_sync(self.arespond(debator_statement, round_number))
+    
+    async def arespond(self, debator_statement: str, round_number: int) -> str:
+        """Async counterpart of respond."""
+        argument_prompt = f"""
+        You are {self.persona_description}.
+        You are debating {self.stance.upper()} the topic: "{self.current_topic}"
+
+        Previous exchanges:
+        {self._format_debate_history()}
+
+        Your opponent just said: "{debator_statement}"
+
+        Write your argument for round {round_number}:
+        1. Stay in character
+        2. Respond to at least one of your opponent's points
+        3. Advance your own position with a reason or example
+
+        Keep it to one short paragraph.
+        """
+
+        # This would use the LLM to generate the argument
+        moves = self._get_rhetorical_moves()
+        move = moves[(round_number - 1) % len(moves)]
+        argument = await self._acomplete("respond", argument_prompt,
+                                         lambda: f"Arguing {self.stance} '{self.current_topic}', {move}")
+
+        self.debate_history.append(f"Debator: {debator_statement}")
+        self.debate_history.append(f"User: {argument}")
+        return argument
+
+    def _get_rhetorical_moves(self) -> List[str]:
+        """Canned argument shapes used until the LLM call is wired in."""
+        return [
+            "I think the benefits clearly outweigh the costs for most people.",
+            "your point ignores the people who would be hurt most by this.",
+            "the evidence from other countries shows this approach works.",
+            "even if you're right about the short term, the long-term effects matter more.",
+        ]
+
+    def _format_debate_history(self) -> str:
+        """Format the debate history for context."""
+        if not self.debate_history:
+            return "No previous arguments yet."
+
+        return "\n".join(f"{i}. {entry}" for i, entry in enumerate(self.debate_history, 1))
+
+    def get_profile(self) -> Dict[str, Any]:
+        """Describe the simulated user for transcripts."""
+        return {"persona": self.persona, "stance": self.stance}
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Debate Crew system
+Measures LLM requests, prompt tokens and wall time for agent workloads
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, Any, List
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+
+# Benchmarks measure the agents themselves, not the shared rate limiter
+os.environ.setdefault("LLM_RPM_LIMIT", "0")
+os.environ.setdefault("LLM_TPM_LIMIT", "0")
+
+from agents.critique import CritiqueAgent
+from utils.token_budget import TokenBudget
+
+load_dotenv()
+console = Console()
+
+SAMPLE_ARGUMENTS = [
+    "Coding should be mandatory because it teaches logical thinking and problem-solving skills.",
+    "Social media regulation protects teenagers from harmful content and addictive design.",
+    "Free college would reduce student debt and widen access to higher education.",
+    "Remote work improves productivity because employees avoid long commutes.",
+    "Electric vehicles cut emissions, especially as the grid moves to renewables.",
+]
+
+def _usage_totals(budget: TokenBudget) -> Dict[str, int]:
+    """Sum requests and tokens across all agent methods."""
+    report = budget.report()["per_method"]
+    return {
+        "requests": sum(entry["calls"] for entry in report.values()),
+        "prompt_tokens": sum(entry["prompt_tokens"] for entry in report.values()),
+        "completion_tokens": sum(entry["completion_tokens"] for entry in report.values()),
+    }
+
+def bench_critique(iterations: int) -> List[Dict[str, Any]]:
+    """
+    Full critique of each argument (scores, fallacies, suggestions) in separate and fused modes.
+
+    Args:
+        iterations: Number of passes over the sample arguments
+
+    Returns:
+        One result row per mode
+    """
+    rows = []
+    for mode in ("separate", "fused"):
+        critique = CritiqueAgent()
+        critique.fused_critique = mode == "fused"
+        critique.token_budget = TokenBudget(session_limit=10 ** 9, daily_limit=10 ** 9)
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            for argument in SAMPLE_ARGUMENTS:
+                # Vary the text per pass so each pass is a fresh argument
+                text = f"{argument} (pass {i})"
+                critique.analyze_argument(text, "user", "Benchmark")
+                critique.identify_logical_fallacies(text)
+                critique.suggest_improvements(text, "user")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        rows.append(dict(_usage_totals(critique.token_budget), name=f"critique ({mode})", wall_ms=elapsed_ms,
+                         arguments=iterations * len(SAMPLE_ARGUMENTS)))
+    return rows
+
+BENCHMARKS = {
+    "critique": bench_critique,
+}
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Run Debate Crew benchmarks")
+    parser.add_argument("--only", choices=list(BENCHMARKS), nargs="+", help="benchmarks to run")
+    parser.add_argument("--iterations", type=int, default=20, help="passes over the sample workload")
+    args = parser.parse_args()
+
+    table = Table(title="Benchmark Results")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Arguments", style="green")
+    table.add_column("LLM Requests", style="green")
+    table.add_column("Prompt Tokens", style="green")
+    table.add_column("Completion Tokens", style="green")
+    table.add_column("Wall (ms)", style="bold green")
+
+    for name in args.only or list(BENCHMARKS):
+        for row in BENCHMARKS[name](args.iterations):
+            table.add_row(row["name"], str(row["arguments"]), str(row["requests"]), str(row["prompt_tokens"]),
+                          str(row["completion_tokens"]), f"{row['wall_ms']:.1f}")
+
+    console.print(table)
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ Demo script for the Debate Crew system
 Shows how the three agents work together
 """
 
+import argparse
 import os
+import sys
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
@@ -13,6 +15,10 @@ from rich.text import Text
 from agents.topic_selector import TopicSelectorAgent
 from agents.debator import DebatorAgent
 from agents.critique import CritiqueAgent
+from agents.base import BaseAgent
+from agents.pool import agent_pool
+from utils.cassette import Cassette, use_cassette
+from utils.profiler import profiling
 
 load_dotenv()
 console = Console()
@@ -56,9 +62,9 @@ def demo_debate_round(topic, stance, user_argument):
     console.print(f"Topic: {topic}")
     console.print(f"User stance: {stance.upper()}")
     
-    # Initialize agents
-    debator = DebatorAgent()
-    critique = CritiqueAgent()
+    # Take pre-warmed agents from the pool
+    debator = agent_pool.acquire(DebatorAgent)
+    critique = agent_pool.acquire(CritiqueAgent)
     
     # User's argument
     console.print(f"\n[bold]User Argument:[/bold] {user_argument}")
@@ -83,12 +89,15 @@ def demo_debate_round(topic, stance, user_argument):
     console.print(f"Debator - Argument Quality: {debator_analysis['scores']['argument_quality']}")
     console.print(f"Debator - Evidence Use: {debator_analysis['scores']['evidence_use']}")
     console.print(f"Debator - Logical Structure: {debator_analysis['scores']['logical_structure']}")
+    
+    agent_pool.release(debator)
+    agent_pool.release(critique)
 
 def demo_final_evaluation():
     """Demo the final evaluation process."""
     console.print("\n[bold yellow]=== Final Evaluation Demo ===[/bold yellow]")
     
-    critique = CritiqueAgent()
+    critique = agent_pool.acquire(CritiqueAgent)
     
     # Simulate final evaluation using the agent
     try:
@@ -116,9 +125,33 @@ def demo_final_evaluation():
         
     except Exception as e:
         console.print(f"[red]Error in final evaluation demo: {e}[/red]")
+    finally:
+        agent_pool.release(critique)
 
 def main():
     """Run the demo."""
+    parser = argparse.ArgumentParser(description="Debate Crew demo")
+    parser.add_argument("--record", metavar="CASSETTE", help="record LLM responses to a cassette file")
+    parser.add_argument("--replay", metavar="CASSETTE", help="replay LLM responses from a cassette file")
+    parser.add_argument("--recorded-timing", action="store_true", help="replay at the recorded latency")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="sample the process per phase and write flamegraph-ready collapsed stacks to DIR")
+    args = parser.parse_args()
+    
+    with profiling(args.profile, console=console) as profiler:
+        if profiler is not None:
+            profiler.instrument(sys.modules[__name__], ["demo_topic_selection", "demo_debate_round", "demo_final_evaluation"])
+            for agent_class in BaseAgent.__subclasses__():
+                profiler.instrument(agent_class)
+        run_demo(args)
+
+def run_demo(args: argparse.Namespace):
+    """Run the demo phases with the parsed command-line options."""
+    if args.record:
+        use_cassette(Cassette(args.record, "record"))
+    elif args.replay:
+        use_cassette(Cassette(args.replay, "replay", "recorded" if args.recorded_timing else "fast"))
+    
     console.print(Panel(
         Text("🎭 Debate Crew Demo\n\nThis demo shows how the three agents work together:\n"
              "• Topic Selector: Discovers debate topics\n"
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Bulk export of finished debates for offline analytics
+Streams the debate log into sessions, turns and per-criterion score tables as
+compressed JSONL or Parquet parts, picking up where the previous export stopped
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+
+from utils.debate_log import DebateLog, get_debate_log
+
+load_dotenv()
+console = Console()
+
+TABLES = ("sessions", "turns", "scores")
+CRITERIA = ("argument_quality", "evidence_use", "logical_structure", "total")
+WATERMARK_FILE = "_watermark.json"
+
+def debate_rows(record: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Flatten one debate log record into rows of each table.
+
+    Scores are in long form, one row per criterion: per-turn critique scores
+    have stage "turn" and the running scores at the end have stage "final".
+    """
+    session_id = record["session_id"]
+    evaluation = record.get("evaluation") or {}
+    final_scores = record.get("final_scores") or {}
+
+    turns = []
+    for number, entry in enumerate(record["history"], 1):
+        speaker, _, text = entry.partition(": ")
+        turns.append({"session_id": session_id, "turn": number, "speaker": speaker,
+                      "text": text, "words": len(text.split())})
+
+    scores = []
+    for number, critique in enumerate(record.get("critiques", []), 1):
+        for criterion in CRITERIA:
+            scores.append({"session_id": session_id, "stage": "turn", "critique": number,
+                           "speaker": critique["speaker"], "context": critique["context"],
+                           "criterion": criterion, "score": critique["scores"].get(criterion)})
+    for speaker, values in final_scores.items():
+        for criterion in CRITERIA:
+            scores.append({"session_id": session_id, "stage": "final", "critique": None,
+                           "speaker": speaker, "context": "", "criterion": criterion,
+                           "score": values.get(criterion)})
+
+    session = {
+        "session_id": session_id,
+        "topic": record["topic"],
+        "stance": record["stance"],
+        "finished_at": record["finished_at"],
+        "turns": len(turns),
+        "user_total": final_scores.get("user", {}).get("total"),
+        "debator_total": final_scores.get("debator", {}).get("total"),
+        "evaluated": bool(evaluation),
+        "overall_quality": evaluation.get("overall_quality"),
+        "educational_value": evaluation.get("educational_value"),
+    }
+    return {"sessions": [session], "turns": turns, "scores": scores}
+
+class _PartWriter:
+    """Buffers one table's rows and writes them out as numbered part files."""
+
+    def __init__(self, output_dir: str, table: str, fmt: str, chunk_rows: int, start_offset: int):
+        self.directory = os.path.join(output_dir, table)
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        # Parts are named after the log offset the export started at, so a rerun
+        # of an interrupted export overwrites its parts instead of duplicating them
+        self.prefix = f"part-{start_offset:012d}"
+        self.rows: List[Dict[str, Any]] = []
+        self.parts = 0
+        self.written = 0
+        self.files: List[str] = []
+        os.makedirs(self.directory, exist_ok=True)
+
+    def add(self, rows: List[Dict[str, Any]]):
+        self.rows.extend(rows)
+        while len(self.rows) >= self.chunk_rows:
+            self._write(self.rows[:self.chunk_rows])
+            self.rows = self.rows[self.chunk_rows:]
+
+    def flush(self):
+        if self.rows:
+            self._write(self.rows)
+            self.rows = []
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        self.parts += 1
+        extension = "parquet" if self.fmt == "parquet" else "jsonl.gz"
+        path = os.path.join(self.directory, f"{self.prefix}-{self.parts:05d}.{extension}")
+        temp_path = f"{path}.tmp"
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.Table.from_pylist(rows), temp_path, compression="zstd")
+        else:
+            with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, separators=(",", ":")) + "\n")
+        os.replace(temp_path, path)
+        self.files.append(path)
+        self.written += len(rows)
+
+def read_watermark(output_dir: str) -> Dict[str, Any]:
+    """The watermark left by the last export to output_dir (offset 0 if there was none)."""
+    path = os.path.join(output_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {"offset": 0, "sessions": 0, "exported_at": None}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def export_debates(log: DebateLog, output_dir: str, fmt: str = "jsonl", chunk_rows: int = 10000,
+                   full: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Export debates logged since the last watermark.
+
+    Records are read one at a time and each table holds at most chunk_rows
+    rows before they are written out, so memory stays bounded however long
+    the log is. The watermark only moves once every part is on disk.
+
+    Args:
+        log: The debate log to export from
+        output_dir: Directory holding one subdirectory of parts per table, plus the watermark
+        fmt: "jsonl" (gzip-compressed JSON lines) or "parquet" (requires pyarrow)
+        chunk_rows: Rows per part file
+        full: Ignore the watermark and re-export everything, replacing earlier parts
+        limit: Stop after this many debates (the next export continues from there)
+
+    Returns:
+        Dict with the debates exported, rows and files per table and the new watermark
+    """
+    if fmt not in ("jsonl", "parquet"):
+        raise ValueError(f"Unknown export format {fmt!r}; expected jsonl or parquet")
+
+    os.makedirs(output_dir, exist_ok=True)
+    watermark = {"offset": 0, "sessions": 0} if full else read_watermark(output_dir)
+    if full:
+        for table in TABLES:
+            for path in glob.glob(os.path.join(output_dir, table, "part-*")):
+                os.remove(path)
+
+    start = watermark["offset"]
+    writers = {table: _PartWriter(output_dir, table, fmt, chunk_rows, start) for table in TABLES}
+    offset = start
+    exported = 0
+    for record, end in log.read(start):
+        if limit is not None and exported >= limit:
+            break
+        for table, rows in debate_rows(record).items():
+            writers[table].add(rows)
+        offset = end
+        exported += 1
+    for writer in writers.values():
+        writer.flush()
+
+    watermark = {"offset": offset, "sessions": watermark["sessions"] + exported, "exported_at": time.time()}
+    temp_path = os.path.join(output_dir, f"{WATERMARK_FILE}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(watermark, f)
+    os.replace(temp_path, os.path.join(output_dir, WATERMARK_FILE))
+
+    return {
+        "sessions": exported,
+        "rows": {table: writer.written for table, writer in writers.items()},
+        "files": {table: writer.files for table, writer in writers.items()},
+        "watermark": watermark,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Export finished debates for offline analytics")
+    parser.add_argument("--log", help="debate log to export (default: DEBATE_LOG_FILE)")
+    parser.add_argument("--output", default="debate_export", help="export directory")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--chunk-rows", type=int, default=10000, help="rows per part file")
+    parser.add_argument("--full", action="store_true", help="re-export everything, ignoring the watermark")
+    parser.add_argument("--limit", type=int, help="export at most this many debates")
+    args = parser.parse_args()
+
+    log = DebateLog(args.log) if args.log else get_debate_log()
+    if log is None:
+        parser.error("the debate log is disabled (set DEBATE_LOG_FILE or pass --log)")
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("Parquet export requires pyarrow (pip install pyarrow)")
+
+    started = time.perf_counter()
+    result = export_debates(log, args.output, args.format, args.chunk_rows, args.full, args.limit)
+
+    table = Table(title=f"Exported {result['sessions']} debates")
+    table.add_column("Table", style="cyan")
+    table.add_column("Rows", style="green")
+    table.add_column("Files", style="green")
+    for name in TABLES:
+        table.add_row(name, str(result["rows"][name]), str(len(result["files"][name])))
+    console.print(table)
+    console.print(f"[green]Watermark at byte {result['watermark']['offset']} of {log.path} "
+                  f"({time.perf_counter() - started:.1f}s)[/green]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Load test for the Debate Crew system
+Ramps up concurrent simulated users through the debate flow against a fake LLM backend
+and reports throughput, per-phase tail latency, queueing delay and memory per session
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import tracemalloc
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+
+# Simulated debates should not fill the opening cache or the analytics log
+os.environ.setdefault("OPENING_CACHE_FILE", "")
+os.environ.setdefault("DEBATE_LOG_FILE", "")
+
+from agents.backends import get_backend, use_backends
+from agents.critique import CritiqueAgent
+from agents.debator import DebatorAgent
+from agents.pipeline import DebatePipeline
+from agents.pool import agent_pool
+from agents.topic_selector import TopicSelectorAgent
+from utils.events import EventBus
+from utils.scheduler import scheduler
+from utils.stats import percentile
+from utils.token_budget import TokenBudget
+
+load_dotenv()
+console = Console()
+
+# Phases of a session, in the order a user goes through them
+PHASES = ("setup", "topic", "opening", "round", "final_evaluation")
+
+INTERESTS = ["technology", "education", "the environment", "health", "I'm not sure, surprise me"]
+
+ARGUMENTS = [
+    "This matters because the evidence shows clear benefits, for example a 2021 study found a 15% improvement.",
+    "The opposing view ignores the costs, which fall hardest on the people with the least say.",
+    "Experience in other countries shows the policy works when it is phased in gradually.",
+    "Therefore the burden of proof lies with those who want to keep the status quo.",
+    "Critics say it is too expensive, however the long-term savings outweigh the upfront cost.",
+]
+
+class _Stage:
+    """Measurements for one concurrency level."""
+
+    def __init__(self, users: int):
+        self.users = users
+        self.latencies: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+        self.active = 0
+        self.peak_active = 0
+        self.completed = 0
+        self.rounds = 0
+        self.errors: List[str] = []
+        self.loop_lag: List[float] = []
+        self.peak_memory = 0
+
+    def record(self, phase: str, started: float):
+        self.latencies[phase].append((time.perf_counter() - started) * 1000)
+
+async def _think(rng: random.Random, median: float):
+    """Pause like a user reading or typing: log-normal around the median."""
+    if median > 0:
+        await asyncio.sleep(median * rng.lognormvariate(0.0, 0.5))
+
+async def simulate_user(user_id: int, stage: _Stage, rounds: int, think_seconds: float, start_delay: float, seed: int):
+    """
+    One user's session: pick a topic, debate for some rounds and get the final evaluation.
+
+    Runs the same agent calls DebateCrew makes, through the same pipeline,
+    with think times between the user's turns.
+    """
+    rng = random.Random(seed * 100003 + user_id)
+    await asyncio.sleep(start_delay)
+
+    stage.active += 1
+    stage.peak_active = max(stage.peak_active, stage.active)
+    agents = []
+    pipeline = None
+    try:
+        # Constructing agents is CPU-bound, so a cold pool is paid for off the event loop
+        started = time.perf_counter()
+        for agent_class in (TopicSelectorAgent, DebatorAgent, CritiqueAgent):
+            agents.append(await asyncio.to_thread(agent_pool.acquire, agent_class))
+        topic_selector, debator, critique = agents
+        budget = TokenBudget()
+        for agent in agents:
+            agent.token_budget = budget
+            agent.session_id = f"load-{user_id}"
+        stage.record("setup", started)
+
+        await _think(rng, think_seconds)
+        started = time.perf_counter()
+        topics = await topic_selector.agenerate_topics(rng.choice(INTERESTS))
+        stage.record("topic", started)
+
+        await _think(rng, think_seconds)
+        pipeline = DebatePipeline(debator, critique, EventBus())
+        started = time.perf_counter()
+        await pipeline.start(rng.choice(topics), rng.choice(["for", "against"]))
+        stage.record("opening", started)
+
+        for _ in range(rounds):
+            # Users read the response and type their next argument
+            await _think(rng, think_seconds * 2)
+            started = time.perf_counter()
+            round_number = await pipeline.submit(rng.choice(ARGUMENTS))
+            await pipeline.wait_round(round_number)
+            stage.record("round", started)
+            stage.rounds += 1
+
+        started = time.perf_counter()
+        await pipeline.evaluate()
+        stage.record("final_evaluation", started)
+        stage.completed += 1
+    except Exception as e:
+        stage.errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        if pipeline is not None:
+            await pipeline.close()
+        for agent in agents:
+            agent_pool.release(agent)
+        stage.active -= 1
+
+async def _sample(stage: _Stage, baseline: int, interval: float = 0.1):
+    """Sample event-loop lag and traced memory until cancelled."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stage.loop_lag.append(max(0.0, time.perf_counter() - started - interval) * 1000)
+        if tracemalloc.is_tracing():
+            stage.peak_memory = max(stage.peak_memory, tracemalloc.get_traced_memory()[0] - baseline)
+
+async def run_stage(users: int, rounds: int, think_seconds: float, ramp_seconds: float, seed: int) -> Dict[str, Any]:
+    """
+    Run one concurrency level: `users` sessions started evenly over ramp_seconds.
+
+    Returns:
+        Dict with throughput, latency percentiles per phase, scheduler queueing
+        delay, event-loop lag and memory per session
+    """
+    stage = _Stage(users)
+    scheduler.reset_metrics()
+    baseline = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+    sampler = asyncio.create_task(_sample(stage, baseline))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        simulate_user(user_id, stage, rounds, think_seconds, ramp_seconds * user_id / users, seed)
+        for user_id in range(users)
+    ))
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    await asyncio.gather(sampler, return_exceptions=True)
+
+    queueing = scheduler.metrics()
+    return {
+        "users": users,
+        "completed": stage.completed,
+        "errors": len(stage.errors),
+        "error_samples": stage.errors[:5],
+        "wall_time_s": elapsed,
+        "sessions_per_s": stage.completed / elapsed if elapsed else 0.0,
+        "rounds_per_s": stage.rounds / elapsed if elapsed else 0.0,
+        "llm_calls": sum(entry["admitted"] for entry in queueing.values()),
+        "peak_active": stage.peak_active,
+        "latency_ms": {
+            phase: {"count": len(values), "p50": percentile(values, 50),
+                    "p95": percentile(values, 95), "p99": percentile(values, 99)}
+            for phase, values in stage.latencies.items()
+        },
+        "queueing_ms": queueing,
+        "loop_lag_ms": {"p50": percentile(stage.loop_lag, 50), "p99": percentile(stage.loop_lag, 99)},
+        "memory_per_session_kb": (stage.peak_memory / max(1, stage.peak_active) / 1024
+                                  if tracemalloc.is_tracing() else None),
+    }
+
+def find_saturation(results: List[Dict[str, Any]], efficiency: float = 0.8) -> Optional[int]:
+    """
+    The first level whose throughput per user fell below `efficiency` of the first level's.
+
+    Each simulated user offers the same load, so below saturation throughput grows
+    in proportion to the number of users.
+    """
+    if not results or not results[0]["sessions_per_s"]:
+        return None
+    per_user = results[0]["sessions_per_s"] / results[0]["users"]
+    for result in results[1:]:
+        if result["sessions_per_s"] / result["users"] < efficiency * per_user:
+            return result["users"]
+    return None
+
+def run_load_test(levels: List[int], rounds: int, think_seconds: float, ramp_seconds: float,
+                  seed: int = 0, on_stage=None) -> List[Dict[str, Any]]:
+    """
+    Run each concurrency level in turn.
+
+    Args:
+        levels: Concurrent users per stage, e.g. [10, 100, 1000]
+        rounds: Debate rounds per session
+        think_seconds: Median think time before each user action (typing takes twice as long)
+        ramp_seconds: Time over which each stage's users arrive
+        seed: Seed for user choices and think times
+        on_stage: Called with each stage's result as it finishes
+
+    Returns:
+        One result per level
+    """
+    results = []
+    for users in levels:
+        result = asyncio.run(run_stage(users, rounds, think_seconds, ramp_seconds, seed))
+        results.append(result)
+        if on_stage is not None:
+            on_stage(result)
+    return results
+
+def display_stage(result: Dict[str, Any]):
+    """Display one stage's results."""
+    console.print(f"\n[bold]{result['users']} users[/bold]: {result['completed']} sessions completed, "
+                  f"{result['errors']} errors in {result['wall_time_s']:.1f}s "
+                  f"({result['sessions_per_s']:.2f} sessions/s, {result['rounds_per_s']:.2f} rounds/s, "
+                  f"{result['llm_calls']} LLM calls)")
+    for error in result["error_samples"]:
+        console.print(f"[red]  {error}[/red]")
+
+    table = Table(title="Latency per Phase (ms)")
+    table.add_column("Phase", style="cyan")
+    table.add_column("Count", style="green")
+    table.add_column("p50", style="green")
+    table.add_column("p95", style="green")
+    table.add_column("p99", style="bold green")
+    for phase, stats in result["latency_ms"].items():
+        table.add_row(phase, str(stats["count"]), f"{stats['p50']:.0f}", f"{stats['p95']:.0f}", f"{stats['p99']:.0f}")
+    console.print(table)
+
+    queue_table = Table(title="Scheduler Queueing Delay (ms)")
+    queue_table.add_column("Priority", style="cyan")
+    queue_table.add_column("Calls", style="green")
+    queue_table.add_column("p50", style="green")
+    queue_table.add_column("p95", style="green")
+    queue_table.add_column("p99", style="bold green")
+    for name, stats in result["queueing_ms"].items():
+        queue_table.add_row(name, str(stats["admitted"]), f"{stats['wait_p50_ms']:.0f}",
+                            f"{stats['wait_p95_ms']:.0f}", f"{stats['wait_p99_ms']:.0f}")
+    console.print(queue_table)
+
+    memory = result["memory_per_session_kb"]
+    console.print(f"Event-loop lag p99: {result['loop_lag_ms']['p99']:.0f} ms  "
+                  f"Memory per session: {f'{memory:.0f} KB' if memory is not None else 'not traced'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp concurrent simulated users through the debate flow")
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 100, 1000], help="concurrent users per stage")
+    parser.add_argument("--rounds", type=int, default=3, help="debate rounds per session")
+    parser.add_argument("--think-seconds", type=float, default=3.0, help="median think time between user actions")
+    parser.add_argument("--ramp-seconds", type=float, default=10.0, help="time over which each stage's users arrive")
+    parser.add_argument("--latency-ms", type=float, help="median fake LLM latency (default: FAKE_LLM_LATENCY_MS)")
+    parser.add_argument("--jitter", type=float, help="spread of the fake LLM latency (default: FAKE_LLM_JITTER)")
+    parser.add_argument("--backend", default="fake", help="LLM backend to drive (default: fake)")
+    parser.add_argument("--rpm", type=int, help="requests per minute limit (default: LLM_RPM_LIMIT, 0 disables)")
+    parser.add_argument("--tpm", type=int, help="tokens per minute limit (default: LLM_TPM_LIMIT, 0 disables)")
+    parser.add_argument("--no-trace-memory", action="store_true", help="skip tracemalloc (faster, no memory figures)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    use_backends(args.backend)
+    if args.backend == "fake":
+        backend = get_backend("fake")
+        if args.latency_ms is not None:
+            backend.latency_ms = args.latency_ms
+        if args.jitter is not None:
+            backend.jitter = args.jitter
+    if args.rpm is not None or args.tpm is not None:
+        scheduler.set_limits(args.rpm, args.tpm)
+    if not args.no_trace_memory:
+        tracemalloc.start()
+
+    console.print(f"[cyan]Load testing {', '.join(map(str, args.users))} concurrent users "
+                  f"against the {args.backend} backend...[/cyan]")
+    results = run_load_test(args.users, args.rounds, args.think_seconds, args.ramp_seconds, args.seed, display_stage)
+
+    saturation = find_saturation(results)
+    if saturation is not None:
+        console.print(f"\n[yellow]Saturation: throughput per user dropped below 80% of the first stage's at {saturation} users[/yellow]")
+    else:
+        console.print("\n[green]No saturation: throughput grew with the number of users at every stage[/green]")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"stages": results, "saturation_users": saturation}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -6,36 +6,77 @@ An agentic debate system using CrewAI framework
 
 # TODO: The entire system has many static topics. We want to make it interactive. Frequently use agents to generate topics. 
 
+import argparse
+import asyncio
 import os
 import sys
+import threading
+import uuid
 from typing import Dict, Any, List
 from dotenv import load_dotenv
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
 
 # Import our agents
+from agents.base import BaseAgent
+from agents.pool import agent_pool
+from agents.topic_prefetch import TopicPrefetch
 from agents.topic_selector import TopicSelectorAgent
 from agents.debator import DebatorAgent
 from agents.critique import CritiqueAgent
+from agents.pipeline import DebatePipeline
+from utils import events
+from utils.events import EventBus
+from utils.token_budget import TokenBudget, TokenBudgetExceeded
+from utils.evidence_store import EvidenceStore
+from utils.debate_log import debate_record, get_debate_log
+from utils.single_flight import single_flight
+from utils.profiler import profiling
 
 # Load environment variables
 load_dotenv()
 
 class DebateCrew:
+    # Default answer to the topic-discovery prompt
+    DEFAULT_TOPIC_INPUT = "I'm not sure, help me discover a topic"
+    # Popular answers whose topics are generated speculatively along with the default
+    POPULAR_CATEGORIES = ["technology", "education", "environment"]
+    
     def __init__(self):
         self.console = Console()
-        self.topic_selector = TopicSelectorAgent()
-        self.debator = DebatorAgent()
-        self.critique = CritiqueAgent()
+        self.topic_selector = agent_pool.acquire(TopicSelectorAgent)
+        self.debator = agent_pool.acquire(DebatorAgent)
+        self.critique = agent_pool.acquire(CritiqueAgent)
+        
+        # One budget meters every agent call in this session, and the shared
+        # scheduler queues them fairly against other sessions
+        self.session_id = uuid.uuid4().hex[:8]
+        self.token_budget = TokenBudget()
+        for agent in (self.topic_selector, self.debator, self.critique):
+            agent.token_budget = self.token_budget
+            agent.session_id = self.session_id
+        
+        # Local sources the Debator grounds its arguments in
+        self.evidence_store = EvidenceStore()
+        self.debator.evidence_store = self.evidence_store
         
         self.current_topic = ""
         self.current_stance = ""
         self.debate_history = []
         self.is_debate_active = False
         
+        # Speculative topic generation started while the user reads the welcome screen
+        self.topic_prefetch = None
+        
+        # Live view of the Debator's streamed response and provisional scores
+        self._live = None
+        self._streamed_text = ""
+        self._provisional = None
+        
     def display_welcome(self):
         """Display welcome message and system overview."""
         welcome_text = Text()
@@ -64,16 +105,24 @@ class DebateCrew:
         
         # Get user input
         user_input = Prompt.ask(
-            "What topic would you like to debate, or what are your interests?",
-            default="I'm not sure, help me discover a topic"
+            "What topic would you like to debate, or what are your interests?\n"
+            f"(e.g. {', '.join(self.POPULAR_CATEGORIES)})",
+            default=self.DEFAULT_TOPIC_INPUT
         )
         
         # Use the Topic Selector agent to generate topics
         self.console.print("\n[cyan]Topic Selector Agent is researching and generating topics...[/cyan]")
         
         try:
+            # Reuse speculative topics if they were generated for this answer
+            suggested_topics = None
+            if self.topic_prefetch is not None:
+                suggested_topics = self.topic_prefetch.take(user_input)
+                self.topic_prefetch = None
+            
             # Get topics from the agent
-            suggested_topics = self.topic_selector.generate_topics(user_input)
+            if suggested_topics is None:
+                suggested_topics = self.topic_selector.generate_topics(user_input)
             
             if not suggested_topics:
                 self.console.print("[red]Error: Could not generate topics. Please try again.[/red]")
@@ -98,6 +147,9 @@ class DebateCrew:
             
             self.console.print(f"\n[green]Selected topic: {self.current_topic}[/green]")
             
+            # Retrieve supporting passages while the user picks a stance
+            self.evidence_store.prefetch(self.current_topic)
+            
             # Determine stance
             self.console.print("\n[bold]Now let's determine your stance:[/bold]")
             stance_choice = Prompt.ask(
@@ -129,71 +181,173 @@ class DebateCrew:
         self.console.print(f"Topic: {self.current_topic}")
         self.console.print(f"Your stance: {self.current_stance.upper()}\n")
         
-        # Initialize debate
-        opening_statement = self.debator.initialize_debate(self.current_topic, self.current_stance)
-        self.console.print(Panel(f"[bold]Debator Agent:[/bold]\n{opening_statement}", 
-                               title="Opening Statement", border_style="green"))
+        asyncio.run(self._run_debate())
+    
+    async def _run_debate(self):
+        """Drive the debate pipeline and render its events as they arrive."""
+        bus = EventBus()
+        event_stream = bus.subscribe()
+        pipeline = DebatePipeline(self.debator, self.critique, bus)
+        # Whatever ends the debate (exit, declining more rounds, Ctrl-C) aborts the work still in flight
+        close_reason = "interrupted"
         
-        self.debate_history.append(f"Debator: {opening_statement}")
+        try:
+            # Initialize debate
+            self.console.print("[cyan]Debator Agent is preparing an opening statement...[/cyan]")
+            await pipeline.start(self.current_topic, self.current_stance)
+            await self._render_until(event_stream, events.OPENING)
+            
+            self.is_debate_active = True
+            round_count = 1
+            
+            while self.is_debate_active:
+                self.console.print(f"\n[bold cyan]--- Round {round_count} ---[/bold cyan]")
+                
+                # Get user's argument without blocking the event loop
+                user_argument = await self._ask(Prompt.ask, "\n[bold]Your argument[/bold] (or type 'exit' to end debate)")
+                
+                if user_argument.lower() in ['exit', 'quit', 'end']:
+                    self.is_debate_active = False
+                    close_reason = "user ended the debate"
+                    break
+                
+                await pipeline.submit(user_argument)
+                await self._render_until(event_stream, events.ROUND_COMPLETE, events.ROUND_CANCELLED, events.ERROR)
+                
+                if isinstance(pipeline.error, TokenBudgetExceeded):
+                    self.console.print(f"\n[yellow]Token budget reached, ending the debate: {pipeline.error}[/yellow]")
+                    self.is_debate_active = False
+                    close_reason = "token budget reached"
+                    break
+                if pipeline.error is not None:
+                    raise pipeline.error
+                
+                round_count += 1
+                
+                # Check if user wants to continue, suggesting an end once the debate has converged
+                converged = pipeline.controller is not None and pipeline.controller.converged()
+                if converged:
+                    self.console.print("\n[yellow]Scores have settled and recent arguments repeat earlier points; "
+                                       "this may be a good place to end.[/yellow]")
+                if round_count > 3 or converged:  # After 3 rounds, ask if they want to continue
+                    continue_debate = await self._ask(Confirm.ask, f"\nContinue for more rounds?",
+                                                      default=not converged)
+                    if not continue_debate:
+                        self.is_debate_active = False
+                        close_reason = "user ended the debate"
+        finally:
+            await pipeline.close(close_reason)
+            if self._live is not None:
+                self._live.stop()
+                self._live = None
+            self.debate_history = pipeline.history
+    
+    @staticmethod
+    async def _ask(prompt, *args, **kwargs):
+        """
+        Ask the user on a daemon thread without blocking the event loop.
         
-        # Initialize critique agent
-        self.critique.current_topic = self.current_topic
-        self.critique.reset_scores()
+        Unlike asyncio.to_thread, a prompt left waiting on stdin after Ctrl-C
+        does not keep the process from exiting.
+        """
+        loop = asyncio.get_running_loop()
+        answer = loop.create_future()
         
-        self.is_debate_active = True
-        round_count = 1
+        def settle(result=None, error=None):
+            if answer.done():
+                return
+            if error is not None:
+                answer.set_exception(error)
+            else:
+                answer.set_result(result)
         
-        while self.is_debate_active:
-            self.console.print(f"\n[bold cyan]--- Round {round_count} ---[/bold cyan]")
-            
-            # Get user's argument
-            user_argument = Prompt.ask("\n[bold]Your argument[/bold] (or type 'exit' to end debate)")
-            
-            if user_argument.lower() in ['exit', 'quit', 'end']:
-                self.is_debate_active = False
-                break
-            
-            # Analyze user's argument
-            user_analysis = self.critique.analyze_argument(user_argument, "user", 
-                                                         f"Round {round_count} of debate on {self.current_topic}")
-            self.critique.update_scores(user_analysis, "user")
-            
-            self.debate_history.append(f"User: {user_argument}")
-            
-            # Display critique feedback
-            self.console.print(f"\n[dim]Critique: {user_analysis['feedback']}[/dim]")
-            
-            # Generate debator's response
-            debator_response = self.debator.build_argument(user_argument)
-            self.console.print(Panel(f"[bold]Debator Agent:[/bold]\n{debator_response}", 
-                                   title="Response", border_style="blue"))
-            
-            self.debate_history.append(f"Debator: {debator_response}")
-            
-            # Analyze debator's response
-            debator_analysis = self.critique.analyze_argument(debator_response, "debator",
-                                                            f"Round {round_count} response")
-            self.critique.update_scores(debator_analysis, "debator")
-            
-            # Track exchange quality
-            exchange_quality = self.critique.track_debate_quality((user_argument, debator_response))
-            
-            # Display current scores
+        def ask():
+            try:
+                result = prompt(*args, **kwargs)
+            except BaseException as e:
+                loop.call_soon_threadsafe(settle, None, e)
+            else:
+                loop.call_soon_threadsafe(settle, result)
+        
+        threading.Thread(target=ask, name="prompt", daemon=True).start()
+        return await answer
+    
+    async def _render_until(self, event_stream: asyncio.Queue, *stop_types: str):
+        """Render pipeline events until one of the given event types arrives."""
+        while True:
+            event = await event_stream.get()
+            self.render_event(event)
+            if event["type"] in stop_types:
+                return
+    
+    def render_event(self, event: Dict[str, Any]):
+        """Render a single pipeline event on the console."""
+        if event["type"] == events.OPENING:
+            self.console.print(Panel(f"[bold]Debator Agent:[/bold]\n{event['text']}", 
+                                   title="Opening Statement", border_style="green"))
+        elif event["type"] == events.USER_ARGUMENT:
+            self.console.print("[cyan]Debator Agent is responding while the Critique Agent scores your argument...[/cyan]")
+        elif event["type"] == events.CRITIQUE and event["speaker"] == "user":
+            self.console.print(f"\n[dim]Critique: {event['analysis']['feedback']}[/dim]")
+            for fallacy in event["analysis"].get("fallacies", []):
+                self.console.print(f"[dim yellow]Possible fallacy: {fallacy}[/dim yellow]")
+        elif event["type"] == events.DEBATOR_CHUNK:
+            # Stream the response and its provisional scores into one live view
+            if self._live is None:
+                self._streamed_text = ""
+                self._provisional = None
+                self._live = Live(self._streaming_view(), console=self.console, refresh_per_second=12)
+                self._live.start()
+            self._streamed_text += event["text"]
+            self._live.update(self._streaming_view())
+        elif event["type"] == events.PROVISIONAL_CRITIQUE:
+            self._provisional = event["analysis"]
+            if self._live is not None:
+                self._live.update(self._streaming_view())
+        elif event["type"] == events.DEBATOR_RESPONSE:
+            if self._live is not None:
+                self._streamed_text = event["text"]
+                self._live.update(self._streaming_view())
+                self._live.stop()
+                self._live = None
+            else:
+                self.console.print(Panel(f"[bold]Debator Agent:[/bold]\n{event['text']}", 
+                                       title="Response", border_style="blue"))
+            for fallacy in (self._provisional or {}).get("fallacies", []):
+                self.console.print(f"[dim yellow]Possible fallacy in response: {fallacy}[/dim yellow]")
+        elif event["type"] == events.MID_DEBATE_FEEDBACK:
+            self.console.print(Panel(event["feedback"], title="Mid-Debate Feedback", border_style="magenta"))
+        elif event["type"] == events.ROUND_COMPLETE:
             self.display_current_scores()
-            
-            round_count += 1
-            
-            # Check if user wants to continue
-            if round_count > 3:  # After 3 rounds, ask if they want to continue
-                continue_debate = Confirm.ask(f"\nContinue for more rounds?", default=True)
-                if not continue_debate:
-                    self.is_debate_active = False
+        elif event["type"] == events.ROUND_CANCELLED:
+            if self._live is not None:
+                self._live.stop()
+                self._live = None
+            self.console.print(f"[yellow]Round {event['round']} was cancelled: {event['reason']}[/yellow]")
+        elif event["type"] == events.ERROR and self._live is not None:
+            self._live.stop()
+            self._live = None
+    
+    def _streaming_view(self) -> Group:
+        """The Debator's response so far above the scores, with provisional Debator scores."""
+        scores = {name: dict(values) for name, values in self.critique.get_current_scores().items()}
+        title = "Current Debate Scores"
+        if self._provisional is not None:
+            scores["debator"] = self._provisional["scores"]
+            title += " (provisional)"
+        
+        return Group(
+            Panel(f"[bold]Debator Agent:[/bold]\n{self._streamed_text}", title="Response", border_style="blue"),
+            self._scores_table(scores, title)
+        )
     
     def display_current_scores(self):
         """Display current debate scores."""
-        scores = self.critique.get_current_scores()
-        
-        table = Table(title="Current Debate Scores")
+        self.console.print(self._scores_table(self.critique.get_current_scores(), "Current Debate Scores"))
+    
+    def _scores_table(self, scores: Dict[str, Any], title: str) -> Table:
+        """Build the scores table for the given per-participant scores."""
+        table = Table(title=title)
         table.add_column("Participant", style="cyan")
         table.add_column("Argument Quality", style="green")
         table.add_column("Evidence Use", style="green")
@@ -209,14 +363,22 @@ class DebateCrew:
                 str(score_data["total"])
             )
         
-        self.console.print(table)
+        return table
     
     def final_evaluation_phase(self):
         """Final evaluation and feedback phase."""
         self.console.print("\n[bold yellow]Phase 3: Final Evaluation[/bold yellow]")
         
         # Get final evaluation
-        final_eval = self.critique.final_evaluation(self.debate_history)
+        try:
+            final_eval = self.critique.final_evaluation(self.debate_history)
+        except TokenBudgetExceeded as e:
+            self.console.print(f"[yellow]Token budget reached, skipping the written evaluation: {e}[/yellow]")
+            self._log_debate(None)
+            self.display_current_scores()
+            self.display_token_usage()
+            return
+        self._log_debate(final_eval)
         
         # Display final results
         self.console.print(Panel(
@@ -241,12 +403,66 @@ class DebateCrew:
         
         for i, rec in enumerate(recommendations, 1):
             self.console.print(f"{i}. {rec}")
+        
+        self.display_token_usage()
+    
+    def _log_debate(self, evaluation: Dict[str, Any] = None):
+        """Append the finished debate to the debate log for export."""
+        log = get_debate_log()
+        if log is not None:
+            log.append(debate_record(self.session_id, self.current_topic, self.current_stance,
+                                     self.debate_history, self.critique, evaluation))
+    
+    def display_token_usage(self):
+        """Display token usage per agent method for this session."""
+        report = self.token_budget.report()
+        
+        table = Table(title="Token Usage")
+        table.add_column("Agent Method", style="cyan")
+        table.add_column("Calls", style="green")
+        table.add_column("Prompt", style="green")
+        table.add_column("Completion", style="green")
+        table.add_column("Skipped", style="yellow")
+        
+        for method, usage in sorted(report["per_method"].items()):
+            table.add_row(method, str(usage["calls"]), str(usage["prompt_tokens"]),
+                          str(usage["completion_tokens"]), str(usage["skipped"]))
+        
+        self.console.print(table)
+        self.console.print(f"[dim]Session: {report['session_tokens']}/{report['session_limit']} tokens, "
+                           f"today: {report['daily_tokens']}/{report['daily_limit']} tokens[/dim]")
+        
+        coalescing = single_flight.stats()
+        if coalescing["coalesced"]:
+            self.console.print(f"[dim]Coalesced requests (process-wide): {coalescing['coalesced']}/"
+                               f"{coalescing['requests']} ({coalescing['coalesce_rate']:.0%})[/dim]")
+    
+    def start_topic_prefetch(self):
+        """Start generating topics for the likely topic-discovery answers in the background."""
+        if os.getenv("TOPIC_PREFETCH", "on") == "off":
+            return
+        
+        def configure(agent):
+            agent.token_budget = self.token_budget
+            agent.session_id = self.session_id
+        
+        self.topic_prefetch = TopicPrefetch([self.DEFAULT_TOPIC_INPUT] + self.POPULAR_CATEGORIES, configure)
+    
+    def cancel_topic_prefetch(self, wait: bool = False):
+        """Drop any speculative topic generation that is still pending (waiting for in-flight ones if asked)."""
+        if self.topic_prefetch is not None:
+            self.topic_prefetch.cancel(wait)
+            self.topic_prefetch = None
     
     def run(self):
         """Main application loop."""
+        # Topics are generated while the user reads the welcome screen
+        self.start_topic_prefetch()
         self.display_welcome()
         
         if not self.check_environment():
+            self.cancel_topic_prefetch(wait=True)
+            self.close()
             return
         
         try:
@@ -262,6 +478,7 @@ class DebateCrew:
                 self.final_evaluation_phase()
                 
                 # Ask if user wants another debate
+                self.start_topic_prefetch()
                 another_debate = Confirm.ask("\nWould you like to start another debate?", default=False)
                 if not another_debate:
                     self.console.print("\n[green]Thank you for using Debate Crew! Goodbye![/green]")
@@ -272,16 +489,41 @@ class DebateCrew:
                 self.current_topic = ""
                 self.current_stance = ""
                 self.is_debate_active = False
+                self.token_budget.reset_session()
+                # The agents are kept; only their per-debate state is rebuilt
+                self.debator.reset_state()
+                self.critique.reset_state()
                 
         except KeyboardInterrupt:
             self.console.print("\n[yellow]Debate interrupted. Goodbye![/yellow]")
         except Exception as e:
             self.console.print(f"\n[red]An error occurred: {e}[/red]")
+        finally:
+            # The session is over, so no prefetch thread may outlive it
+            self.cancel_topic_prefetch(wait=True)
+            self.close()
+    
+    def close(self):
+        """Return the session's agents to the pool and stop the evidence prefetch worker."""
+        for agent in (self.topic_selector, self.debator, self.critique):
+            agent_pool.release(agent)
+        self.evidence_store.close()
 
 def main():
     """Main entry point."""
-    debate_crew = DebateCrew()
-    debate_crew.run()
+    parser = argparse.ArgumentParser(description="Debate Crew")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="sample the process per phase and write flamegraph-ready collapsed stacks to DIR")
+    args = parser.parse_args()
+    
+    with profiling(args.profile) as profiler:
+        if profiler is not None:
+            profiler.instrument(DebateCrew, ["topic_discovery_phase", "debate_phase", "final_evaluation_phase"])
+            for agent_class in BaseAgent.__subclasses__():
+                profiler.instrument(agent_class)
+        
+        debate_crew = DebateCrew()
+        debate_crew.run()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Pre-generate Debator opening statements
+Fills the opening cache for a topic list so debates on those topics open instantly
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from dotenv import load_dotenv
+from rich.console import Console
+
+from agents.debator import DebatorAgent
+from agents.pool import agent_pool
+from agents.topic_selector import TopicSelectorAgent
+from utils.opening_cache import get_opening_cache
+from utils.scheduler import BACKGROUND
+
+load_dotenv()
+console = Console()
+
+def prewarm(pairs: List[Tuple[str, str]], workers: int) -> int:
+    """
+    Fill the opening cache for every (topic, stance) pair.
+
+    Args:
+        pairs: Topic and stance combinations to pre-generate
+        workers: Concurrent generation threads
+
+    Returns:
+        Number of opening variants added
+    """
+    def fill(pair: Tuple[str, str]) -> int:
+        debator = agent_pool.acquire(DebatorAgent)
+        # Pre-generation must not delay interactive debates sharing the API key
+        debator.priority_class = BACKGROUND
+        try:
+            return debator.prewarm_openings(*pair)
+        finally:
+            agent_pool.release(debator)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(fill, pairs))
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate Debator opening statements")
+    parser.add_argument("--topics-file", help="file with one topic per line (default: built-in topics)")
+    parser.add_argument("--stances", nargs="+", choices=["for", "against"], default=["for", "against"])
+    parser.add_argument("--workers", type=int, default=4, help="concurrent generation threads")
+    args = parser.parse_args()
+
+    cache = get_opening_cache()
+    if cache is None:
+        parser.error("the opening cache is disabled (set OPENING_CACHE_FILE)")
+
+    if args.topics_file:
+        with open(args.topics_file, encoding="utf-8") as f:
+            topics = [line.strip() for line in f if line.strip()]
+    else:
+        topics = TopicSelectorAgent()._get_default_topics()
+
+    pairs = [(topic, stance) for topic in topics for stance in args.stances]
+    console.print(f"[cyan]Pre-generating up to {cache.variants} openings for {len(pairs)} topic/stance pairs...[/cyan]")
+
+    started = time.perf_counter()
+    added = prewarm(pairs, args.workers)
+    cache.save()
+    console.print(f"[green]Added {added} openings to {cache.path} in {time.perf_counter() - started:.1f}s[/green]")
+
+if __name__ == "__main__":
+    main()
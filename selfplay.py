@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Self-play runner for the Debate Crew system
+Runs full AI-vs-AI debates unattended for load testing, data generation and regression checks
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, Awaitable, List
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+
+from agents.topic_selector import TopicSelectorAgent
+from agents.debator import DebatorAgent
+from agents.critique import CritiqueAgent
+from agents.user_simulator import UserSimulatorAgent, PERSONAS
+from agents.pipeline import DebatePipeline
+from agents.pool import agent_pool
+from utils import events
+from utils.events import EventBus
+from utils.evidence_store import EvidenceStore
+from utils.scheduler import BATCH
+from utils.stats import percentile
+
+load_dotenv()
+console = Console()
+
+SCORE_CRITERIA = ["argument_quality", "evidence_use", "logical_structure", "total"]
+
+# One evidence index per worker process, shared by all debates it runs
+_evidence_store = None
+
+def _get_evidence_store() -> EvidenceStore:
+    """Return this process's evidence store, creating it on first use."""
+    global _evidence_store
+    if _evidence_store is None:
+        _evidence_store = EvidenceStore()
+    return _evidence_store
+
+async def _timed(latencies: Dict[str, List[float]], name: str, call: Awaitable[Any]):
+    """Await an agent call and record its latency in milliseconds under name."""
+    start = time.perf_counter()
+    result = await call
+    latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    return result
+
+def run_single_debate(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one complete self-play debate.
+
+    Args:
+        job: Dict with debate_id, topic, user_stance, persona and rounds
+
+    Returns:
+        Dict containing the transcript, per-round analyses, final evaluation and latencies
+    """
+    return asyncio.run(_run_debate(job))
+
+class _TranscriptRecorder:
+    """Headless subscriber that turns pipeline events into a self-play record."""
+
+    def __init__(self):
+        self.transcript = []
+        self.rounds = {}
+        self.latencies = {}
+        self.final_evaluation = None
+
+    def handle(self, event: Dict[str, Any]):
+        """Fold one pipeline event into the record."""
+        if event["type"] == events.OPENING:
+            self.transcript.append({"round": 0, "speaker": "debator", "text": event["text"]})
+        elif event["type"] == events.USER_ARGUMENT:
+            self.transcript.append({"round": event["round"], "speaker": "user", "text": event["text"]})
+        elif event["type"] == events.DEBATOR_RESPONSE:
+            self.transcript.append({"round": event["round"], "speaker": "debator", "text": event["text"]})
+        elif event["type"] == events.CRITIQUE:
+            entry = self.rounds.setdefault(event["round"], {"round": event["round"]})
+            entry[f"{event['speaker']}_scores"] = event["analysis"]["scores"]
+        elif event["type"] == events.EXCHANGE:
+            self.rounds.setdefault(event["round"], {"round": event["round"]})["exchange_quality"] = event["analysis"]
+        elif event["type"] == events.AGENT_CALL:
+            self.latencies.setdefault(event["method"], []).append(event["latency_ms"])
+        elif event["type"] == events.FINAL_EVALUATION:
+            self.final_evaluation = event["evaluation"]
+
+    async def drain(self, event_stream: asyncio.Queue, *stop_types: str):
+        """Consume events until one of the given types arrives."""
+        while True:
+            event = await event_stream.get()
+            self.handle(event)
+            if event["type"] in stop_types:
+                return
+
+async def _run_debate(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Drive one debate through the pipeline, recording it from the event stream."""
+    started = time.perf_counter()
+    recorder = _TranscriptRecorder()
+    record = {
+        "debate_id": job["debate_id"],
+        "topic": job["topic"],
+        "user_stance": job["user_stance"],
+        "persona": job["persona"],
+    }
+
+    debator = critique = None
+    try:
+        debator_stance = "against" if job["user_stance"] == "for" else "for"
+        # Workers run many debates, so agents are reused from the process's pool
+        debator = agent_pool.acquire(DebatorAgent)
+        debator.evidence_store = _get_evidence_store()
+        critique = agent_pool.acquire(CritiqueAgent)
+        user = UserSimulatorAgent(job["user_stance"], job["persona"])
+        user.start(job["topic"])
+
+        # Self-play is batch work: it yields to interactive sessions sharing the API key
+        for agent in (debator, critique, user):
+            agent.session_id = f"selfplay-{job['debate_id']}"
+            agent.priority_class = BATCH
+
+        bus = EventBus()
+        event_stream = bus.subscribe()
+        pipeline = DebatePipeline(debator, critique, bus)
+
+        last_statement = await pipeline.start(job["topic"], debator_stance)
+        await recorder.drain(event_stream, events.OPENING)
+
+        for round_number in range(1, job["rounds"] + 1):
+            user_argument = await _timed(recorder.latencies, "user_respond", user.arespond(last_statement, round_number))
+            await pipeline.submit(user_argument)
+            await recorder.drain(event_stream, events.ROUND_COMPLETE, events.ROUND_CANCELLED, events.ERROR)
+            if pipeline.error is not None:
+                raise pipeline.error
+            last_statement = recorder.transcript[-1]["text"]
+
+        await pipeline.evaluate()
+        await pipeline.close()
+        await recorder.drain(event_stream, events.DEBATE_ENDED)
+
+        record["final_evaluation"] = recorder.final_evaluation
+        record["citations"] = list(debator.citations)
+        record["round_controller"] = dict(pipeline.controller.stats) if pipeline.controller is not None else None
+        record["error"] = None
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        for agent in (debator, critique):
+            if agent is not None:
+                agent_pool.release(agent)
+
+    record["transcript"] = recorder.transcript
+    record["rounds"] = [recorder.rounds[n] for n in sorted(recorder.rounds)]
+    record["latencies_ms"] = recorder.latencies
+    record["duration_ms"] = (time.perf_counter() - started) * 1000
+    return record
+
+def build_jobs(count: int, rounds: int, topics: List[str], personas: List[str], seed: int) -> List[Dict[str, Any]]:
+    """Build a reproducible list of debate jobs."""
+    rng = random.Random(seed)
+    return [
+        {
+            "debate_id": i,
+            "topic": rng.choice(topics),
+            "user_stance": rng.choice(["for", "against"]),
+            "persona": rng.choice(personas),
+            "rounds": rounds,
+        }
+        for i in range(count)
+    ]
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate self-play records into a summary.
+
+    Args:
+        records: Results from run_single_debate
+
+    Returns:
+        Dict with mean scores per speaker and criterion and latency percentiles per call
+    """
+    completed = [r for r in records if not r["error"]]
+    scores = {}
+    for speaker in ["user", "debator"]:
+        scores[speaker] = {}
+        for criterion in SCORE_CRITERIA:
+            values = [rnd[f"{speaker}_scores"][criterion] for r in completed for rnd in r["rounds"]]
+            scores[speaker][criterion] = statistics.mean(values) if values else 0.0
+
+    samples = {}
+    for r in records:
+        for name, values in r["latencies_ms"].items():
+            samples.setdefault(name, []).extend(values)
+
+    latency = {
+        name: {"calls": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95)}
+        for name, values in samples.items()
+    }
+
+    return {
+        "debates": len(records),
+        "errors": len(records) - len(completed),
+        "mean_scores": scores,
+        "latency_ms": latency,
+    }
+
+def compare_to_baseline(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare mean scores against a saved baseline summary.
+
+    Args:
+        summary: Summary of the current run
+        baseline: Summary saved from a known-good run
+        tolerance: Allowed drop in mean score before it counts as a regression
+
+    Returns:
+        List of human-readable regressions (empty if none)
+    """
+    regressions = []
+    for speaker, criteria in baseline.get("mean_scores", {}).items():
+        for criterion, expected in criteria.items():
+            actual = summary["mean_scores"].get(speaker, {}).get(criterion, 0.0)
+            if expected - actual > tolerance:
+                regressions.append(f"{speaker}.{criterion}: {expected:.2f} -> {actual:.2f}")
+    return regressions
+
+def run_selfplay(jobs: List[Dict[str, Any]], workers: int, output_path: str) -> List[Dict[str, Any]]:
+    """
+    Run debate jobs across a process pool, streaming each record to a JSONL file.
+
+    Args:
+        jobs: Jobs from build_jobs
+        workers: Number of worker processes
+        output_path: Path of the JSONL transcript file
+
+    Returns:
+        List of all debate records
+    """
+    records = []
+    with open(output_path, "w", encoding="utf-8") as output, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_single_debate, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            records.append(record)
+            output.write(json.dumps(record) + "\n")
+            if done % 100 == 0 or done == len(jobs):
+                console.print(f"[dim]{done}/{len(jobs)} debates completed[/dim]")
+    return records
+
+def display_summary(summary: Dict[str, Any]):
+    """Display the self-play summary."""
+    console.print(f"\n[bold]Debates:[/bold] {summary['debates']}  [bold]Errors:[/bold] {summary['errors']}")
+
+    scores_table = Table(title="Mean Critique Scores")
+    scores_table.add_column("Participant", style="cyan")
+    for criterion in SCORE_CRITERIA:
+        scores_table.add_column(criterion.replace("_", " ").title(), style="green")
+    for speaker, criteria in summary["mean_scores"].items():
+        scores_table.add_row(speaker.title(), *(f"{criteria[c]:.2f}" for c in SCORE_CRITERIA))
+    console.print(scores_table)
+
+    latency_table = Table(title="Per-Call Latency (ms)")
+    latency_table.add_column("Call", style="cyan")
+    latency_table.add_column("Calls", style="green")
+    latency_table.add_column("p50", style="green")
+    latency_table.add_column("p95", style="bold green")
+    for name, stats in sorted(summary["latency_ms"].items()):
+        latency_table.add_row(name, str(stats["calls"]), f"{stats['p50']:.2f}", f"{stats['p95']:.2f}")
+    console.print(latency_table)
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Run unattended AI-vs-AI debates")
+    parser.add_argument("--debates", type=int, default=10, help="number of debates to run")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per debate")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes")
+    parser.add_argument("--topics-file", help="file with one debate topic per line")
+    parser.add_argument("--personas", nargs="+", default=list(PERSONAS), help="simulated user personas")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for job generation")
+    parser.add_argument("--output", default="selfplay_results.jsonl", help="JSONL file for transcripts")
+    parser.add_argument("--baseline", help="baseline summary JSON to compare scores against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed mean score drop vs baseline")
+    parser.add_argument("--save-summary", help="write the run summary to this JSON file")
+    parser.add_argument("--cassette", help="record/replay LLM responses with this cassette file")
+    parser.add_argument("--cassette-mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--cassette-timing", choices=["fast", "recorded"], default="fast",
+                        help="replay instantly or at the recorded latency")
+    args = parser.parse_args()
+
+    if args.cassette:
+        if args.cassette_mode == "record" and args.workers > 1:
+            parser.error("recording a cassette requires --workers 1")
+        # Worker processes pick the cassette up from the environment
+        os.environ["LLM_CASSETTE"] = args.cassette
+        os.environ["LLM_CASSETTE_MODE"] = args.cassette_mode
+        os.environ["LLM_CASSETTE_TIMING"] = args.cassette_timing
+
+    if args.topics_file:
+        with open(args.topics_file, encoding="utf-8") as f:
+            topics = [line.strip() for line in f if line.strip()]
+    else:
+        topics = TopicSelectorAgent()._get_default_topics()
+
+    jobs = build_jobs(args.debates, args.rounds, topics, args.personas, args.seed)
+    console.print(f"[cyan]Running {len(jobs)} self-play debates on {args.workers} workers...[/cyan]")
+
+    started = time.perf_counter()
+    records = run_selfplay(jobs, args.workers, args.output)
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(records)
+    summary["wall_time_s"] = elapsed
+    display_summary(summary)
+    console.print(f"\n[green]Transcripts written to {args.output} ({elapsed:.1f}s, "
+                  f"{len(records) / elapsed:.1f} debates/s)[/green]")
+
+    if args.save_summary:
+        with open(args.save_summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(summary, baseline, args.tolerance)
+        if regressions:
+            console.print("[red]Quality regressions detected:[/red]")
+            for regression in regressions:
+                console.print(f"  • {regression}")
+            raise SystemExit(1)
+        console.print("[green]No quality regressions against baseline.[/green]")
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Test script for the Debate Crew system
 Verifies that all agents can be initialized and basic functionality works
 """
 
+import argparse
 import os
 import sys
 from dotenv import load_dotenv
@@ -11,6 +12,14 @@ from dotenv import load_dotenv
 # Add the current directory to the path so we can import our agents
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Agent calls in these tests never reach the API, so don't rate-limit them
+os.environ["LLM_RPM_LIMIT"] = "0"
+os.environ["LLM_TPM_LIMIT"] = "0"
+# Keep tests from reading or writing the on-disk opening cache
+os.environ["OPENING_CACHE_FILE"] = ""
+# ...and from appending to the debate log
+os.environ["DEBATE_LOG_FILE"] = ""
+
 from agents.topic_selector import TopicSelectorAgent
 from agents.debator import DebatorAgent
 from agents.critique import CritiqueAgent
@@ -84,6 +93,1150 @@ def test_basic_functionality():
         print(f"✗ Error in basic functionality: {e}")
         return False
 
+def test_selfplay():
+    """Test that a self-play debate runs end to end."""
+    print("\nTesting self-play debate...")
+
+    try:
+        from selfplay import run_single_debate, summarize
+
+        job = {"debate_id": 0, "topic": "Test topic", "user_stance": "for", "persona": "skeptic", "rounds": 2}
+        record = run_single_debate(job)
+        assert record["error"] is None, record["error"]
+        assert len(record["transcript"]) == 5
+        assert len(record["rounds"]) == 2
+        assert "build_argument" in record["latencies_ms"]
+
+        summary = summarize([record])
+        assert summary["debates"] == 1 and summary["errors"] == 0
+
+        # Latency percentiles are nearest-rank
+        from utils.stats import percentile
+        assert percentile([5, 1, 4, 2, 3], 50) == 3 and percentile(range(1, 21), 95) == 19
+        assert percentile([7], 99) == 7 and percentile([], 50) == 0.0
+        print("✓ Self-play debate runs end to end")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in self-play: {e}")
+        return False
+
+def test_token_budget():
+    """Test token accounting, optional-call skipping and history trimming."""
+    print("\nTesting token budget...")
+
+    try:
+        from utils.token_budget import TokenBudget, count_tokens
+
+        budget = TokenBudget(session_limit=4000, daily_limit=100000)
+        critique = CritiqueAgent()
+        critique.fused_critique = False
+        critique.token_budget = budget
+
+        critique.analyze_argument("Test argument", "user", "Test context")
+        usage = budget.report()["per_method"]["CritiqueAgent.analyze_argument"]
+        assert usage["calls"] == 1 and usage["prompt_tokens"] > 0 and usage["completion_tokens"] > 0
+
+        # Push the session past the optional-call threshold
+        budget.session_tokens = int(budget.session_limit * 0.9)
+        exchange = critique.track_debate_quality(("Test argument", "Test response"))
+        assert exchange.get("skipped") is True
+
+        # Without per-turn critiques, a very long history must be trimmed to fit the context window
+        critique.reset_scores()
+        budget.reset_session()
+        budget.session_limit = 10 ** 6
+        history = [f"User: argument number {i} " + "word " * 50 for i in range(2000)]
+        assert count_tokens(" ".join(history)) > 8192
+        critique.final_evaluation(history)
+        prompt_tokens = budget.report()["per_method"]["CritiqueAgent.final_evaluation"]["prompt_tokens"]
+        assert prompt_tokens < 8192
+
+        # An explicit zero budget is enforced rather than replaced by the default
+        from utils.token_budget import TokenBudgetExceeded
+        try:
+            TokenBudget(session_limit=0).preflight("CritiqueAgent.analyze_argument", "Test", "gpt-4")
+            assert False, "expected the empty budget to refuse the call"
+        except TokenBudgetExceeded:
+            pass
+
+        # Processes sharing the usage file do not lose each other's usage
+        import multiprocessing
+        import tempfile
+        with tempfile.TemporaryDirectory() as usage_dir:
+            usage_file = os.path.join(usage_dir, "usage.json")
+
+            def spend():
+                shared = TokenBudget(usage_file=usage_file)
+                for _ in range(25):
+                    shared.record("CritiqueAgent.analyze_argument", "Test prompt", "Test response", "gpt-4")
+
+            workers = [multiprocessing.get_context("fork").Process(target=spend) for _ in range(4)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join(30)
+            single = TokenBudget(usage_file="")
+            single.record("CritiqueAgent.analyze_argument", "Test prompt", "Test response", "gpt-4")
+            assert TokenBudget(usage_file=usage_file).daily_tokens == 100 * single.daily_tokens
+
+            # Budgets sharing the file see each other's usage, and a new day starts from zero
+            first, second = TokenBudget(usage_file=usage_file), TokenBudget(usage_file=usage_file)
+            second.record("CritiqueAgent.analyze_argument", "Test prompt", "Test response", "gpt-4")
+            first.record("CritiqueAgent.analyze_argument", "Test prompt", "Test response", "gpt-4")
+            assert first.daily_tokens == 102 * single.daily_tokens
+            first.usage_day = "2000-01-01"
+            with open(usage_file, "w") as f:
+                f.write('{"2000-01-01": 1}')
+            first.record("CritiqueAgent.analyze_argument", "Test prompt", "Test response", "gpt-4")
+            assert first.daily_tokens == single.daily_tokens
+        print("✓ Token budget accounting works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in token budget: {e}")
+        return False
+
+def test_map_reduce_evaluation():
+    """Test that long debates are evaluated with map-reduce over per-turn critiques."""
+    print("\nTesting map-reduce final evaluation...")
+
+    try:
+        critique = CritiqueAgent()
+        critique.current_topic = "Test topic"
+        history = []
+        for round_number in range(1, 41):
+            for speaker in ("user", "debator"):
+                argument = f"{speaker} argument in round {round_number}"
+                critique.analyze_argument(argument, speaker, f"Round {round_number}")
+                history.append(f"{speaker.title()}: {argument}")
+
+        evaluation = critique.final_evaluation(history)
+        assert "overall_quality" in evaluation
+        assert len(critique.chunk_summaries) == 80 // CritiqueAgent.CHUNK_SIZE
+        summary = critique.chunk_summaries[0].result()
+        assert summary["turns"] == [1, CritiqueAgent.CHUNK_SIZE]
+        assert summary["average_scores"]["user"]["total"] == 7
+
+        # An evaluation mid-debate does not stop the partial chunk from being summarized whole later
+        for round_number in (41, 42):
+            for speaker in ("user", "debator"):
+                critique.analyze_argument(f"{speaker} argument in round {round_number}", speaker, f"Round {round_number}")
+        critique.final_evaluation(history)
+        covered = [future.result()["turns"] for future in critique.chunk_summaries]
+        assert covered[-1] == [79, 84]
+        assert all(later[0] == earlier[1] + 1 for earlier, later in zip(covered, covered[1:]))
+        print("✓ Map-reduce final evaluation works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in map-reduce evaluation: {e}")
+        return False
+
+def test_evidence_store():
+    """Test that the Debator grounds evidence in the local evidence store."""
+    print("\nTesting evidence store...")
+
+    try:
+        import tempfile
+        from utils.evidence_store import EvidenceStore
+
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            with open(os.path.join(corpus_dir, "energy.txt"), "w", encoding="utf-8") as f:
+                f.write("Electric vehicles produce no tailpipe emissions.\n\n"
+                        "Battery costs fell by roughly 90 percent over the last decade.\n")
+            with open(os.path.join(corpus_dir, "work.md"), "w", encoding="utf-8") as f:
+                f.write("Remote work saves commuting time for employees.\n")
+
+            store = EvidenceStore(corpus_dir)
+            debator = DebatorAgent()
+            debator.evidence_store = store
+            debator.initialize_debate("Are electric vehicles the future of transportation?", "for")
+            store.prefetch(debator.current_topic).result(timeout=5)
+
+            evidence = debator.provide_evidence("battery costs are falling")
+            assert "[energy.txt#2]" in evidence
+            assert debator.citations[0]["id"] == "energy.txt#2"
+
+            # Prefetched topics are capped, least recently used first, and close() stops the worker
+            for number in range(EvidenceStore.PREFETCH_TOPICS + 5):
+                store.prefetch(f"Topic {number}")
+            assert len(store._prefetched) == EvidenceStore.PREFETCH_TOPICS and "Topic 0" not in store._prefetched
+            store.close()
+            assert store._executor is None and not store._prefetched
+            assert store.lookup("Topic 1", "battery costs")
+        print("✓ Evidence store grounding works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in evidence store: {e}")
+        return False
+
+def test_event_pipeline():
+    """Test that the debate pipeline publishes every stage's events for a round."""
+    print("\nTesting event pipeline...")
+
+    try:
+        import asyncio
+        from agents.pipeline import DebatePipeline
+        from utils import events
+        from utils.events import EventBus
+
+        async def run_round():
+            bus = EventBus()
+            stream = bus.subscribe()
+            pipeline = DebatePipeline(DebatorAgent(), CritiqueAgent(), bus)
+            await pipeline.start("Test topic", "for")
+            round_number = await pipeline.submit("Test argument")
+            await pipeline.wait_round(round_number)
+            await pipeline.close()
+            seen = []
+            while not stream.empty():
+                seen.append(stream.get_nowait()["type"])
+            return seen
+
+        seen = asyncio.run(run_round())
+        for event_type in (events.OPENING, events.DEBATOR_RESPONSE, events.CRITIQUE, events.EXCHANGE, events.SCORES):
+            assert event_type in seen, event_type
+        assert seen.index(events.ROUND_COMPLETE) < seen.index(events.DEBATE_ENDED)
+        # Streamed chunks and the provisional critique arrive before the full response
+        assert seen.index(events.DEBATOR_CHUNK) < seen.index(events.PROVISIONAL_CRITIQUE) < seen.index(events.DEBATOR_RESPONSE)
+
+        # A subscriber that falls behind loses stream chunks but never control events
+        async def slow_subscriber():
+            bus = EventBus(max_queue_size=3)
+            stream = bus.subscribe()
+            bus.publish(events.ROUND_COMPLETE, round=1)
+            for index in range(5):
+                bus.publish(events.DEBATOR_CHUNK, text=str(index))
+            bus.publish(events.ERROR, message="boom")
+            bus.publish(events.DEBATE_ENDED)
+            seen = []
+            while not stream.empty():
+                seen.append(stream.get_nowait())
+            return bus.dropped, seen
+
+        dropped, seen = asyncio.run(slow_subscriber())
+        assert [event["type"] for event in seen] == [events.ROUND_COMPLETE, events.ERROR, events.DEBATE_ENDED]
+        assert dropped == 5
+        print("✓ Event pipeline works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in event pipeline: {e}")
+        return False
+
+def test_streaming_critique():
+    """Test that provisional critiques are built sentence by sentence from streamed text."""
+    print("\nTesting streaming critique...")
+
+    try:
+        from agents.streaming_critique import StreamingCritique
+
+        critique = StreamingCritique()
+        text = "Everyone knows uniforms help. A 2019 study found 12% less bullying, because costs fall. Why wait"
+        completed = [sentence for word in text.split(" ") for sentence in critique.feed(word + " ")]
+        assert len(completed) == 2 and critique.finish() == ["Why wait"]
+
+        provisional = critique.provisional()
+        assert provisional["provisional"] and critique.sentences == 3
+        assert critique.evidence == 1 and critique.reasoning == 1
+        assert provisional["fallacies"] == ['appeal to popularity: "Everyone knows"']
+        assert all(1 <= score <= 10 for score in provisional["scores"].values())
+        print("✓ Streaming critique works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in streaming critique: {e}")
+        return False
+
+def test_single_flight():
+    """Test that identical concurrent requests are coalesced into one."""
+    print("\nTesting single-flight coalescing...")
+
+    try:
+        import threading
+        import time
+        from utils.single_flight import SingleFlight, request_key
+
+        flight = SingleFlight()
+        executed = []
+        results = []
+
+        def slow_request():
+            executed.append(1)
+            time.sleep(0.2)
+            return {"topics": ["Should college education be free?"]}
+
+        # Whitespace differences must not defeat coalescing
+        keys = [request_key("gpt-4", "help me  discover\n a topic"), request_key("gpt-4", "help me discover a topic")]
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(flight.do(keys[i % 2], slow_request, "generate_topics")))
+            for i in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(executed) == 1
+        assert sum(1 for _, shared in results if shared) == 9
+        assert flight.stats()["coalesced"] == 9
+        assert request_key("gpt-3.5-turbo", "help me discover a topic") != keys[1]
+        print("✓ Single-flight coalescing works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in single-flight: {e}")
+        return False
+
+def test_scheduler():
+    """Test that the scheduler admits interactive calls first and sessions fairly."""
+    print("\nTesting LLM scheduler...")
+
+    try:
+        import threading
+        import time
+        from utils.scheduler import LLMScheduler, INTERACTIVE_GENERATION, BATCH
+
+        # 600 requests per minute: one admission every 0.1s once the bucket is empty
+        sched = LLMScheduler(requests_per_minute=600, tokens_per_minute=0)
+        sched.request_bucket.level = 0
+        order = []
+
+        def call(label, session, priority):
+            sched.acquire(session, priority, 100)
+            order.append(label)
+
+        requests = [("a1", "a", BATCH), ("a2", "a", BATCH), ("a3", "a", BATCH), ("b1", "b", BATCH),
+                    ("user", "c", INTERACTIVE_GENERATION)]
+        threads = []
+        for label, session, priority in requests:
+            thread = threading.Thread(target=call, args=(label, session, priority))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+
+        assert order == ["user", "a1", "b1", "a2", "a3"], order
+        metrics = sched.metrics()
+        assert metrics["batch"]["admitted"] == 4 and metrics["batch"]["queue_depth"] == 0
+        assert metrics["interactive_generation"]["wait_p95_ms"] < metrics["batch"]["wait_p95_ms"]
+
+        # Async waiters keep the same order, sleeping until they can be admitted rather than polling
+        import asyncio
+
+        class CountingScheduler(LLMScheduler):
+            checks = 0
+
+            def _loop_event(self):
+                CountingScheduler.checks += 1
+                return super()._loop_event()
+
+        async def run_async():
+            sched = CountingScheduler(requests_per_minute=600, tokens_per_minute=0)
+            sched.request_bucket.level = 0
+            order = []
+
+            async def acall(label, session, priority):
+                await sched.aacquire(session, priority, 100)
+                order.append(label)
+
+            tasks = []
+            for label, session, priority in requests:
+                tasks.append(asyncio.create_task(acall(label, session, priority)))
+                await asyncio.sleep(0.01)
+            await asyncio.gather(*tasks)
+            return order
+
+        assert asyncio.run(run_async()) == ["user", "a1", "b1", "a2", "a3"]
+        assert CountingScheduler.checks < 60, CountingScheduler.checks
+        print("✓ LLM scheduler works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in scheduler: {e}")
+        return False
+
+def test_cassette():
+    """Test that a recorded debate replays identically from a cassette."""
+    print("\nTesting record/replay cassette...")
+
+    try:
+        import gzip
+        import tempfile
+        from selfplay import run_single_debate
+        from utils.cassette import Cassette, CassetteMiss, use_cassette
+
+        job = {"debate_id": 0, "topic": "Cassette topic", "user_stance": "against", "persona": "novice", "rounds": 2}
+        with tempfile.TemporaryDirectory() as tape_dir:
+            path = os.path.join(tape_dir, "debate.jsonl.gz")
+            try:
+                use_cassette(Cassette(path, "record"))
+                run_single_debate(job)
+                # Recording again replaces the first take instead of adding to it
+                tape = Cassette(path, "record")
+                use_cassette(tape)
+                recorded = run_single_debate(job)
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    assert sum(1 for _ in f) == tape.stats["recorded"]
+
+                replay = Cassette(path, "replay")
+                use_cassette(replay)
+                replayed = run_single_debate(job)
+                assert replayed["error"] is None, replayed["error"]
+                assert replayed["transcript"] == recorded["transcript"]
+                assert replayed["final_evaluation"] == recorded["final_evaluation"]
+                assert replay.stats["hits"] > 0 and replay.stats["misses"] == 0
+
+                try:
+                    CritiqueAgent().analyze_argument("An argument that was never recorded", "user")
+                    assert False, "expected a cassette miss"
+                except CassetteMiss:
+                    pass
+            finally:
+                use_cassette(None)
+        print("✓ Record/replay cassette works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in cassette: {e}")
+        return False
+
+def test_fused_critique():
+    """Test that a full fused critique of one argument costs a single call."""
+    print("\nTesting fused critique...")
+
+    try:
+        from utils.token_budget import TokenBudget
+
+        critique = CritiqueAgent()
+        critique.fused_critique = True
+        critique.token_budget = TokenBudget(session_limit=10 ** 6, daily_limit=10 ** 6)
+
+        argument = "Homework should be banned because it widens inequality."
+        analysis = critique.analyze_argument(argument, "user", "Test context")
+        fallacies = critique.identify_logical_fallacies(argument)
+        suggestions = critique.suggest_improvements(argument, "user")
+
+        usage = critique.token_budget.report()["per_method"]
+        assert usage["CritiqueAgent.critique_argument"]["calls"] == 1
+        assert set(usage) == {"CritiqueAgent.critique_argument"}
+        assert analysis["scores"]["total"] == 7 and fallacies == [] and len(suggestions) == 3
+
+        # Views hand out copies, so callers cannot corrupt the cached result
+        suggestions.clear()
+        assert len(critique.suggest_improvements(argument, "user")) == 3
+
+        # A critique made for another speaker or context is not reused for analysis
+        other = "Uniforms stifle self-expression."
+        critique.identify_logical_fallacies(other)
+        critique.analyze_argument(other, "debator", "Round 2")
+        critique.analyze_argument(other, "debator", "Round 2")
+        assert critique.token_budget.report()["per_method"]["CritiqueAgent.critique_argument"]["calls"] == 3
+        print("✓ Fused critique works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in fused critique: {e}")
+        return False
+
+def test_profiler():
+    """Test that profiler samples are attributed to phases and written as collapsed stacks."""
+    print("\nTesting profiler...")
+
+    try:
+        import tempfile
+        import time
+        from utils.profiler import SamplingProfiler
+
+        def busy(seconds):
+            end = time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                sum(range(100))
+
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        with profiler.phase("outer"):
+            profiler.wrap("inner", busy)(0.1)
+        profiler.stop()
+
+        report = profiler.report()
+        assert report["inner"]["calls"] == 1 and report["inner"]["samples"] > 0
+        assert report["outer"]["samples"] >= report["inner"]["samples"]
+        assert all(stack.startswith("outer;") for stack in profiler.samples)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = profiler.write(tmp)
+            assert {os.path.basename(path) for path in paths} == {"all.collapsed", "outer.collapsed", "summary.txt"}
+            with open(os.path.join(tmp, "outer.collapsed")) as f:
+                assert all(line.rsplit(" ", 1)[1].isdigit() for line in f.read().splitlines())
+        print("✓ Profiler works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in profiler: {e}")
+        return False
+
+def test_session_manager():
+    """Test that idle sessions spill to disk, restore on input and expire after the TTL."""
+    print("\nTesting session manager...")
+
+    import tracemalloc
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        import tempfile
+        from agents.session import DebateSession
+        from utils.session_manager import SessionManager, SessionNotFound
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            now = [0.0]
+            manager = SessionManager(DebateSession, DebateSession.from_state, memory_budget_mb=4096,
+                                     spill_dir=spill_dir, idle_seconds=60, ttl_seconds=600, clock=lambda: now[0])
+            first, second = manager.create(), manager.create()
+            manager.run(first, "start", "Test topic", "for")
+            for round_number in range(7):
+                manager.run(first, "submit", f"Argument {round_number}")
+            before = manager.run(first, "export_state")
+
+            # Activity on one session spills the other once it has been idle long enough
+            now[0] = 100
+            manager.run(second, "start", "Other topic", "against")
+            report = manager.memory_report()
+            assert not report["sessions"][first]["resident"] and report["sessions"][first]["spill_bytes"] > 0
+            assert report["sessions"][second]["retained_bytes"] > 0 and report["traced_bytes"] > 0
+
+            # The next input restores the spilled session where it left off
+            assert manager.run(first, "export_state") == before
+            assert manager.run(first, "submit", "Argument 7")["round"] == 8
+            assert manager.stats["restored"] == 1 and not os.listdir(spill_dir)
+
+            # A budget the process is already over spills every idle session
+            manager.memory_budget = 0
+            assert set(manager.maintain()["spilled"]) == {first, second}
+
+            now[0] = 1000
+            assert set(manager.maintain()["evicted"]) == {first, second} and not os.listdir(spill_dir)
+            try:
+                manager.run(first, "submit", "Too late")
+                assert False, "expired session should not run"
+            except SessionNotFound:
+                pass
+
+            # Concurrent maintenance evicts a busy session once, and a turn queued behind
+            # the eviction fails cleanly instead of touching the closed session
+            import threading
+            import time
+            gate = threading.Event()
+
+            class HeldSession:
+                def __init__(self, session_id):
+                    self.session_id = session_id
+
+                def hold(self):
+                    gate.wait(5)
+                    return "done"
+
+            held = SessionManager(HeldSession, None, memory_budget_mb=4096, spill_dir=spill_dir,
+                                  idle_seconds=60, ttl_seconds=600, clock=lambda: now[0])
+            busy = held.create()
+            outcomes = []
+
+            def call(target, *args):
+                try:
+                    outcomes.append(target(*args))
+                except Exception as e:
+                    outcomes.append(e)
+
+            running = threading.Thread(target=call, args=(held.run, busy, "hold"))
+            running.start()
+            time.sleep(0.05)
+            now[0] = 2000
+            waiters = [threading.Thread(target=call, args=(held.run, busy, "hold"))]
+            waiters += [threading.Thread(target=call, args=(held.maintain,)) for _ in range(2)]
+            for thread in waiters:
+                thread.start()
+            time.sleep(0.05)
+            gate.set()
+            for thread in [running] + waiters:
+                thread.join(5)
+            errors = [o for o in outcomes if isinstance(o, Exception) and not isinstance(o, SessionNotFound)]
+            assert not errors, errors
+            assert held.stats["evicted"] == 1 and busy not in held.memory_report()["sessions"]
+        print("✓ Session manager works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in session manager: {e}")
+        return False
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+def test_agent_pool():
+    """Test that released agents are reused with clean per-debate state."""
+    print("\nTesting agent pool...")
+
+    try:
+        from agents.pool import AgentPool
+        from utils.evidence_store import EvidenceStore
+        from utils.token_budget import TokenBudget
+
+        pool = AgentPool(max_idle=1)
+        pool.prewarm([DebatorAgent, CritiqueAgent])
+        debator = pool.acquire(DebatorAgent)
+        critique = pool.acquire(CritiqueAgent)
+        assert pool.stats["reused"] == 2
+
+        debator.session_id = "pooled"
+        debator.token_budget = TokenBudget()
+        store = debator.evidence_store = EvidenceStore()
+        debator.initialize_debate("Test topic", "for")
+        debator.add_to_history("Test argument", "User")
+        critique.update_scores(critique.analyze_argument("Test argument", "user"), "user")
+
+        llm = debator.llm
+        pool.release(debator)
+        pool.release(critique)
+        store.close()
+        reused = pool.acquire(DebatorAgent)
+        assert reused is debator and reused.llm is llm
+        assert reused.debate_history == [] and reused.current_topic == ""
+        assert reused.session_id == "default" and reused.token_budget is None and reused.evidence_store is None
+        assert pool.acquire(CritiqueAgent).feedback_history == []
+
+        # The pool keeps at most max_idle instances per class
+        pool.release(reused)
+        pool.release(DebatorAgent())
+        assert pool.stats["discarded"] == 1
+        print("✓ Agent pool works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in agent pool: {e}")
+        return False
+
+def test_opening_cache():
+    """Test that pre-generated openings are served from the persistent cache."""
+    print("\nTesting opening cache...")
+
+    try:
+        import tempfile
+        from utils.opening_cache import OpeningCache, use_opening_cache
+        from utils.token_budget import TokenBudget
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "openings.json")
+            cache = OpeningCache(path, variants=3, seed=0)
+            use_opening_cache(cache)
+            debator = DebatorAgent()
+            assert debator.prewarm_openings("Should homework be banned?", "for") == 3
+            assert debator.prewarm_openings("Should homework be banned?", "for") == 0
+            cache.save()
+
+            # Reloaded from disk, a normalized topic hits without an LLM call
+            cache = OpeningCache(path, variants=3, seed=0)
+            use_opening_cache(cache)
+            debator.token_budget = TokenBudget(session_limit=10 ** 6, daily_limit=10 ** 6)
+            opening = debator.initialize_debate("  should homework be BANNED ", "for")
+            assert "Let me open with" in opening and cache.stats["hits"] == 1
+            assert "DebatorAgent.initialize_debate" not in debator.token_budget.report()["per_method"]
+
+            # Misses generate live, each adding a different variant, until the key is full
+            openings = {debator.initialize_debate("Should homework be banned?", "against") for _ in range(4)}
+            assert cache.stats["misses"] == 3 and cache.stats["hits"] == 2 and len(openings) == 3
+            assert cache.missing("Should homework be banned?", "against", debator.model_name,
+                                 debator.OPENING_PROMPT_VERSION) == 0
+
+            # Saves merge with variants another process wrote in the meantime
+            other = OpeningCache(path, variants=3)
+            other.add("Uniforms", "for", debator.model_name, debator.OPENING_PROMPT_VERSION, "Another opening")
+            other.save()
+            cache.save()
+            merged = OpeningCache(path, variants=3)
+            assert merged.stored("Uniforms", "for", debator.model_name, debator.OPENING_PROMPT_VERSION) == 1
+            assert merged.missing("Should homework be banned?", "against", debator.model_name,
+                                  debator.OPENING_PROMPT_VERSION) == 0
+
+            # A cassette bypasses the cache, so a recorded opening replays with the same prompt
+            from utils.cassette import Cassette, use_cassette
+            tape = os.path.join(tmp, "tape.jsonl")
+            try:
+                use_cassette(Cassette(tape, "record"))
+                recorded = debator.initialize_debate("Should uniforms be required?", "for")
+                use_cassette(Cassette(tape, "replay"))
+                assert debator.initialize_debate("Should uniforms be required?", "for") == recorded
+            finally:
+                use_cassette(None)
+            assert cache.stored("Should uniforms be required?", "for", debator.model_name,
+                                debator.OPENING_PROMPT_VERSION) == 0
+        print("✓ Opening cache works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in opening cache: {e}")
+        return False
+    finally:
+        from utils.opening_cache import use_opening_cache
+        use_opening_cache(None)
+
+def test_topic_prefetch():
+    """Test that speculative topics are reused for a matching answer and dropped otherwise."""
+    print("\nTesting topic prefetch...")
+
+    try:
+        from agents.topic_prefetch import TopicPrefetch
+
+        configured = []
+        prefetch = TopicPrefetch(["I'm not sure, help me discover a topic", "technology"],
+                                 lambda agent: configured.append(agent), max_workers=1)
+        topics = prefetch.take("  Technology. ")
+        assert topics and len(topics) == 5 and prefetch.stats["hit"]
+        # Speculative agents are wired into the session, then returned to the pool
+        assert configured and all(agent.token_budget is None for agent in configured)
+
+        prefetch = TopicPrefetch(["technology"], max_workers=1)
+        assert prefetch.take("medieval history") is None and not prefetch.stats["hit"]
+
+        # Ending the session cancels queued generations and leaves no prefetch thread behind
+        import threading
+        before = set(threading.enumerate())
+        prefetch = TopicPrefetch(["technology", "education", "environment"], max_workers=1)
+        prefetch.cancel(wait=True)
+        assert prefetch.stats["cancelled"] >= 2
+        assert not [thread for thread in set(threading.enumerate()) - before
+                    if thread.name.startswith("topic-prefetch")]
+        print("✓ Topic prefetch works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in topic prefetch: {e}")
+        return False
+
+def test_llm_backends():
+    """Test per-method backend selection and the offline rule-based backend."""
+    print("\nTesting LLM backends...")
+
+    try:
+        from agents.backends import backend_for, use_backends
+        from utils.token_budget import TokenBudget
+
+        use_backends("openai", {"CritiqueAgent": "rules", "TopicSelectorAgent.generate_topics": "rules"})
+        try:
+            assert backend_for("CritiqueAgent.analyze_argument").name == "rules"
+            assert backend_for("TopicSelectorAgent.generate_topics").name == "rules"
+            assert backend_for("TopicSelectorAgent.discover_topic").name == "openai"
+
+            critique = CritiqueAgent()
+            critique.fused_critique = False
+            critique.token_budget = TokenBudget(session_limit=10 ** 6, daily_limit=10 ** 6)
+            weak = critique.analyze_argument("Everyone knows homework is useless.", "user")
+            strong = critique.analyze_argument(
+                "A 2019 study of 4,000 pupils found no gain from homework. Therefore it should be optional.", "user")
+            assert strong["scores"]["total"] > weak["scores"]["total"]
+            assert critique.identify_logical_fallacies("Everyone knows homework is useless.")
+            # Local backends are not metered
+            assert critique.token_budget.report()["per_method"] == {}
+
+            topics = TopicSelectorAgent().generate_topics("I care about the environment")
+            assert len(topics) == 5 and "Should single-use plastics be banned?" in topics
+        finally:
+            use_backends()
+        print("✓ LLM backends work")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in LLM backends: {e}")
+        return False
+
+def test_async_agents():
+    """Test that one event loop drives many concurrent debates through the async agent methods."""
+    print("\nTesting async agent methods...")
+
+    try:
+        import asyncio
+        import threading
+
+        debators = [DebatorAgent() for _ in range(20)]
+        critiques = [CritiqueAgent() for _ in range(20)]
+
+        async def debate(debator, critique, i):
+            await debator.ainitialize_debate(f"Async topic {i}", "for")
+            response = await debator.abuild_argument(f"Argument {i}")
+            analysis = await critique.aanalyze_argument(response, "debator")
+            chunks = [chunk async for chunk in debator.astream_argument(f"Argument {i}")]
+            return response, analysis, "".join(chunks)
+
+        async def run_all():
+            threads = threading.active_count()
+            results = await asyncio.gather(*(debate(d, c, i) for i, (d, c) in enumerate(zip(debators, critiques))))
+            # Sync wrappers refuse to block a running loop
+            try:
+                debators[0].build_argument("blocked")
+                raise AssertionError("sync call inside the event loop did not raise")
+            except RuntimeError:
+                pass
+            return results, threading.active_count() - threads
+
+        results, extra_threads = asyncio.run(run_all())
+        assert extra_threads == 0
+        assert all(response == streamed and analysis["scores"]["total"] > 0 for response, analysis, streamed in results)
+        # The sync method is a thin wrapper over the async one
+        assert debators[0].build_argument("Argument 0") == results[0][0]
+        print("✓ Async agent methods work")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in async agent methods: {e}")
+        return False
+
+def test_cancellation():
+    """Test that cancelled scopes and passed deadlines abort agent work in flight."""
+    print("\nTesting cancellation...")
+
+    try:
+        import asyncio
+        import threading
+        from agents.pipeline import DebatePipeline
+        from utils import events
+        from utils.cancellation import CancelScope, Cancelled, DeadlineExceeded
+        from utils.events import EventBus
+        from utils.single_flight import SingleFlight
+        from utils.token_budget import TokenBudget
+
+        session = CancelScope("session")
+        round_scope = session.child("round", timeout=60)
+        threading.Timer(0.05, session.cancel, ["user ended the debate"]).start()
+        try:
+            asyncio.run(round_scope.run(asyncio.sleep(10)))
+            raise AssertionError("cancelled work kept running")
+        except Cancelled as e:
+            assert "user ended the debate" in str(e)
+        try:
+            asyncio.run(CancelScope("round", timeout=0.05).run(asyncio.sleep(10)))
+            raise AssertionError("deadline was not enforced")
+        except DeadlineExceeded:
+            pass
+
+        # Calls under a cancelled scope are neither sent nor billed
+        debator = DebatorAgent()
+        debator.token_budget = TokenBudget()
+        with session.activate():
+            try:
+                debator.build_argument("Test argument")
+                raise AssertionError("call under a cancelled scope was sent")
+            except Cancelled:
+                pass
+        assert debator.token_budget.report()["per_method"] == {}
+
+        # Waiters on a cancelled leader send the request themselves
+        async def coalesced():
+            flight = SingleFlight()
+
+            async def slow():
+                await asyncio.sleep(0.1)
+                return "result"
+
+            leader = asyncio.create_task(flight.ado("key", slow))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.create_task(flight.ado("key", slow))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter
+
+        assert asyncio.run(coalesced()) == ("result", False)
+
+        async def cancelled_round():
+            bus = EventBus()
+            stream = bus.subscribe()
+            pipeline = DebatePipeline(DebatorAgent(), CritiqueAgent(), bus, round_timeout=1e-6)
+            await pipeline.start("Test topic", "for")
+            completed = await pipeline.wait_round(await pipeline.submit("Test argument"))
+            await pipeline.close()
+            seen = []
+            while not stream.empty():
+                seen.append(stream.get_nowait()["type"])
+            return completed, seen, pipeline.error
+
+        completed, seen, error = asyncio.run(cancelled_round())
+        assert not completed and error is None
+        assert events.ROUND_CANCELLED in seen and events.ROUND_COMPLETE not in seen
+        print("✓ Cancellation works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in cancellation: {e}")
+        return False
+
+def test_session_fork():
+    """Test that forked sessions share their prefix without LLM calls and branch independently."""
+    print("\nTesting session forking...")
+
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+        from agents.session import DebateSession
+        from utils.forkable import ForkableList
+        from utils.token_budget import TokenBudget
+
+        shared = ForkableList(["a", "b", "c"])
+        left, right = shared.fork(2), shared.fork(2)
+        left.append("x")
+        shared.append("d")
+        assert left == ["a", "b", "x"] and right == ["a", "b"] and shared == ["a", "b", "c", "d"]
+        assert left.fork(1) == ["a"] and list(reversed(left)) == ["x", "b", "a"] and left[-2:] == ["b", "x"]
+
+        budget = TokenBudget()
+        session = DebateSession("fork-test", token_budget=budget)
+        session.start("Test topic", "for")
+        for round_number in range(4):
+            session.submit(f"Argument {round_number}")
+        before = session.export_state()
+
+        def calls():
+            return sum(entry["calls"] for entry in budget.report()["per_method"].values())
+
+        sent = calls()
+        branches = [session.fork(2) for _ in range(3)]
+        assert calls() == sent
+        for branch in branches:
+            assert branch.round_count == 2 and len(branch.history) == 5 and not branch.history.unshared()
+            assert branch.debator.debate_history == session.debator.debate_history[:5]
+        assert session.fork(0).history == session.history[:1] and session.fork().round_count == 4
+        # Summaries of the shared prefix carry over; a fork after round 3 shares the first chunk
+        later = session.fork(3)
+        assert later.critique.chunk_summaries[0] is session.critique.chunk_summaries[0]
+
+        # Branches play on concurrently without touching each other or the parent
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(lambda pair: pair[0].submit(pair[1]),
+                                        zip(branches, ["Branch A", "Branch B", "Branch C"])))
+        assert [result["round"] for result in results] == [3, 3, 3]
+        assert [branch.history[5] for branch in branches] == ["User: Branch A", "User: Branch B", "User: Branch C"]
+        assert session.export_state() == before
+
+        # Forked state serializes as plain lists wherever it is written out
+        import json
+        import tempfile
+        from utils.debate_log import DebateLog
+        assert json.loads(json.dumps(later.export_state()))["history"] == list(later.history)
+        with tempfile.TemporaryDirectory() as log_dir:
+            log = DebateLog(os.path.join(log_dir, "debates.jsonl"))
+            log.append({"history": later.history, "citations": later.debator.citations})
+            (record, _), = log.read()
+            assert record == {"history": list(later.history), "citations": list(later.debator.citations)}
+
+        # Closing the parent leaves the branches' shared summaries intact
+        session.close()
+        assert "final_scores" in later.evaluate()
+        for branch in branches + [later]:
+            branch.close()
+        print("✓ Session forking works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in session forking: {e}")
+        return False
+
+def test_response_cache():
+    """Test that responses computed in one process are served to others from the shared cache."""
+    print("\nTesting response cache...")
+
+    try:
+        import multiprocessing
+        import sqlite3
+        import tempfile
+        from utils.cassette import Cassette, use_cassette
+        from utils.response_cache import ResponseCache, use_response_cache
+        from utils.token_budget import TokenBudget
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResponseCache(os.path.join(directory, "responses.db"), max_bytes=4096)
+            use_response_cache(cache)
+            try:
+                # A worker process pays for the critique...
+                worker = multiprocessing.get_context("fork").Process(
+                    target=lambda: CritiqueAgent().critique_argument("A shared argument", "user"))
+                worker.start()
+                worker.join(30)
+                assert worker.exitcode == 0
+
+                # ...and this process gets it without sending a request
+                critique = CritiqueAgent()
+                critique.token_budget = TokenBudget()
+                assert "scores" in critique.critique_argument("A shared argument", "user")
+                assert critique.token_budget.report()["per_method"] == {}
+                critique.critique_argument("An argument nobody made before", "user")
+                assert critique.token_budget.report()["per_method"]["CritiqueAgent.critique_argument"]["calls"] == 1
+                stats = cache.report()["per_method"]["CritiqueAgent.critique_argument"]
+                assert stats == {"hits": 1, "misses": 1, "stores": 1}
+
+                # Past max_bytes the least recently used responses go first
+                for i in range(20):
+                    cache.put(f"key-{i}", "test", "x" * 500)
+                report = cache.report()
+                assert report["bytes"] <= 4096 and report["evictions"] > 0
+                assert cache.get("key-19", "test") == "x" * 500 and cache.get("key-0", "test") is None
+                # The running size total matches the stored responses
+                with sqlite3.connect(cache.path) as connection:
+                    assert connection.execute("SELECT SUM(size) FROM responses").fetchone()[0] == report["bytes"]
+
+                # Recording a cassette bypasses the cache, so the cassette sees every call
+                CritiqueAgent().critique_argument("A recorded argument", "user")
+                tape = Cassette(os.path.join(directory, "tape.jsonl"), "record")
+                use_cassette(tape)
+                try:
+                    CritiqueAgent().critique_argument("A recorded argument", "user")
+                finally:
+                    use_cassette(None)
+                assert tape.stats["recorded"] == 1
+            finally:
+                use_response_cache(None)
+                cache.close()
+        print("✓ Response cache works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in response cache: {e}")
+        return False
+
+def test_debate_export():
+    """Test that logged debates export in bounded chunks and incrementally from the watermark."""
+    print("\nTesting debate export...")
+
+    try:
+        import gzip
+        import json
+        import tempfile
+        from agents.session import DebateSession
+        from export_debates import export_debates
+        from utils.debate_log import DebateLog, use_debate_log
+
+        with tempfile.TemporaryDirectory() as directory:
+            log = DebateLog(os.path.join(directory, "debates.jsonl"))
+            output = os.path.join(directory, "export")
+            use_debate_log(log)
+            try:
+                for number in range(3):
+                    session = DebateSession(f"export-{number}")
+                    session.start(f"Topic {number}", "for")
+                    session.submit("Test argument")
+                    session.evaluate()
+                    session.close()
+            finally:
+                use_debate_log(None)
+
+            # Two of three debates (3 turns and 2 * 4 + 2 * 4 scores each), at most 4 rows per part
+            first = export_debates(log, output, chunk_rows=4, limit=2)
+            assert first["sessions"] == 2 and first["rows"] == {"sessions": 2, "turns": 6, "scores": 32}
+            assert len(first["files"]["scores"]) == 8
+
+            # The next export picks up only what is new, and nothing once caught up
+            second = export_debates(log, output, chunk_rows=4)
+            assert second["sessions"] == 1 and second["watermark"]["sessions"] == 3
+            assert export_debates(log, output)["sessions"] == 0
+
+            rows = []
+            for path in sorted(first["files"]["turns"] + second["files"]["turns"]):
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    rows.extend(json.loads(line) for line in f)
+            assert [row["session_id"] for row in rows if row["turn"] == 1] == ["export-0", "export-1", "export-2"]
+            assert rows[1]["speaker"] == "User" and rows[1]["text"] == "Test argument"
+
+            # A full export replaces the incremental parts
+            assert export_debates(log, output, full=True)["rows"]["turns"] == 9
+            assert len(os.listdir(os.path.join(output, "turns"))) == 1
+        print("✓ Debate export works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in debate export: {e}")
+        return False
+
+def test_round_controller():
+    """Test that the round controller skips redundant critique calls and spots convergence."""
+    print("\nTesting round controller...")
+
+    try:
+        import asyncio
+        from agents.pipeline import DebatePipeline
+        from agents.round_controller import RoundController
+        from utils import events
+        from utils.events import EventBus
+
+        # A shift in scores since the last feedback calls for new feedback
+        controller = RoundController()
+        for total in (5.0, 5.2):
+            controller.plan_critique("user", "Some argument")
+            controller.record("user", {"scores": {"total": total}})
+        assert not controller.feedback_due() and not controller.feedback_due()
+        controller.plan_critique("user", "A very different argument")
+        controller.record("user", {"scores": {"total": 7.0}})
+        assert controller.feedback_due() and controller.stats["feedback"] == 1
+
+        async def repetitive_debate():
+            bus = EventBus()
+            stream = bus.subscribe()
+            pipeline = DebatePipeline(DebatorAgent(), CritiqueAgent(), bus, controller=RoundController())
+            await pipeline.start("Test topic", "for")
+            converged = []
+            for _ in range(6):
+                await pipeline.wait_round(await pipeline.submit("Homework widens inequality because time at home differs."))
+                converged.append(pipeline.controller.converged())
+            await pipeline.close()
+            seen = []
+            while not stream.empty():
+                seen.append(stream.get_nowait())
+            return pipeline.controller.stats, converged, seen
+
+        stats, converged, seen = asyncio.run(repetitive_debate())
+        calls = [event["method"] for event in seen if event["type"] == events.AGENT_CALL]
+        # Six rounds with settled scores and repeated arguments need fewer than 12 critiques and 6 exchange analyses
+        assert calls.count("analyze_argument") == stats["critiques"] < 12
+        assert calls.count("track_debate_quality") == 6 - stats["exchanges_skipped"] < 6
+        skipped = [event["analysis"] for event in seen if event["type"] == events.CRITIQUE and event["analysis"].get("skipped")]
+        assert len(skipped) == stats["critiques_skipped"] and "total" in skipped[0]["scores"]
+        assert not converged[0] and converged[-1]
+        assert [event["converged"] for event in seen if event["type"] == events.ROUND_COMPLETE] == converged
+        print("✓ Round controller works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in round controller: {e}")
+        return False
+
+def test_load_test():
+    """Test that the load test drives simulated users through every phase and finds saturation."""
+    print("\nTesting load test harness...")
+
+    try:
+        from agents.backends import get_backend, use_backends
+        from loadtest import PHASES, find_saturation, run_load_test
+
+        use_backends("fake")
+        backend = get_backend("fake")
+        backend.latency_ms = 1
+        try:
+            results = run_load_test([2, 4], rounds=2, think_seconds=0, ramp_seconds=0)
+        finally:
+            use_backends()
+        for result, users in zip(results, [2, 4]):
+            assert result["completed"] == users and result["errors"] == 0, result["error_samples"]
+            assert result["latency_ms"]["round"]["count"] == 2 * users
+            assert all(result["latency_ms"][phase]["count"] == users for phase in PHASES if phase != "round")
+            assert result["llm_calls"] > 0 and "wait_p99_ms" in result["queueing_ms"]["interactive_critique"]
+
+        # Throughput that stops growing with users marks the saturation point
+        stages = [{"users": 10, "sessions_per_s": 1.0}, {"users": 100, "sessions_per_s": 9.5},
+                  {"users": 1000, "sessions_per_s": 20.0}]
+        assert find_saturation(stages) == 1000 and find_saturation(stages[:2]) is None
+        print("✓ Load test harness works")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error in load test harness: {e}")
+        return False
+
 def test_environment():
     """Test that the environment is properly configured."""
     print("Testing environment configuration...")
@@ -121,6 +1274,75 @@ def main():
     
     # Test basic functionality
     func_ok = test_basic_functionality()
+
+    # Test self-play
+    selfplay_ok = test_selfplay()
+    
+    # Test token budget
+    budget_ok = test_token_budget()
+    
+    # Test map-reduce evaluation
+    map_reduce_ok = test_map_reduce_evaluation()
+    
+    # Test evidence store
+    evidence_ok = test_evidence_store()
+    
+    # Test event pipeline
+    pipeline_ok = test_event_pipeline()
+    
+    # Test streaming critique
+    streaming_ok = test_streaming_critique()
+    
+    # Test single-flight coalescing
+    single_flight_ok = test_single_flight()
+    
+    # Test scheduler
+    scheduler_ok = test_scheduler()
+    
+    # Test record/replay cassette
+    cassette_ok = test_cassette()
+    
+    # Test fused critique
+    fused_ok = test_fused_critique()
+    
+    # Test profiler
+    profiler_ok = test_profiler()
+    
+    # Test session manager
+    sessions_ok = test_session_manager()
+    
+    # Test agent pool
+    pool_ok = test_agent_pool()
+    
+    # Test opening cache
+    openings_ok = test_opening_cache()
+    
+    # Test topic prefetch
+    prefetch_ok = test_topic_prefetch()
+    
+    # Test LLM backends
+    backends_ok = test_llm_backends()
+    
+    # Test async agent methods
+    async_ok = test_async_agents()
+    
+    # Test cancellation
+    cancellation_ok = test_cancellation()
+    
+    # Test session forking
+    fork_ok = test_session_fork()
+    
+    # Test response cache
+    response_cache_ok = test_response_cache()
+    
+    # Test debate export
+    export_ok = test_debate_export()
+    
+    # Test round controller
+    controller_ok = test_round_controller()
+    
+    # Test load test harness
+    loadtest_ok = test_load_test()
     
     # Summary
     print("\n" + "="*50)
@@ -130,8 +1352,38 @@ def main():
     print(f"Environment Configuration: {'✓' if env_ok else '✗'}")
     print(f"Agent Initialization: {'✓' if init_ok else '✗'}")
     print(f"Basic Functionality: {'✓' if func_ok else '✗'}")
+    print(f"Self-Play: {'✓' if selfplay_ok else '✗'}")
+    print(f"Token Budget: {'✓' if budget_ok else '✗'}")
+    print(f"Map-Reduce Evaluation: {'✓' if map_reduce_ok else '✗'}")
+    print(f"Evidence Store: {'✓' if evidence_ok else '✗'}")
+    print(f"Event Pipeline: {'✓' if pipeline_ok else '✗'}")
+    print(f"Streaming Critique: {'✓' if streaming_ok else '✗'}")
+    print(f"Single-Flight: {'✓' if single_flight_ok else '✗'}")
+    print(f"Scheduler: {'✓' if scheduler_ok else '✗'}")
+    print(f"Cassette: {'✓' if cassette_ok else '✗'}")
+    print(f"Fused Critique: {'✓' if fused_ok else '✗'}")
+    print(f"Profiler: {'✓' if profiler_ok else '✗'}")
+    print(f"Session Manager: {'✓' if sessions_ok else '✗'}")
+    print(f"Agent Pool: {'✓' if pool_ok else '✗'}")
+    print(f"Opening Cache: {'✓' if openings_ok else '✗'}")
+    print(f"Topic Prefetch: {'✓' if prefetch_ok else '✗'}")
+    print(f"LLM Backends: {'✓' if backends_ok else '✗'}")
+    print(f"Async Agents: {'✓' if async_ok else '✗'}")
+    print(f"Cancellation: {'✓' if cancellation_ok else '✗'}")
+    print(f"Session Forking: {'✓' if fork_ok else '✗'}")
+    print(f"Response Cache: {'✓' if response_cache_ok else '✗'}")
+    print(f"Debate Export: {'✓' if export_ok else '✗'}")
+    print(f"Round Controller: {'✓' if controller_ok else '✗'}")
+    print(f"Load Test: {'✓' if loadtest_ok else '✗'}")
     
-    if version_ok and env_ok and init_ok and func_ok:
+    extended_ok = (selfplay_ok and budget_ok and map_reduce_ok and evidence_ok and pipeline_ok
+                   and streaming_ok and single_flight_ok and scheduler_ok and cassette_ok and fused_ok
+                   and profiler_ok and sessions_ok and pool_ok
+                   and openings_ok and prefetch_ok and backends_ok and async_ok
+                   and cancellation_ok and fork_ok
+                   and response_cache_ok and export_ok and controller_ok
+                   and loadtest_ok)
+    if version_ok and env_ok and init_ok and func_ok and extended_ok:
         print("\n🎉 All tests passed! The system is ready to use.")
         print("Run 'python main.py' to start the debate system.")
     else:
@@ -140,4 +1392,18 @@ def main():
     print("="*50)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Debate Crew system tests")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="sample each test and write flamegraph-ready collapsed stacks to DIR")
+    args = parser.parse_args()
+    
+    from agents.base import BaseAgent
+    from utils.profiler import profiling
+    
+    with profiling(args.profile) as profiler:
+        if profiler is not None:
+            module = sys.modules[__name__]
+            profiler.instrument(module, [name for name in vars(module) if name.startswith("test_")])
+            for agent_class in BaseAgent.__subclasses__():
+                profiler.instrument(agent_class)
+        main() 
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Structured cancellation and deadlines for agent work
+A debate session owns a cancel scope and each round a child scope; cancelling a
+scope, or passing its deadline, aborts every LLM call and stream running under it
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, List, Optional
+
+class Cancelled(Exception):
+    """Raised when work is abandoned because its scope was cancelled."""
+
+class DeadlineExceeded(Cancelled):
+    """Raised when work is abandoned because its scope's deadline passed."""
+
+# Scope of the work running in the current thread or task
+_current: ContextVar[Optional["CancelScope"]] = ContextVar("cancel_scope", default=None)
+
+def current_scope() -> Optional["CancelScope"]:
+    """The cancel scope active for the calling code, or None."""
+    return _current.get()
+
+class CancelScope:
+    """
+    A cancellable unit of work with an optional deadline.
+
+    Agent calls pick up the scope active in their context (see activate).
+    cancel() may be called from any thread: calls in flight under the scope,
+    or under any child scope, are cancelled on their own event loops.
+    """
+
+    def __init__(self, name: str = "", timeout: Optional[float] = None, parent: Optional["CancelScope"] = None):
+        """
+        Args:
+            name: Label used in cancellation messages
+            timeout: Seconds until the scope's deadline; None means no deadline of its own
+            parent: Enclosing scope; cancelling it cancels this one, and its deadline bounds this one's
+        """
+        self.name = name
+        self.parent = parent
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        if parent is not None and parent.deadline is not None:
+            self.deadline = parent.deadline if self.deadline is None else min(self.deadline, parent.deadline)
+        self.reason = ""
+
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._callbacks: List[Callable[[], Any]] = []
+        self._children: List["CancelScope"] = []
+        if parent is not None:
+            parent._adopt(self)
+
+    def child(self, name: str = "", timeout: Optional[float] = None) -> "CancelScope":
+        """A scope nested in this one."""
+        return CancelScope(name, timeout, parent=self)
+
+    def _adopt(self, child: "CancelScope"):
+        with self._lock:
+            cancelled = self._cancelled.is_set()
+            if not cancelled:
+                self._children.append(child)
+        if cancelled:
+            child.cancel(self.reason)
+
+    def close(self):
+        """Detach a finished scope from its parent."""
+        if self.parent is not None:
+            with self.parent._lock:
+                if self in self.parent._children:
+                    self.parent._children.remove(self)
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancel the scope, its children and every call in flight under them."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self.reason = reason
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+            children, self._children = self._children, []
+        for callback in callbacks:
+            callback()
+        for child in children:
+            child.cancel(reason)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the scope was cancelled or its deadline has passed."""
+        return self._cancelled.is_set() or (self.deadline is not None and time.monotonic() >= self.deadline)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        """
+        Raise if work under this scope should stop.
+
+        Raises:
+            Cancelled: If the scope was cancelled
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self._cancelled.is_set():
+            raise Cancelled(f"{self.name or 'scope'} cancelled: {self.reason}")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise DeadlineExceeded(f"{self.name or 'scope'} deadline exceeded")
+
+    @contextmanager
+    def activate(self):
+        """Make this the scope agent calls in the block (and tasks it creates) run under."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    async def run(self, awaitable: Awaitable[Any]) -> Any:
+        """
+        Await work that is aborted if the scope is cancelled or its deadline passes.
+
+        Raises:
+            Cancelled: If the scope was cancelled while the work was running
+            DeadlineExceeded: If the deadline passed first
+        """
+        task = asyncio.ensure_future(awaitable)
+        loop = asyncio.get_running_loop()
+
+        def abort():
+            loop.call_soon_threadsafe(task.cancel)
+
+        with self._lock:
+            registered = not self._cancelled.is_set()
+            if registered:
+                self._callbacks.append(abort)
+        if not registered:
+            task.cancel()
+
+        try:
+            return await asyncio.wait_for(task, self.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"{self.name or 'scope'} deadline exceeded") from None
+        except asyncio.CancelledError:
+            # Only a cancel of this scope becomes Cancelled; the caller's own cancellation propagates
+            current = asyncio.current_task()
+            if self._cancelled.is_set() and not (current is not None and current.cancelling()):
+                raise Cancelled(f"{self.name or 'scope'} cancelled: {self.reason}") from None
+            raise
+        finally:
+            with self._lock:
+                if abort in self._callbacks:
+                    self._callbacks.remove(abort)
@@ -0,0 +1,134 @@
+"""
+Record/replay cassettes for agent LLM calls
+Record mode captures each request's response and latency; replay mode serves them
+locally so the whole debate flow can run offline and deterministically
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODES = ("record", "replay")
+TIMINGS = ("fast", "recorded")
+
+class CassetteMiss(Exception):
+    """Raised in replay mode when a request was never recorded."""
+
+def _open(path: str, mode: str):
+    """Open a cassette file, gzip-compressed when the path ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", timing: str = "fast", append: bool = False):
+        """
+        Args:
+            path: Cassette file (gzip-compressed when it ends in .gz)
+            mode: "record" or "replay"
+            timing: In replay, "fast" serves responses at once; "recorded" waits the recorded latency
+            append: In record mode, add to an existing cassette instead of starting it afresh
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {MODES}")
+        if timing not in TIMINGS:
+            raise ValueError(f"Unknown cassette timing {timing!r}; expected one of {TIMINGS}")
+
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+
+        self._lock = threading.Lock()
+        # request key -> recorded entries, replayed in order and then cycled
+        self._index: Dict[str, list] = {}
+        self._cursor: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+        if mode == "replay":
+            self._load()
+        elif not append:
+            # A new recording replaces the old one, so replay never serves stale responses first
+            with _open(path, "w"):
+                pass
+
+    def _load(self):
+        """Index every entry in the cassette file by request key."""
+        with _open(self.path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._index.setdefault(entry["k"], []).append(entry)
+
+    def play(self, key: str, method: str) -> Any:
+        """
+        Serve a recorded response.
+
+        Args:
+            key: Request key (model and normalized prompt)
+            method: Qualified agent method, used in error messages
+
+        Returns:
+            A fresh copy of the recorded response
+
+        Raises:
+            CassetteMiss: If the request is not in the cassette
+        """
+        entry = self._next_entry(key, method)
+        if self.timing == "recorded":
+            time.sleep(entry["ms"] / 1000)
+        return json.loads(entry["r"])
+
+    async def aplay(self, key: str, method: str) -> Any:
+        """Async form of play; recorded latency is awaited instead of blocking the event loop."""
+        entry = self._next_entry(key, method)
+        if self.timing == "recorded":
+            await asyncio.sleep(entry["ms"] / 1000)
+        return json.loads(entry["r"])
+
+    def _next_entry(self, key: str, method: str) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._index.get(key)
+            if not entries:
+                self.stats["misses"] += 1
+                raise CassetteMiss(f"No recorded response for {method} in {self.path}")
+            position = self._cursor.get(key, 0)
+            self._cursor[key] = position + 1
+            entry = entries[position % len(entries)]
+            self.stats["hits"] += 1
+            return entry
+
+    def record(self, key: str, method: str, model: str, response: Any, latency_ms: float):
+        """Append one request/response pair to the cassette file."""
+        entry = {"k": key, "m": method, "model": model, "ms": round(latency_ms, 2), "r": json.dumps(response)}
+        with self._lock:
+            with _open(self.path, "a") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self.stats["recorded"] += 1
+
+_active: Optional[Cassette] = None
+_configured = False
+
+def use_cassette(cassette: Optional[Cassette]):
+    """Install a cassette for every agent in the process (None turns recording/replay off)."""
+    global _active, _configured
+    _active = cassette
+    _configured = True
+
+def get_cassette() -> Optional[Cassette]:
+    """The active cassette, configured from LLM_CASSETTE_MODE / LLM_CASSETTE on first use."""
+    global _active, _configured
+    if not _configured:
+        mode = os.getenv("LLM_CASSETTE_MODE", "off")
+        if mode != "off":
+            _active = Cassette(os.getenv("LLM_CASSETTE", "llm_cassette.jsonl.gz"), mode,
+                               os.getenv("LLM_CASSETTE_TIMING", "fast"),
+                               os.getenv("LLM_CASSETTE_APPEND", "0") == "1")
+        _configured = True
+    return _active
@@ -0,0 +1,113 @@
+"""
+Append-only log of finished debates
+Each debate is one JSON line with its transcript, per-turn critique scores, final
+scores and evaluation, read back incrementally by byte offset for bulk export
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from utils.forkable import ForkableList
+
+load_dotenv()
+
+def _encode(value: Any) -> Any:
+    """JSON fallback: forked histories as plain lists, anything else as its string."""
+    if isinstance(value, ForkableList):
+        return list(value)
+    return str(value)
+
+def debate_record(session_id: str, topic: str, stance: str, history: List[str],
+                  critique: Any, evaluation: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The log record for a finished debate.
+
+    Args:
+        session_id: Id of the session that hosted the debate
+        topic: The debate topic
+        stance: The stance the Debator was given
+        history: Transcript entries ("Speaker: text")
+        critique: The debate's CritiqueAgent, for per-turn and final scores
+        evaluation: Output of final_evaluation, or None if it was skipped
+    """
+    return {
+        "session_id": session_id,
+        "topic": topic,
+        "stance": stance,
+        "finished_at": time.time(),
+        "history": list(history),
+        "critiques": [
+            {"speaker": entry["speaker"], "context": entry["context"], "scores": entry["scores"]}
+            for entry in critique.feedback_history
+        ],
+        "final_scores": critique.get_current_scores(),
+        "evaluation": evaluation,
+    }
+
+class DebateLog:
+    """
+    JSONL file of debate records, safe to append to from several processes.
+
+    Each record is written with a single append, so readers only ever see
+    whole lines plus, at worst, one line still being written at the end.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]):
+        """Add a debate record to the end of the log."""
+        line = (json.dumps(record, separators=(",", ":"), default=_encode) + "\n").encode("utf-8")
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def read(self, offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        Stream records from a byte offset, one line at a time.
+
+        Args:
+            offset: Byte offset to start at, e.g. a previous read's last end offset
+
+        Yields:
+            (record, end_offset) pairs; end_offset is where the next record starts.
+            A trailing line still being written is not yielded.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if line.strip():
+                    yield json.loads(line), offset
+
+_active: Optional[DebateLog] = None
+_configured = False
+
+def use_debate_log(log: Optional[DebateLog]):
+    """Install the debate log for the process (None turns logging off)."""
+    global _active, _configured
+    _active = log
+    _configured = True
+
+def get_debate_log() -> Optional[DebateLog]:
+    """The active debate log, at DEBATE_LOG_FILE (empty or unset disables it)."""
+    global _active, _configured
+    if not _configured:
+        path = os.getenv("DEBATE_LOG_FILE", "")
+        _active = DebateLog(path) if path else None
+        _configured = True
+    return _active
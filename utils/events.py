@@ -0,0 +1,85 @@
+"""
+Event bus for the debate pipeline
+Every front-end (Rich console, headless runners, a future web UI) subscribes to the same event stream
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, List
+
+# Event types published by the debate pipeline
+OPENING = "opening"
+USER_ARGUMENT = "user_argument"
+DEBATOR_CHUNK = "debator_chunk"
+DEBATOR_RESPONSE = "debator_response"
+PROVISIONAL_CRITIQUE = "provisional_critique"
+CRITIQUE = "critique"
+EXCHANGE = "exchange"
+MID_DEBATE_FEEDBACK = "mid_debate_feedback"
+SCORES = "scores"
+ROUND_COMPLETE = "round_complete"
+ROUND_CANCELLED = "round_cancelled"
+FINAL_EVALUATION = "final_evaluation"
+AGENT_CALL = "agent_call"
+ERROR = "error"
+DEBATE_ENDED = "debate_ended"
+
+# Stream and telemetry events a slow subscriber can afford to lose; every other
+# event changes the debate's state and is always delivered
+DROPPABLE_EVENTS = {DEBATOR_CHUNK, PROVISIONAL_CRITIQUE, AGENT_CALL}
+
+class _SubscriberQueue(asyncio.Queue):
+    """Unbounded queue that can give up its oldest droppable event."""
+
+    def discard_droppable(self) -> bool:
+        """Remove the oldest droppable event; False if there is none."""
+        for index, event in enumerate(self._queue):
+            if event["type"] in DROPPABLE_EVENTS:
+                del self._queue[index]
+                self.task_done()
+                return True
+        return False
+
+class EventBus:
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
+        self._subscribers: List[_SubscriberQueue] = []
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        """Create a queue that receives every event published from now on."""
+        # Bounded by publish() rather than maxsize, so control events always fit
+        queue = _SubscriberQueue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Stop delivering events to a queue."""
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def publish(self, event_type: str, **data) -> Dict[str, Any]:
+        """
+        Publish an event to all subscribers without waiting on any of them.
+
+        A subscriber that falls behind loses its oldest stream events
+        (DROPPABLE_EVENTS) rather than slowing the pipeline down. Control
+        events are delivered even if that takes the queue past its bound.
+
+        Args:
+            event_type: One of the event type constants in this module
+            **data: JSON-serializable event payload
+
+        Returns:
+            The published event
+        """
+        event = {"type": event_type, "timestamp": time.time(), **data}
+        for queue in self._subscribers:
+            if queue.qsize() >= self.max_queue_size:
+                if queue.discard_droppable():
+                    self.dropped += 1
+                elif event_type in DROPPABLE_EVENTS:
+                    self.dropped += 1
+                    continue
+            queue.put_nowait(event)
+        return event
@@ -0,0 +1,172 @@
+"""
+Local evidence store for grounding Debator arguments
+Indexes a folder of local documents with an inverted index and serves BM25-ranked passages
+"""
+
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, List, Optional
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "should", "that", "the", "their", "this", "to", "was", "were", "will", "with",
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class EvidenceStore:
+    # Supported document types in the corpus folder
+    EXTENSIONS = (".txt", ".md")
+    # Passages kept per topic by prefetch
+    PREFETCH_SIZE = 20
+    # Topics whose prefetched passages are kept, least recently used dropped first
+    PREFETCH_TOPICS = 32
+
+    def __init__(self, corpus_dir: Optional[str] = None):
+        self.corpus_dir = corpus_dir or os.getenv("EVIDENCE_DIR", "evidence")
+
+        self.passages = []
+        self.index = {}
+        self.doc_lengths = []
+        self.avg_length = 0.0
+
+        self._index_lock = threading.Lock()
+        self._indexed = False
+        # Started on the first prefetch and stopped by close()
+        self._executor = None
+        self._prefetch_lock = threading.Lock()
+        self._prefetched = OrderedDict()
+
+    def _load_passages(self) -> List[Dict[str, str]]:
+        """Split every document in the corpus folder into paragraph passages."""
+        passages = []
+        if not os.path.isdir(self.corpus_dir):
+            return passages
+
+        for root, _, files in os.walk(self.corpus_dir):
+            for name in sorted(files):
+                if not name.endswith(self.EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                with open(path, encoding="utf-8") as f:
+                    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", f.read()) if p.strip()]
+                source = os.path.relpath(path, self.corpus_dir)
+                for i, paragraph in enumerate(paragraphs, 1):
+                    passages.append({"id": f"{source}#{i}", "source": source, "text": paragraph})
+        return passages
+
+    def build_index(self):
+        """Load the corpus and build the inverted index (once; safe to call from any thread)."""
+        with self._index_lock:
+            if self._indexed:
+                return
+
+            self.passages = self._load_passages()
+            for doc_id, passage in enumerate(self.passages):
+                counts = Counter(tokenize(passage["text"]))
+                self.doc_lengths.append(sum(counts.values()))
+                for term, tf in counts.items():
+                    self.index.setdefault(term, []).append((doc_id, tf))
+
+            self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+            self._indexed = True
+
+    def search(self, query: str, k: int = 3, candidates: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Rank passages against a query with BM25.
+
+        Args:
+            query: Free-text query (a topic, claim or argument)
+            k: Number of passages to return
+            candidates: Optional passage indexes to restrict the search to
+
+        Returns:
+            List of passages with "id", "source", "text", "score" and "index", best first
+        """
+        self.build_index()
+        if not self.passages:
+            return []
+
+        k1, b = 1.5, 0.75
+        allowed = set(candidates) if candidates is not None else None
+        total = len(self.passages)
+        scores = {}
+
+        for term in set(tokenize(query)):
+            postings = self.index.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [dict(self.passages[doc_id], score=round(score, 3), index=doc_id) for doc_id, score in ranked]
+
+    def prefetch(self, topic: str) -> Future:
+        """
+        Start indexing and retrieving the top passages for a topic in the background.
+
+        Args:
+            topic: The selected debate topic
+
+        Returns:
+            Future resolving to the topic's prefetched passages
+        """
+        with self._prefetch_lock:
+            future = self._prefetched.get(topic)
+            if future is not None:
+                self._prefetched.move_to_end(topic)
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evidence-prefetch")
+            future = self._prefetched[topic] = self._executor.submit(self.search, topic, self.PREFETCH_SIZE)
+            while len(self._prefetched) > self.PREFETCH_TOPICS:
+                _, dropped = self._prefetched.popitem(last=False)
+                dropped.cancel()
+            return future
+
+    def lookup(self, topic: str, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Get grounded snippets for a query within a topic.
+
+        Passages from the topic's prefetched pool come first (once the prefetch
+        has finished); the rest are filled from the whole corpus.
+        """
+        hits = []
+        with self._prefetch_lock:
+            future = self._prefetched.get(topic)
+        if future is not None and future.done() and future.result():
+            hits = self.search(query, k, candidates=[p["index"] for p in future.result()])
+
+        if len(hits) < k:
+            seen = {hit["id"] for hit in hits}
+            hits += [hit for hit in self.search(query, k) if hit["id"] not in seen][:k - len(hits)]
+        return hits
+
+    def close(self):
+        """Stop the prefetch worker and drop prefetched passages; the index is kept."""
+        with self._prefetch_lock:
+            executor, self._executor = self._executor, None
+            prefetched, self._prefetched = self._prefetched, OrderedDict()
+        for future in prefetched.values():
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def format_snippets(snippets: List[Dict[str, Any]]) -> str:
+    """Render snippets for a prompt, each tagged with its citation id."""
+    if not snippets:
+        return "No local sources available."
+    return "\n".join(f"[{s['id']}] {s['text']}" for s in snippets)
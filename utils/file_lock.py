@@ -0,0 +1,33 @@
+"""
+Advisory file locks shared across processes
+Serializes read-merge-write cycles on files that several worker processes update
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - platforms without fcntl write unlocked
+    fcntl = None
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on path + ".lock" for the duration of the block.
+
+    Args:
+        path: The file being updated; the lock lives in a sibling file so the
+            update itself can replace path atomically
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,99 @@
+"""
+Append-only lists that fork in constant time
+A fork shares its parent's entries up to a given length instead of copying them,
+which lets a debate branch off an earlier round without duplicating its transcript
+"""
+
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional
+
+class ForkableList:
+    """
+    An append-only list whose forks share a prefix of it copy-on-write.
+
+    fork() is O(1) in time and memory: the fork keeps a reference to this
+    list and the length it shares, and entries appended to either list
+    afterwards are visible only to that list. Entries are never changed in
+    place, so a shared prefix can be read from any thread while its owner
+    keeps appending.
+
+    Supports the read operations the agents use on their history lists
+    (len, indexing, slicing, iteration, equality with a plain list) plus
+    append and extend.
+    """
+
+    __slots__ = ("_base", "_base_length", "_own", "_shared")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        self._base: Optional["ForkableList"] = None
+        self._base_length = 0
+        self._own: List[Any] = list(items)
+        # Longest prefix of this list handed out to forks
+        self._shared = 0
+
+    def fork(self, length: Optional[int] = None) -> "ForkableList":
+        """
+        A new list starting with this one's first length entries.
+
+        Args:
+            length: Entries to share; None shares the whole list
+
+        Raises:
+            ValueError: If length is negative or longer than the list
+        """
+        size = len(self)
+        length = size if length is None else length
+        if not 0 <= length <= size:
+            raise ValueError(f"Cannot fork {length} entries of a list of {size}")
+
+        self._shared = max(self._shared, length)
+        fork = ForkableList()
+        if length <= self._base_length and self._base is not None:
+            # The prefix lies entirely in our own base, so skip a level
+            fork._base, fork._base_length = self._base, length
+        else:
+            fork._base, fork._base_length = self, length
+        return fork
+
+    def unshared(self) -> List[Any]:
+        """Entries this list holds itself that no fork shares."""
+        return self._own[max(0, self._shared - self._base_length):]
+
+    def append(self, item: Any):
+        self._own.append(item)
+
+    def extend(self, items: Iterable[Any]):
+        self._own.extend(items)
+
+    def __len__(self) -> int:
+        return self._base_length + len(self._own)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ForkableList index out of range")
+        if index >= self._base_length:
+            return self._own[index - self._base_length]
+        return self._base[index]
+
+    def _iter_prefix(self, length: int) -> Iterator[Any]:
+        if self._base is not None:
+            yield from self._base._iter_prefix(min(length, self._base_length))
+        yield from islice(self._own, max(0, length - self._base_length))
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._iter_prefix(len(self))
+
+    def __reversed__(self) -> Iterator[Any]:
+        return reversed(list(self))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ForkableList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ForkableList({list(self)!r})"
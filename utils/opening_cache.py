@@ -0,0 +1,126 @@
+"""
+Persistent cache of Debator opening statements
+Openings are keyed by normalized topic, stance, model and prompt version, and several
+variants are kept per key so repeated topics still open differently
+"""
+
+import json
+import os
+import random
+import re
+import threading
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+from utils.file_lock import file_lock
+
+load_dotenv()
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase a topic and drop surrounding punctuation and repeated whitespace."""
+    return re.sub(r"\s+", " ", topic).strip().strip("?.!\"'").strip().lower()
+
+class OpeningCache:
+    def __init__(self, path: str, variants: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Args:
+            path: JSON file the cache is loaded from and saved to
+            variants: Openings kept per key (OPENING_CACHE_VARIANTS by default)
+            seed: Seed for picking among variants
+        """
+        self.path = path
+        self.variants = variants if variants is not None else int(os.getenv("OPENING_CACHE_VARIANTS", "3"))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[str]] = {}
+        self.stats = {"hits": 0, "misses": 0, "added": 0}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    @staticmethod
+    def key(topic: str, stance: str, model: str, prompt_version: int) -> str:
+        return f"{model}|v{prompt_version}|{stance.lower()}|{normalize_topic(topic)}"
+
+    def get(self, topic: str, stance: str, model: str, prompt_version: int) -> Optional[str]:
+        """
+        A random stored variant for the key, or None until the key holds all its variants.
+
+        Serving a partly filled key would repeat its few openings for every
+        later debate, so until it is full each debate generates a new one.
+        """
+        with self._lock:
+            variants = self._entries.get(self.key(topic, stance, model, prompt_version))
+            if not variants or len(variants) < self.variants:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            return self._rng.choice(variants)
+
+    def stored(self, topic: str, stance: str, model: str, prompt_version: int) -> int:
+        """How many variants the key holds."""
+        with self._lock:
+            return len(self._entries.get(self.key(topic, stance, model, prompt_version), []))
+
+    def missing(self, topic: str, stance: str, model: str, prompt_version: int) -> int:
+        """How many more variants the key can hold."""
+        return max(0, self.variants - self.stored(topic, stance, model, prompt_version))
+
+    def add(self, topic: str, stance: str, model: str, prompt_version: int, opening: str) -> bool:
+        """
+        Store an opening as a variant for its key.
+
+        Returns:
+            True if it was stored; False if it duplicates a variant or the key is full
+        """
+        with self._lock:
+            variants = self._entries.setdefault(self.key(topic, stance, model, prompt_version), [])
+            if opening in variants or len(variants) >= self.variants:
+                return False
+            variants.append(opening)
+            self.stats["added"] += 1
+            return True
+
+    def save(self):
+        """
+        Write the cache to disk atomically, merged with what is there.
+
+        Other processes save to the same file, so under a file lock the file
+        is re-read and their variants are kept alongside ours (up to the
+        per-key limit) before it is replaced.
+        """
+        with file_lock(self.path):
+            on_disk: Dict[str, List[str]] = {}
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    on_disk = json.load(f)
+            with self._lock:
+                for key, variants in on_disk.items():
+                    merged = self._entries.setdefault(key, [])
+                    for opening in variants:
+                        if opening not in merged and len(merged) < self.variants:
+                            merged.append(opening)
+                data = json.dumps(self._entries, indent=1)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+
+_active: Optional[OpeningCache] = None
+_configured = False
+
+def use_opening_cache(cache: Optional[OpeningCache]):
+    """Install the opening cache for every Debator in the process (None turns it off)."""
+    global _active, _configured
+    _active = cache
+    _configured = True
+
+def get_opening_cache() -> Optional[OpeningCache]:
+    """The active opening cache, loaded from OPENING_CACHE_FILE on first use (empty or unset disables it)."""
+    global _active, _configured
+    if not _configured:
+        path = os.getenv("OPENING_CACHE_FILE", "")
+        _active = OpeningCache(path) if path else None
+        _configured = True
+    return _active
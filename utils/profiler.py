@@ -0,0 +1,237 @@
+"""
+Sampling profiler with per-phase attribution
+Samples every thread's Python stack on a timer, tags each sample with the phases
+and agent methods active at the time, and writes collapsed stacks for flamegraphs
+"""
+
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterable, List, Optional
+from rich.console import Console
+
+# Leaf frames in these modules are threads blocked on a lock, queue or selector
+_IDLE_MODULES = {"threading.py", "selectors.py", "queue.py", "thread.py"}
+# Leaf functions that block on the terminal
+_IDLE_FUNCTIONS = {"input", "getpass"}
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        """
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+
+        self._labels: Dict[int, List[str]] = {}
+        self._root_thread = threading.get_ident()
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._timings_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start sampling in a background thread."""
+        self._root_thread = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @contextmanager
+    def phase(self, label: str):
+        """Attribute samples and wall time inside the block to a phase label."""
+        stack = self._labels.setdefault(threading.get_ident(), [])
+        stack.append(label)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            with self._timings_lock:
+                timing = self._timings.setdefault(label, {"calls": 0, "seconds": 0.0})
+                timing["calls"] += 1
+                timing["seconds"] += elapsed
+
+    def wrap(self, label: str, func: Callable) -> Callable:
+        """Wrap a function so every call runs inside phase(label)."""
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler.phase(label):
+                result = func(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return profiler._wrap_generator(label, result)
+            return result
+
+        return wrapper
+
+    def _wrap_generator(self, label: str, generator):
+        """Re-enter the phase whenever a returned generator is resumed."""
+        while True:
+            with self.phase(label):
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+            yield item
+
+    def instrument(self, target: Any, names: Optional[Iterable[str]] = None):
+        """
+        Wrap methods of a class (or functions of a module) in phase hooks.
+
+        Methods are labelled "Class.method"; module functions by their name.
+
+        Args:
+            target: Class or module whose attributes are replaced
+            names: Attributes to wrap; defaults to the public functions defined on the target
+        """
+        prefix = f"{target.__name__}." if inspect.isclass(target) else ""
+        if names is None:
+            # Coroutines interleave on one thread, so per-thread phase labels cannot
+            # attribute them; their synchronous wrappers are instrumented instead
+            names = [name for name, value in vars(target).items()
+                     if inspect.isfunction(value) and not inspect.iscoroutinefunction(value)
+                     and not name.startswith("_")]
+        for name in names:
+            setattr(target, name, self.wrap(f"{prefix}{name}", getattr(target, name)))
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            root_labels = list(self._labels.get(self._root_thread, ()))
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                labels = list(self._labels.get(thread_id, ()))
+                if thread_id != self._root_thread:
+                    labels = root_labels + labels
+                if not labels or self._is_idle(frame):
+                    continue
+
+                frames = []
+                while frame is not None:
+                    # The phase hooks' own wrapper frames are left out of the stacks
+                    if frame.f_code.co_filename != __file__:
+                        frames.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                self.samples[";".join(labels + frames[::-1])] += 1
+                self.sample_count += 1
+
+    @staticmethod
+    def _is_idle(frame) -> bool:
+        code = frame.f_code
+        return os.path.basename(code.co_filename) in _IDLE_MODULES or code.co_name in _IDLE_FUNCTIONS
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Wall time and samples per phase label.
+
+        Returns:
+            Dict mapping each label to its calls, wall seconds, samples and
+            top self-time functions
+        """
+        with self._timings_lock:
+            timings = {label: dict(values) for label, values in self._timings.items()}
+
+        per_label = {}
+        for stack, count in self.samples.items():
+            parts = stack.split(";")
+            labels = [part for part in parts if part in timings]
+            for label in set(labels):
+                entry = per_label.setdefault(label, {"samples": 0, "self": Counter()})
+                entry["samples"] += count
+                entry["self"][parts[-1]] += count
+
+        result = {}
+        for label, timing in timings.items():
+            entry = per_label.get(label, {"samples": 0, "self": Counter()})
+            result[label] = {
+                "calls": timing["calls"],
+                "wall_ms": round(timing["seconds"] * 1000, 2),
+                "samples": entry["samples"],
+                "top_self": entry["self"].most_common(10),
+            }
+        return result
+
+    def write(self, output_dir: str) -> List[str]:
+        """
+        Write collapsed stacks and a text summary.
+
+        One <phase>.collapsed file is written per top-level phase, plus
+        all.collapsed and summary.txt. Collapsed files feed flamegraph.pl,
+        speedscope or inferno directly.
+
+        Args:
+            output_dir: Directory to write into (created if missing)
+
+        Returns:
+            Paths of the files written
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        by_phase: Dict[str, List[str]] = {}
+        for stack, count in sorted(self.samples.items()):
+            by_phase.setdefault(stack.split(";", 1)[0], []).append(f"{stack} {count}")
+
+        paths = []
+        for phase, lines in [("all", [line for lines in by_phase.values() for line in lines])] + sorted(by_phase.items()):
+            path = os.path.join(output_dir, f"{phase}.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n" if lines else "")
+            paths.append(path)
+
+        path = os.path.join(output_dir, "summary.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{self.sample_count} samples every {self.interval * 1000:g} ms\n")
+            for label, entry in sorted(self.report().items(), key=lambda item: -item[1]["wall_ms"]):
+                f.write(f"\n{label}: {entry['calls']} calls, {entry['wall_ms']} ms wall, {entry['samples']} samples\n")
+                for frame, count in entry["top_self"]:
+                    f.write(f"    {count:6d}  {frame}\n")
+        paths.append(path)
+        return paths
+
+@contextmanager
+def profiling(output_dir: Optional[str], interval: float = 0.005, console: Optional[Console] = None):
+    """
+    Profile the block when output_dir is set, writing results on exit.
+
+    Args:
+        output_dir: Directory for the results; None or empty turns profiling off
+        interval: Seconds between samples
+        console: Console that reports where the results went (default: a new one)
+
+    Yields:
+        The running SamplingProfiler, or None when profiling is off
+    """
+    if not output_dir:
+        yield None
+        return
+
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        paths = profiler.write(output_dir)
+        (console or Console()).print(
+            f"[dim]Profile written to {output_dir} ({profiler.sample_count} samples, {len(paths)} files)[/dim]"
+        )
@@ -0,0 +1,259 @@
+"""
+Response cache shared by every worker process on a machine
+Agent LLM results are stored in SQLite in WAL mode, so a result computed by one
+process is read by the others on their next identical request
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Agent methods whose results are worth sharing: they depend only on the prompt
+CACHED_METHODS = (
+    "TopicSelectorAgent.generate_topics",
+    "DebatorAgent.initialize_debate",
+    "CritiqueAgent.critique_argument",
+    "CritiqueAgent.analyze_argument",
+    "CritiqueAgent.identify_logical_fallacies",
+    "CritiqueAgent.suggest_improvements",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_use ON responses (last_used);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (id, bytes) SELECT 0, COALESCE(SUM(size), 0) FROM responses;
+"""
+
+class ResponseCache:
+    """
+    A size-bounded LLM response cache several processes can use at once.
+
+    Each thread of each process opens its own connection. WAL mode lets
+    readers proceed while another process writes. Every write is a single
+    transaction, so readers see a response either whole or not at all. When
+    the stored responses outgrow max_bytes, the least recently used are
+    evicted in the same transaction; the total size is kept in its own row
+    so a write never has to add up the whole table.
+
+    Hits only read. Their last-used times are batched and written with the
+    next store, or once TOUCH_BATCH of them or TOUCH_INTERVAL seconds have
+    accumulated, so lookups do not queue for the write lock.
+    """
+
+    TOUCH_BATCH = 64
+    TOUCH_INTERVAL = 5.0
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, methods: Optional[List[str]] = None):
+        """
+        Args:
+            path: SQLite database file shared by the worker processes
+            max_bytes: Total size of stored responses (RESPONSE_CACHE_MAX_MB by default)
+            methods: Qualified agent methods to cache (RESPONSE_CACHE_METHODS, or CACHED_METHODS)
+        """
+        self.path = path
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("RESPONSE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        if methods is None:
+            configured = os.getenv("RESPONSE_CACHE_METHODS", "")
+            methods = [method.strip() for method in configured.split(",") if method.strip()] or list(CACHED_METHODS)
+        self.methods = set(methods)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        # Hits, misses and stores by this process, per method
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        # Last-used times of hits not yet written, by key
+        self._touched: Dict[str, float] = {}
+        self._touched_since = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection inherited from a parent process must not be reused
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection, self._local.pid = connection, os.getpid()
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _count(self, method: str, outcome: str):
+        with self._lock:
+            stats = self._stats.setdefault(method, {"hits": 0, "misses": 0, "stores": 0})
+            stats[outcome] += 1
+
+    def caches(self, method: str) -> bool:
+        """Whether results of a qualified agent method are cached."""
+        return method in self.methods
+
+    def get(self, key: str, method: str) -> Optional[Any]:
+        """
+        The stored response for a request key, or None.
+
+        Args:
+            key: request_key() of the model and prompt
+            method: Qualified agent method, for the metrics
+        """
+        connection = self._connection()
+        row = connection.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count(method, "misses")
+            return None
+        self._count(method, "hits")
+        with self._lock:
+            self._touched[key] = time.time()
+            due = (len(self._touched) >= self.TOUCH_BATCH
+                   or time.monotonic() - self._touched_since >= self.TOUCH_INTERVAL)
+        if due:
+            self._flush_touches()
+        return json.loads(row[0])
+
+    def _flush_touches(self):
+        """Write the batched last-used times in a transaction of their own."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_touches(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _write_touches(self, connection: sqlite3.Connection):
+        """Write the batched last-used times, inside the caller's transaction."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touched_since = time.monotonic()
+        connection.executemany("UPDATE responses SET last_used = MAX(last_used, ?) WHERE key = ?",
+                               [(used, key) for key, used in touched.items()])
+
+    def put(self, key: str, method: str, value: Any) -> bool:
+        """
+        Store a response, evicting the least recently used ones past max_bytes.
+
+        Returns:
+            True if it was stored; False if it is not JSON-serializable or larger than the cache
+        """
+        try:
+            data = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return False
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+
+        connection = self._connection()
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue instead of deadlocking
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Eviction order should reflect the hits seen so far
+            self._write_touches(connection)
+            replaced = connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            connection.execute("INSERT OR REPLACE INTO responses (key, method, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                               (key, method, data, size, time.time()))
+            connection.execute("UPDATE totals SET bytes = bytes + ? WHERE id = 0", (size - (replaced[0] if replaced else 0),))
+            excess = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0] - self.max_bytes
+            evicted = []
+            if excess > 0:
+                freed = 0
+                for old_key, old_size in connection.execute("SELECT key, size FROM responses WHERE key != ? ORDER BY last_used", (key,)):
+                    evicted.append((old_key,))
+                    freed += old_size
+                    if freed >= excess:
+                        break
+                connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+                connection.execute("UPDATE totals SET bytes = bytes - ? WHERE id = 0", (freed,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        self._count(method, "stores")
+        with self._lock:
+            self.evictions += len(evicted)
+        return True
+
+    def report(self) -> Dict[str, Any]:
+        """This process's hit/miss metrics, plus the size of the shared store."""
+        connection = self._connection()
+        entries = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        stored = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+        with self._lock:
+            per_method = {method: dict(stats) for method, stats in self._stats.items()}
+            evictions = self.evictions
+        hits = sum(stats["hits"] for stats in per_method.values())
+        lookups = hits + sum(stats["misses"] for stats in per_method.values())
+        return {
+            "per_method": per_method,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "evictions": evictions,
+            "entries": entries,
+            "bytes": stored,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        """Delete every stored response (for all processes)."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM responses")
+            connection.execute("UPDATE totals SET bytes = 0 WHERE id = 0")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._touched = {}
+
+    def close(self):
+        """Write pending last-used times and close every connection this process opened."""
+        if self._touched:
+            self._flush_touches()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+_active: Optional[ResponseCache] = None
+_configured = False
+
+def use_response_cache(cache: Optional[ResponseCache]):
+    """Install the response cache for every agent in the process (None turns it off)."""
+    global _active, _configured
+    _active = cache
+    _configured = True
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The active response cache, opened from RESPONSE_CACHE_FILE on first use (empty or unset disables it)."""
+    global _active, _configured
+    if not _configured:
+        path = os.getenv("RESPONSE_CACHE_FILE", "")
+        _active = ResponseCache(path) if path else None
+        _configured = True
+    return _active
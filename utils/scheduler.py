@@ -0,0 +1,265 @@
+"""
+Priority-aware LLM call scheduler with global rate limiting
+Admits calls through request-per-minute and token-per-minute buckets, serving
+interactive work first and sessions fairly within each priority class
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+
+from utils.stats import percentile
+
+load_dotenv()
+
+# Priority classes, most urgent first
+INTERACTIVE_GENERATION = 0
+INTERACTIVE_CRITIQUE = 1
+BACKGROUND = 2
+BATCH = 3
+
+PRIORITY_NAMES = {
+    INTERACTIVE_GENERATION: "interactive_generation",
+    INTERACTIVE_CRITIQUE: "interactive_critique",
+    BACKGROUND: "background",
+    BATCH: "batch",
+}
+
+# Priority of each agent method; anything not listed runs as background work
+METHOD_PRIORITIES = {
+    "TopicSelectorAgent.generate_topics": INTERACTIVE_GENERATION,
+    "TopicSelectorAgent.analyze_resume_portfolio": INTERACTIVE_GENERATION,
+    "DebatorAgent.initialize_debate": INTERACTIVE_GENERATION,
+    "DebatorAgent.build_argument": INTERACTIVE_GENERATION,
+    "DebatorAgent.respond_to_counter": INTERACTIVE_GENERATION,
+    "DebatorAgent.provide_evidence": INTERACTIVE_GENERATION,
+    "DebatorAgent.summarize_position": INTERACTIVE_GENERATION,
+    "CritiqueAgent.critique_argument": INTERACTIVE_CRITIQUE,
+    "CritiqueAgent.analyze_argument": INTERACTIVE_CRITIQUE,
+    "CritiqueAgent.identify_logical_fallacies": INTERACTIVE_CRITIQUE,
+    "CritiqueAgent.suggest_improvements": INTERACTIVE_CRITIQUE,
+    "CritiqueAgent.final_evaluation": INTERACTIVE_CRITIQUE,
+    "CritiqueAgent.track_debate_quality": BACKGROUND,
+    "CritiqueAgent.provide_mid_debate_feedback": BACKGROUND,
+    "CritiqueAgent.summarize_chunk": BACKGROUND,
+    "CritiqueAgent.merge_summaries": BACKGROUND,
+    "UserSimulatorAgent.respond": BATCH,
+}
+
+class TokenBucket:
+    """Bucket holding up to `per_minute` units, refilled continuously."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        """Take `amount` units; callers check wait_time first."""
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+class _Ticket:
+    def __init__(self, session: str, priority: int, tokens: int):
+        self.session = session
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+
+class LLMScheduler:
+    # Wait-time samples kept per priority class for percentiles
+    MAX_SAMPLES = 10000
+    # Longest a waiter behind the queue head sleeps without being woken (a safety net)
+    IDLE_WAIT_SECONDS = 0.5
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self._cond = threading.Condition()
+        # Event loop -> event its async waiters sleep on until the queue changes
+        self._loop_events: Dict[asyncio.AbstractEventLoop, asyncio.Event] = {}
+        self.set_limits(requests_per_minute, tokens_per_minute)
+        # priority -> session -> queued tickets; sessions rotate round-robin
+        self._queues = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self._wait_samples = {priority: deque(maxlen=self.MAX_SAMPLES) for priority in PRIORITY_NAMES}
+        self._admitted = {priority: 0 for priority in PRIORITY_NAMES}
+
+    def _next_ticket(self) -> Optional[_Ticket]:
+        """The ticket that should be admitted next: highest priority, fair across sessions."""
+        for priority in sorted(self._queues):
+            sessions = self._queues[priority]
+            if sessions:
+                return next(iter(sessions.values()))[0]
+        return None
+
+    def _wait_time(self, ticket: _Ticket) -> float:
+        waits = [0.0]
+        if self.request_bucket is not None:
+            waits.append(self.request_bucket.wait_time(1))
+        if self.token_bucket is not None:
+            waits.append(self.token_bucket.wait_time(ticket.tokens))
+        return max(waits)
+
+    def _admit(self, ticket: _Ticket):
+        """Consume rate-limit capacity and rotate the ticket's session to the back."""
+        if self.request_bucket is not None:
+            self.request_bucket.consume(1)
+        if self.token_bucket is not None:
+            self.token_bucket.consume(ticket.tokens)
+
+        sessions = self._queues[ticket.priority]
+        queue = sessions.pop(ticket.session)
+        queue.popleft()
+        if queue:
+            sessions[ticket.session] = queue
+
+        self._wait_samples[ticket.priority].append(time.monotonic() - ticket.enqueued)
+        self._admitted[ticket.priority] += 1
+        self._wake_async()
+
+    def _loop_event(self) -> asyncio.Event:
+        """The event async waiters on the running loop sleep on; call with the lock held."""
+        loop = asyncio.get_running_loop()
+        event = self._loop_events.get(loop)
+        if event is None:
+            event = self._loop_events[loop] = asyncio.Event()
+        return event
+
+    def _wake_async(self):
+        """Wake the async waiters on every loop to re-check the queue; call with the lock held."""
+        events, self._loop_events = self._loop_events, {}
+        for loop, event in events.items():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The loop has closed, and its waiters with it
+                pass
+
+    def acquire(self, session: str, priority: int, tokens: int) -> float:
+        """
+        Block until a call may be sent.
+
+        Args:
+            session: Session the call belongs to (used for fair queuing)
+            priority: One of the priority class constants
+            tokens: Estimated tokens the call will use
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        ticket = _Ticket(session, priority, tokens)
+        with self._cond:
+            self._queues[priority].setdefault(session, deque()).append(ticket)
+            try:
+                while True:
+                    if self._next_ticket() is ticket:
+                        wait = self._wait_time(ticket)
+                        if wait == 0.0:
+                            self._admit(ticket)
+                            self._cond.notify_all()
+                            return time.monotonic() - ticket.enqueued
+                        self._cond.wait(timeout=wait)
+                    else:
+                        self._cond.wait(timeout=self.IDLE_WAIT_SECONDS)
+            except BaseException:
+                # e.g. KeyboardInterrupt: a dead ticket at the head would stall everyone behind it
+                self._withdraw(ticket)
+                self._cond.notify_all()
+                raise
+
+    async def aacquire(self, session: str, priority: int, tokens: int) -> float:
+        """
+        Async form of acquire: waits without blocking the event loop.
+
+        Async and blocking callers share the same queues and buckets. A caller
+        cancelled while queued gives up its place. The queue head sleeps until
+        the buckets have room for it; the waiters behind it sleep until a call
+        is admitted or withdrawn, rather than polling.
+        """
+        ticket = _Ticket(session, priority, tokens)
+        with self._cond:
+            self._queues[priority].setdefault(session, deque()).append(ticket)
+        try:
+            while True:
+                with self._cond:
+                    # Taken with the lock held, so a change after this check still wakes us
+                    changed = self._loop_event()
+                    if self._next_ticket() is ticket:
+                        wait = self._wait_time(ticket)
+                        if wait == 0.0:
+                            self._admit(ticket)
+                            self._cond.notify_all()
+                            return time.monotonic() - ticket.enqueued
+                    else:
+                        wait = self.IDLE_WAIT_SECONDS
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._cond:
+                self._withdraw(ticket)
+                self._cond.notify_all()
+            raise
+
+    def _withdraw(self, ticket: _Ticket):
+        """Remove a ticket that was never admitted."""
+        sessions = self._queues[ticket.priority]
+        queue = sessions.get(ticket.session)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del sessions[ticket.session]
+            self._wake_async()
+
+    def set_limits(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        """Replace the rate limits (LLM_RPM_LIMIT / LLM_TPM_LIMIT by default; 0 disables a limit)."""
+        rpm = requests_per_minute if requests_per_minute is not None else int(os.getenv("LLM_RPM_LIMIT", "500"))
+        tpm = tokens_per_minute if tokens_per_minute is not None else int(os.getenv("LLM_TPM_LIMIT", "150000"))
+        with self._cond:
+            # A limit of 0 disables that bucket
+            self.request_bucket = TokenBucket(rpm) if rpm > 0 else None
+            self.token_bucket = TokenBucket(tpm) if tpm > 0 else None
+            self._cond.notify_all()
+            self._wake_async()
+
+    def reset_metrics(self):
+        """Forget admitted counts and wait-time samples, e.g. between load-test stages."""
+        with self._cond:
+            for priority in PRIORITY_NAMES:
+                self._wait_samples[priority].clear()
+                self._admitted[priority] = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, admitted calls and wait-time percentiles per priority class."""
+        with self._cond:
+            result = {}
+            for priority, name in PRIORITY_NAMES.items():
+                samples = self._wait_samples[priority]
+                result[name] = {
+                    "queue_depth": sum(len(queue) for queue in self._queues[priority].values()),
+                    "admitted": self._admitted[priority],
+                    "wait_p50_ms": percentile(samples, 50) * 1000,
+                    "wait_p95_ms": percentile(samples, 95) * 1000,
+                    "wait_p99_ms": percentile(samples, 99) * 1000,
+                }
+            return result
+
+# Shared by every agent in the process (one API key, one set of limits)
+scheduler = LLMScheduler()
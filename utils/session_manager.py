@@ -0,0 +1,314 @@
+"""
+Memory-governed host for many debate sessions in one long-lived process
+Idle sessions are spilled to disk as compressed JSON and restored lazily on their
+next input, expired sessions are evicted, and tracemalloc attributes memory to sessions
+"""
+
+import gc
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from typing import Dict, Any, Callable, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class SessionNotFound(Exception):
+    """Raised for a session that never existed or has expired."""
+
+class _Entry:
+    """Bookkeeping for one hosted session, resident or spilled."""
+
+    def __init__(self, session: Any, now: float):
+        self.session = session
+        self.last_active = now
+        self.lock = threading.Lock()
+        # Net traced allocations made while this session was running
+        self.retained_bytes = 0
+        self.spill_bytes = 0
+
+class SessionManager:
+    def __init__(self, create: Callable[[str], Any], restore: Callable[[Dict[str, Any]], Any],
+                 memory_budget_mb: Optional[float] = None, spill_dir: Optional[str] = None,
+                 idle_seconds: Optional[float] = None, ttl_seconds: Optional[float] = None,
+                 trace_memory: bool = True, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            create: Builds a new session from a session id
+            restore: Rebuilds a session from its export_state() output
+            memory_budget_mb: Traced memory above which the least recently used sessions are spilled
+            spill_dir: Directory for spilled sessions
+            idle_seconds: Sessions idle this long are spilled
+            ttl_seconds: Sessions idle this long are evicted for good
+            trace_memory: Start tracemalloc if it is not already tracing; without it the
+                memory budget is not enforced and per-session bytes are not reported
+            clock: Time source, injectable for tests
+        """
+        budget_mb = memory_budget_mb if memory_budget_mb is not None else float(os.getenv("SESSION_MEMORY_BUDGET_MB", "512"))
+        self.memory_budget = int(budget_mb * 1024 * 1024)
+        self.spill_dir = spill_dir or os.getenv("SESSION_SPILL_DIR", ".sessions")
+        self.idle_seconds = idle_seconds if idle_seconds is not None else float(os.getenv("SESSION_IDLE_SECONDS", "300"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+        self.create_session = create
+        self.restore_session = restore
+        self.clock = clock
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self.stats = {"created": 0, "forked": 0, "spilled": 0, "restored": 0, "evicted": 0}
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.spill_dir, re.sub(r"[^\w.-]", "_", session_id) + ".json.gz")
+
+    def _entry(self, session_id: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(session_id)
+        if entry is None:
+            raise SessionNotFound(f"Unknown or expired session {session_id!r}")
+        return entry
+
+    def _hosted(self, session_id: str, entry: _Entry) -> bool:
+        """Whether entry is still the one hosted under session_id (call with entry.lock held)."""
+        with self._lock:
+            return self._entries.get(session_id) is entry
+
+    def _locked_entry(self, session_id: str) -> _Entry:
+        """Look up a session and take its lock, re-checking it was not evicted meanwhile."""
+        entry = self._entry(session_id)
+        entry.lock.acquire()
+        if not self._hosted(session_id, entry):
+            entry.lock.release()
+            raise SessionNotFound(f"Unknown or expired session {session_id!r}")
+        return entry
+
+    @staticmethod
+    def _traced() -> int:
+        return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+    def create(self, session_id: Optional[str] = None) -> str:
+        """
+        Start hosting a new session.
+
+        Returns:
+            The session id
+        """
+        session_id = session_id or uuid.uuid4().hex[:12]
+        before = self._traced()
+        entry = _Entry(self.create_session(session_id), self.clock())
+        entry.retained_bytes = max(0, self._traced() - before)
+        with self._lock:
+            self._entries[session_id] = entry
+            self.stats["created"] += 1
+        self.maintain()
+        return session_id
+
+    def fork(self, session_id: str, round_number: Optional[int] = None, branch_id: Optional[str] = None) -> str:
+        """
+        Host a branch of a session, forked after one of its rounds (see DebateSession.fork).
+
+        Args:
+            session_id: The session to branch from; restored first if it was spilled
+            round_number: Round to branch after; None means the latest
+            branch_id: Id for the branch (default: a new random id)
+
+        Returns:
+            The branch's session id
+
+        Raises:
+            SessionNotFound: If the session does not exist or has expired
+        """
+        branch_id = branch_id or uuid.uuid4().hex[:12]
+        entry = self._locked_entry(session_id)
+        try:
+            if entry.session is None:
+                entry.session = self._restore(session_id, entry)
+            before = self._traced()
+            branch = _Entry(entry.session.fork(round_number, branch_id), self.clock())
+            branch.retained_bytes = max(0, self._traced() - before)
+            entry.last_active = self.clock()
+        finally:
+            entry.lock.release()
+        with self._lock:
+            self._entries[branch_id] = branch
+            self.stats["forked"] += 1
+        self.maintain()
+        return branch_id
+
+    def run(self, session_id: str, method: str, *args, **kwargs) -> Any:
+        """
+        Call a method on a session, restoring it from disk first if it was spilled.
+
+        Args:
+            session_id: The session to run
+            method: Name of the session method, e.g. "submit"
+            *args, **kwargs: Passed to the method
+
+        Returns:
+            Whatever the method returns
+
+        Raises:
+            SessionNotFound: If the session does not exist or has expired
+        """
+        entry = self._locked_entry(session_id)
+        before = self._traced()
+        try:
+            if entry.session is None:
+                entry.session = self._restore(session_id, entry)
+            result = getattr(entry.session, method)(*args, **kwargs)
+        finally:
+            entry.retained_bytes = max(0, entry.retained_bytes + self._traced() - before)
+            entry.last_active = self.clock()
+            entry.lock.release()
+        
+        self.maintain()
+        return result
+
+    def _restore(self, session_id: str, entry: _Entry) -> Any:
+        with gzip.open(self._path(session_id), "rt", encoding="utf-8") as f:
+            session = self.restore_session(json.load(f))
+        os.remove(self._path(session_id))
+        entry.spill_bytes = 0
+        with self._lock:
+            self.stats["restored"] += 1
+        return session
+
+    def spill(self, session_id: str) -> bool:
+        """
+        Write a resident session to disk and release it.
+
+        Returns:
+            True if the session was spilled; False if it was already on disk, busy
+            or evicted meanwhile
+        """
+        entry = self._entry(session_id)
+        if not entry.lock.acquire(blocking=False):
+            return False
+        try:
+            if entry.session is None or not self._hosted(session_id, entry):
+                return False
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = self._path(session_id)
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump(entry.session.export_state(), f, separators=(",", ":"))
+            self._close(entry.session)
+            entry.session = None
+            entry.retained_bytes = 0
+            entry.spill_bytes = os.path.getsize(path)
+            with self._lock:
+                self.stats["spilled"] += 1
+            return True
+        finally:
+            entry.lock.release()
+
+    def evict(self, session_id: str):
+        """Stop hosting a session and delete anything it spilled; a no-op if it is already gone."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+        if entry is None:
+            return
+        with entry.lock:
+            with self._lock:
+                if self._entries.get(session_id) is not entry:
+                    return
+                del self._entries[session_id]
+                self.stats["evicted"] += 1
+            if entry.session is not None:
+                self._close(entry.session)
+                entry.session = None
+            elif os.path.exists(self._path(session_id)):
+                os.remove(self._path(session_id))
+
+    @staticmethod
+    def _close(session: Any):
+        close = getattr(session, "close", None)
+        if close is not None:
+            close()
+
+    def maintain(self) -> Dict[str, List[str]]:
+        """
+        Apply the TTL, idle and memory-budget policies.
+
+        Sessions idle past the TTL are evicted and sessions idle past
+        idle_seconds are spilled. While traced memory stays above the budget,
+        the least recently used resident sessions are spilled too.
+
+        Returns:
+            Dict with the ids of the "evicted" and "spilled" sessions
+        """
+        now = self.clock()
+        with self._lock:
+            entries = sorted(self._entries.items(), key=lambda item: item[1].last_active)
+
+        result = {"evicted": [], "spilled": []}
+        for session_id, entry in entries:
+            idle = now - entry.last_active
+            try:
+                if idle >= self.ttl_seconds:
+                    self.evict(session_id)
+                    result["evicted"].append(session_id)
+                elif idle >= self.idle_seconds and self.spill(session_id):
+                    result["spilled"].append(session_id)
+            except SessionNotFound:
+                # Evicted by a concurrent maintain() since the snapshot was taken
+                continue
+
+        if tracemalloc.is_tracing():
+            for session_id, entry in entries:
+                if session_id in result["evicted"] or self._traced() <= self.memory_budget:
+                    continue
+                try:
+                    spilled = self.spill(session_id)
+                except SessionNotFound:
+                    continue
+                if spilled:
+                    result["spilled"].append(session_id)
+                    # Agents hold reference cycles; collect them before measuring again
+                    gc.collect()
+        return result
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Traced memory overall and per session.
+
+        Per-session bytes are the net allocations made while the session was
+        created, restored or running, so shared caches are charged to whichever
+        session filled them first.
+        """
+        now = self.clock()
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        with self._lock:
+            entries = dict(self._entries)
+
+        sessions = {
+            session_id: {
+                "resident": entry.session is not None,
+                "idle_seconds": round(now - entry.last_active, 1),
+                "retained_bytes": entry.retained_bytes,
+                "spill_bytes": entry.spill_bytes,
+            }
+            for session_id, entry in entries.items()
+        }
+        return {
+            "budget_bytes": self.memory_budget,
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "resident": sum(1 for s in sessions.values() if s["resident"]),
+            "spilled": sum(1 for s in sessions.values() if not s["resident"]),
+            "sessions": sessions,
+            "stats": dict(self.stats),
+        }
+
+    def close(self):
+        """Evict every session, deleting their spill files."""
+        with self._lock:
+            session_ids = list(self._entries)
+        for session_id in session_ids:
+            self.evict(session_id)
@@ -0,0 +1,158 @@
+"""
+Single-flight coalescing for identical concurrent LLM calls
+When several sessions send the same prompt to the same model at once, only one request goes out
+"""
+
+import asyncio
+import copy
+import hashlib
+import re
+import threading
+from typing import Dict, Any, Awaitable, Callable, Tuple
+
+from utils.cancellation import Cancelled
+
+_WHITESPACE = re.compile(r"\s+")
+
+def request_key(model: str, prompt: str) -> str:
+    """Key a request by model and whitespace-normalized prompt."""
+    normalized = _WHITESPACE.sub(" ", prompt).strip()
+    return hashlib.sha256(f"{model}\n{normalized}".encode("utf-8")).hexdigest()
+
+class _Call:
+    """One in-flight request and the waiters sharing it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        # (loop, future) pairs of async waiters, resolved on their own loops
+        self.async_waiters = []
+
+    def finish(self):
+        """Wake every waiter; called once the call is out of the in-flight table."""
+        self.done.set()
+        for loop, future in self.async_waiters:
+            # A waiter whose loop has closed was cancelled and no longer listens
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, future)
+
+def _abandoned(error: BaseException) -> bool:
+    """Whether a leader gave up on its request rather than the request failing."""
+    return isinstance(error, (Cancelled, asyncio.CancelledError))
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {}
+
+    def _join(self, key: str, label: str, loop=None) -> Tuple[_Call, bool, Any]:
+        """Register as leader or waiter for a key; returns (call, leader, async waiter future)."""
+        with self._lock:
+            stats = self._stats.setdefault(label, {"requests": 0, "executed": 0, "coalesced": 0})
+            stats["requests"] += 1
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                stats["executed"] += 1
+                return call, True, None
+
+            call.waiters += 1
+            stats["coalesced"] += 1
+            future = None
+            if loop is not None:
+                future = loop.create_future()
+                call.async_waiters.append((loop, future))
+            return call, False, future
+
+    def _leave(self, key: str, call: _Call, result: Any):
+        """Publish the leader's outcome and remove the call from the in-flight table."""
+        with self._lock:
+            # Snapshot before the leader's caller can mutate the result
+            if call.waiters and call.error is None:
+                call.result = copy.deepcopy(result)
+            del self._calls[key]
+        call.finish()
+
+    def do(self, key: str, func: Callable[[], Any], label: str = "") -> Tuple[Any, bool]:
+        """
+        Run func once per key among concurrent callers.
+
+        Args:
+            key: Request key from request_key
+            func: Callable that performs the request
+            label: Name used to group statistics (e.g. the agent method)
+
+        Returns:
+            Tuple of (result, shared); shared is True when the result came from
+            another caller's in-flight request. Shared results are deep copies.
+        """
+        call, leader, _ = self._join(key, label)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                # A cancelled leader's waiters still want the result, so one of them sends it
+                if _abandoned(call.error):
+                    return self.do(key, func, label)
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        result = None
+        try:
+            result = func()
+            return result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._leave(key, call, result)
+
+    async def ado(self, key: str, func: Callable[[], Awaitable[Any]], label: str = "") -> Tuple[Any, bool]:
+        """
+        Async form of do: func is a coroutine function, and waiting never blocks the event loop.
+
+        Async and blocking callers coalesce with each other.
+        """
+        call, leader, future = self._join(key, label, asyncio.get_running_loop())
+        if not leader:
+            await future
+            if call.error is not None:
+                if _abandoned(call.error):
+                    return await self.ado(key, func, label)
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        result = None
+        try:
+            result = await func()
+            return result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._leave(key, call, result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing statistics, overall and per label."""
+        with self._lock:
+            per_label = {label: dict(values) for label, values in self._stats.items()}
+            in_flight = len(self._calls)
+
+        totals = {"requests": 0, "executed": 0, "coalesced": 0}
+        for values in per_label.values():
+            for name in totals:
+                totals[name] += values[name]
+        totals["coalesce_rate"] = totals["coalesced"] / totals["requests"] if totals["requests"] else 0.0
+        totals["in_flight"] = in_flight
+        totals["per_label"] = per_label
+        return totals
+
+# Shared by every agent in the process
+single_flight = SingleFlight()
@@ -0,0 +1,24 @@
+"""
+Summary statistics for latency reports
+Shared by self-play, the load test and the scheduler's metrics
+"""
+
+import math
+from typing import Iterable
+
+def percentile(values: Iterable[float], pct: float) -> float:
+    """
+    Nearest-rank percentile: the smallest value with at least pct% of the values at or below it.
+
+    Args:
+        values: The samples, in any order
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 for no samples
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
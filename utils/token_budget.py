@@ -0,0 +1,270 @@
+"""
+Token accounting and cost governor for debate sessions
+Counts prompt and completion tokens per agent method and enforces session and daily budgets
+"""
+
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+from utils.file_lock import file_lock
+
+# Context windows of the models we commonly run with
+MODEL_CONTEXT_LIMITS = {
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_LIMIT = 8192
+
+# Tokens kept free in every request for the model's answer
+COMPLETION_RESERVE = 1024
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+class TokenBudgetExceeded(Exception):
+    """Raised when a required call would exceed the session or daily token budget."""
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """Load the tiktoken encoding for a model once, or None if it is unavailable offline."""
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        return None
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """
+    Count tokens locally without calling the API.
+
+    Uses tiktoken when its encoding files are available, otherwise a word-piece
+    estimate (roughly one token per four characters of each word).
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(math.ceil(len(piece) / 4) for piece in _WORD_PATTERN.findall(text))
+
+def context_limit(model: str) -> int:
+    """Context window of a model, matching on the longest known prefix."""
+    for name in sorted(MODEL_CONTEXT_LIMITS, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_CONTEXT_LIMITS[name]
+    return DEFAULT_CONTEXT_LIMIT
+
+def trim_history(entries: List[str], max_tokens: int, model: str = "gpt-4") -> List[str]:
+    """
+    Keep the most recent history entries that fit in max_tokens.
+
+    Dropped entries are replaced by a single marker line so the model knows
+    earlier turns existed.
+    """
+    kept = []
+    used = 0
+    for entry in reversed(entries):
+        cost = count_tokens(entry, model) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(entry)
+        used += cost
+    kept.reverse()
+
+    omitted = len(entries) - len(kept)
+    if omitted:
+        kept.insert(0, f"[{omitted} earlier entries omitted to fit the context window]")
+    return kept
+
+def _as_text(response: Any) -> str:
+    """Render a response (text or structured) the way it would appear on the wire."""
+    if isinstance(response, str):
+        return response
+    return json.dumps(response, default=str)
+
+def _fraction(used: int, limit: int) -> float:
+    """Fraction of a budget spent; an empty budget counts as fully spent."""
+    return used / limit if limit > 0 else 1.0
+
+class TokenBudget:
+    def __init__(self, session_limit: Optional[int] = None, daily_limit: Optional[int] = None,
+                 usage_file: Optional[str] = None, cheap_model: Optional[str] = None):
+        # An explicit 0 is a real (empty) budget, not a request for the default
+        self.session_limit = session_limit if session_limit is not None else int(os.getenv("SESSION_TOKEN_BUDGET", "50000"))
+        self.daily_limit = daily_limit if daily_limit is not None else int(os.getenv("DAILY_TOKEN_BUDGET", "500000"))
+        self.usage_file = usage_file if usage_file is not None else os.getenv("TOKEN_USAGE_FILE")
+        self.cheap_model = cheap_model if cheap_model is not None else os.getenv("CHEAP_OPENAI_MODEL", "gpt-3.5-turbo")
+
+        # Budget pressure (fraction used) at which we start degrading
+        self.downgrade_at = 0.6
+        self.skip_optional_at = 0.8
+
+        self._lock = threading.Lock()
+        self.usage = {}
+        self.session_tokens = 0
+        # Day that daily_tokens counts; usage starts from zero when it changes
+        self.usage_day = date.today().isoformat()
+        self.daily_tokens = self._load_daily_usage()
+
+    def _load_daily_usage(self) -> int:
+        """Read today's usage from the usage file, if one is configured."""
+        if not self.usage_file or not os.path.exists(self.usage_file):
+            return 0
+        try:
+            with open(self.usage_file, encoding="utf-8") as f:
+                return int(json.load(f).get(date.today().isoformat(), 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _persist_daily_usage(self, today: str, added: int) -> Optional[int]:
+        """
+        Add this call's tokens to today's entry in the usage file.
+
+        Several processes can share the file, so the read-merge-write runs
+        under a file lock and each writer uses a temp file of its own.
+
+        Returns:
+            Today's total across every writer, or None without a usage file
+        """
+        if not self.usage_file:
+            return None
+        with file_lock(self.usage_file):
+            try:
+                with open(self.usage_file, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            data = {today: int(data.get(today, 0)) + added}
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.usage_file)),
+                                            prefix=os.path.basename(self.usage_file), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.usage_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return data[today]
+
+    def remaining(self) -> int:
+        """Tokens left before either the session or the daily budget is exhausted."""
+        return max(0, min(self.session_limit - self.session_tokens, self.daily_limit - self.daily_tokens))
+
+    def pressure(self) -> float:
+        """Fraction of the tighter of the two budgets already spent."""
+        return max(_fraction(self.session_tokens, self.session_limit), _fraction(self.daily_tokens, self.daily_limit))
+
+    def context_allowance(self, model: str, fixed_prompt: str = "") -> int:
+        """
+        Tokens available for variable context (e.g. debate history) in one request.
+
+        Args:
+            model: Model the request will be sent to
+            fixed_prompt: The rest of the prompt, which is always sent
+
+        Returns:
+            Token allowance, bounded by both the context window and the remaining budget
+        """
+        fixed = count_tokens(fixed_prompt, model)
+        allowance = context_limit(model) - COMPLETION_RESERVE - fixed
+        allowance = min(allowance, self.remaining() - COMPLETION_RESERVE - fixed)
+        return max(0, allowance)
+
+    def preflight(self, method: str, prompt: str, model: str, optional: bool = False) -> Dict[str, Any]:
+        """
+        Decide how to send a prompt before it goes out.
+
+        Args:
+            method: Qualified agent method name, e.g. "CritiqueAgent.final_evaluation"
+            prompt: The prompt about to be sent
+            model: The model the agent would normally use
+            optional: Whether the call can be skipped when budgets tighten
+
+        Returns:
+            Dict with "action" ("send", "downgrade" or "skip"), "model" and "prompt_tokens"
+
+        Raises:
+            TokenBudgetExceeded: If a required call cannot fit in the remaining budget
+        """
+        prompt_tokens = count_tokens(prompt, model)
+        pressure = self.pressure()
+
+        if optional and (pressure >= self.skip_optional_at or prompt_tokens + COMPLETION_RESERVE > self.remaining()):
+            return {"action": "skip", "model": model, "prompt_tokens": prompt_tokens}
+
+        if prompt_tokens + COMPLETION_RESERVE > self.remaining():
+            raise TokenBudgetExceeded(
+                f"{method} needs ~{prompt_tokens + COMPLETION_RESERVE} tokens but only {self.remaining()} remain"
+            )
+
+        if pressure >= self.downgrade_at and model != self.cheap_model:
+            return {"action": "downgrade", "model": self.cheap_model, "prompt_tokens": prompt_tokens}
+
+        return {"action": "send", "model": model, "prompt_tokens": prompt_tokens}
+
+    def record(self, method: str, prompt: str, response: Any, model: str):
+        """
+        Record the tokens used by one call.
+
+        Args:
+            method: Qualified agent method name
+            prompt: The prompt that was sent
+            response: The response that came back (text or structured)
+            model: The model that served the call
+        """
+        prompt_tokens = count_tokens(prompt, model)
+        completion_tokens = count_tokens(_as_text(response), model)
+        total = prompt_tokens + completion_tokens
+        today = date.today().isoformat()
+
+        with self._lock:
+            entry = self.usage.setdefault(method, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "skipped": 0})
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            self.session_tokens += total
+            if today != self.usage_day:
+                self.usage_day, self.daily_tokens = today, 0
+            self.daily_tokens += total
+
+        # File I/O stays outside the lock so other threads can preflight meanwhile
+        merged = self._persist_daily_usage(today, total)
+        if merged is not None:
+            with self._lock:
+                if self.usage_day == today:
+                    # The file also holds other processes' usage; never step back to
+                    # a total that a slower concurrent writer read before ours landed
+                    self.daily_tokens = max(self.daily_tokens, merged)
+
+    def record_skip(self, method: str):
+        """Record that an optional call was skipped to save budget."""
+        with self._lock:
+            entry = self.usage.setdefault(method, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "skipped": 0})
+            entry["skipped"] += 1
+
+    def reset_session(self):
+        """Start a new session; daily usage carries over."""
+        with self._lock:
+            self.usage = {}
+            self.session_tokens = 0
+
+    def report(self) -> Dict[str, Any]:
+        """Snapshot of token usage for display or logging."""
+        with self._lock:
+            return {
+                "per_method": {method: dict(entry) for method, entry in self.usage.items()},
+                "session_tokens": self.session_tokens,
+                "session_limit": self.session_limit,
+                "daily_tokens": self.daily_tokens,
+                "daily_limit": self.daily_limit,
+            }